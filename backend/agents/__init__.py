@@ -1,4 +1,12 @@
 # Agents package - LangGraph-based multi-agent system
-from .orchestrator import agent_graph, AgentState
+from .orchestrator import AgentState, get_agent_graph
+from .warmup import is_ready, warmup, warmup_state
 
-__all__ = ["agent_graph", "AgentState"]
+__all__ = ["AgentState", "get_agent_graph", "is_ready", "warmup", "warmup_state"]
+
+
+def __getattr__(name):
+    # The graph is compiled on first access, not when the package is imported
+    if name == "agent_graph":
+        return get_agent_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
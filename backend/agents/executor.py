@@ -0,0 +1,57 @@
+"""
+Bounded worker pool for CPU-bound agent work
+pandas/numpy jobs run here so the uvicorn event loop keeps serving requests
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from config.settings import settings
+from services.metrics import POOL_TASK_DURATION, timed
+from services.tracing import current_span, log_event, start_span
+
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor:
+    """Return the shared pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        workers = max(1, settings.analysis_pool_workers)
+        if settings.analysis_pool_type == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        log_event("executor", "pool_started", pool=settings.analysis_pool_type, workers=workers)
+    return _executor
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """
+    Run a blocking function on the pool and await its result
+    Thread pools run it inside a copy of the caller's context so the active
+    trace span (and other contextvars) carry over. A process pool cannot: spans
+    and metrics recorded inside func stay in the worker process, so the call is
+    always timed here, in the caller, as a pool.task span (under an active
+    trace) and the pool task duration histogram
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    pool = "thread" if isinstance(get_executor(), ThreadPoolExecutor) else "process"
+    task = getattr(func, "__qualname__", type(func).__name__)
+    span = start_span("pool.task", task=task, pool=pool) if current_span() is not None else nullcontext()
+    with span, timed(POOL_TASK_DURATION, with_status=True, task=task, pool=pool):
+        if pool == "thread":
+            call = partial(contextvars.copy_context().run, call)
+        return await loop.run_in_executor(get_executor(), call)
+
+
+def shutdown_executor() -> None:
+    """Stop the pool (called on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
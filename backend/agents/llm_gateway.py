@@ -0,0 +1,389 @@
+"""
+Shared gateway in front of the chat model: every agent call goes through it.
+Provides a token-bucket limiter (requests and tokens per minute), single-flight
+coalescing of identical concurrent prompts, jittered retry with a deadline,
+optional hedging of slow calls, and lookups in the shared response cache
+before any of that.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from langchain_core.messages import AIMessage
+from config.settings import settings
+from services.llm_cache import llm_cache, prompt_key
+from services.metrics import LLM_CALLS, LLM_IN_FLIGHT, LLM_LATENCY, LLM_TOKENS
+from services.tracing import log_event, set_attributes, start_span
+
+
+def _estimate_tokens(messages) -> int:
+    """Rough prompt size (~4 characters per token) used to reserve TPM budget up front"""
+    chars = sum(len(str(getattr(message, "content", message))) for message in messages)
+    return max(1, chars // 4)
+
+
+def _output_tokens(response) -> int:
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("output_tokens"):
+        return int(usage["output_tokens"])
+    return len(str(getattr(response, "content", ""))) // 4
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Provider throttling, transient unavailability and timeouts are worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(
+        marker in text
+        for marker in ("429", "ResourceExhausted", "RESOURCE_EXHAUSTED", "503", "Unavailable",
+                       "UNAVAILABLE", "DeadlineExceeded", "InternalServerError")
+    )
+
+
+class LLMBudgetExhausted(TimeoutError):
+    """The caller's deadline leaves no time for (another) model call"""
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute; acquire waits until enough are available"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` units (capped at capacity); returns seconds spent waiting"""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        # The lock keeps waiters FIFO so large requests are not starved
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+    
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take `amount` units only if available right now"""
+        if self.lock.locked():
+            return False
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+    
+    def debit(self, amount: float):
+        """Charge usage learned after the fact; may go negative, delaying later callers"""
+        self._refill()
+        self.tokens -= amount
+
+
+class LLMGateway:
+    """
+    Wraps a chat model with the same ainvoke interface
+    With model_factory the client is only created on first use, keeping imports cheap
+    """
+    
+    def __init__(
+        self,
+        model=None,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 1_000_000,
+        max_retries: int = 4,
+        retry_base_seconds: float = 1.0,
+        retry_max_seconds: float = 20.0,
+        deadline_seconds: float = 90.0,
+        cache=None,
+        hedge_percentile: float | None = None,
+        hedge_min_samples: int = 20,
+        model_factory=None,
+    ):
+        self._model = model
+        self._model_factory = model_factory
+        self.cache = cache
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: deque = deque(maxlen=256)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.deadline_seconds = deadline_seconds
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.counters = {
+            "calls": 0,
+            "cache_hits": 0,
+            "provider_calls": 0,
+            "queued": 0,
+            "coalesced": 0,
+            "retried": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0,
+            "failed": 0,
+            "queue_wait_seconds": 0.0,
+        }
+    
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._model_factory()
+        return self._model
+    
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+    
+    @property
+    def initialized(self) -> bool:
+        return self._model is not None
+    
+    def __getattr__(self, name):
+        # model name, temperature etc. of the wrapped chat model stay reachable
+        if name.startswith("_") or name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+    
+    @staticmethod
+    def _key(messages, kwargs) -> str:
+        payload = {
+            "messages": [
+                [type(message).__name__, str(getattr(message, "content", message))]
+                for message in messages
+            ],
+            "kwargs": kwargs,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    
+    async def ainvoke(self, messages, config=None, *, deadline: float | None = None, **kwargs):
+        """
+        Rate-limited, coalesced, retried model call
+        deadline: absolute time.time() by which the caller needs an answer;
+        raises LLMBudgetExhausted (a TimeoutError) once it cannot be met
+        """
+        model_name = getattr(self.model, "model", type(self.model).__name__)
+        tags = (config or {}).get("tags")
+        with start_span("llm.call", model=model_name, tags=tags):
+            return await self._serve(messages, config, deadline, kwargs)
+    
+    async def _serve(self, messages, config, deadline: float | None, kwargs):
+        self.counters["calls"] += 1
+        budget = self.deadline_seconds
+        if deadline is not None:
+            budget = min(budget, deadline - time.time())
+            if budget <= 0:
+                self.counters["budget_exhausted"] += 1
+                raise LLMBudgetExhausted("LLM budget exhausted before the call")
+        cache_key = None
+        if self.cache is not None:
+            cache_key = prompt_key(
+                getattr(self.model, "model", type(self.model).__name__),
+                getattr(self.model, "temperature", None),
+                messages,
+                kwargs,
+            )
+            content = await self.cache.aget(cache_key)
+            if content is not None:
+                self.counters["cache_hits"] += 1
+                LLM_CALLS.labels(served_by="cache").inc()
+                set_attributes(served_by="cache")
+                return AIMessage(content=content)
+        
+        key = self._key(messages, kwargs)
+        budget_ends = time.monotonic() + budget
+        
+        while True:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            # Identical prompt already on its way to the provider: share its result
+            self.counters["coalesced"] += 1
+            LLM_CALLS.labels(served_by="coalesced").inc()
+            set_attributes(served_by="coalesced")
+            try:
+                return await asyncio.wait_for(asyncio.shield(pending), budget_ends - time.monotonic())
+            except asyncio.TimeoutError:
+                self.counters["budget_exhausted"] += 1
+                raise LLMBudgetExhausted("LLM budget exhausted waiting for a coalesced call")
+            except asyncio.CancelledError:
+                # Only the leading caller was cancelled, not this one: coalesce again,
+                # possibly as the new leader
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+        
+        budget = budget_ends - time.monotonic()
+        LLM_CALLS.labels(served_by="provider").inc()
+        set_attributes(served_by="provider")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await self._call_with_retry(messages, config, kwargs, budget)
+            if cache_key is not None and isinstance(response.content, str) and response.content:
+                await self.cache.aput(cache_key, response.content)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Consumed here so an unobserved failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+    
+    async def _call_with_retry(self, messages, config, kwargs, budget: float):
+        deadline = time.monotonic() + budget
+        prompt_tokens = _estimate_tokens(messages)
+        attempt = 0
+        while True:
+            try:
+                waited = await asyncio.wait_for(self.requests.acquire(1), deadline - time.monotonic())
+                waited += await asyncio.wait_for(self.tokens.acquire(prompt_tokens), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                self.counters["budget_exhausted"] += 1
+                raise LLMBudgetExhausted("LLM budget exhausted waiting for rate limits")
+            if waited:
+                self.counters["queued"] += 1
+                self.counters["queue_wait_seconds"] += waited
+            
+            try:
+                response = await self._attempt(messages, config, kwargs, deadline - time.monotonic())
+                completion_tokens = _output_tokens(response)
+                self.tokens.debit(completion_tokens)
+                usage = getattr(response, "usage_metadata", None) or {}
+                LLM_TOKENS.labels(kind="prompt").observe(usage.get("input_tokens") or prompt_tokens)
+                LLM_TOKENS.labels(kind="completion").observe(completion_tokens)
+                set_attributes(
+                    prompt_tokens=usage.get("input_tokens") or prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    retries=attempt,
+                    queue_wait_ms=round(waited * 1000, 1),
+                )
+                return response
+            except Exception as e:
+                delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+                if (
+                    attempt >= self.max_retries
+                    or not _is_retryable(e)
+                    or time.monotonic() + delay >= deadline
+                ):
+                    self.counters["failed"] += 1
+                    if isinstance(e, asyncio.TimeoutError) and time.monotonic() + delay >= deadline:
+                        self.counters["budget_exhausted"] += 1
+                        raise LLMBudgetExhausted("LLM budget exhausted") from e
+                    raise
+                attempt += 1
+                self.counters["retried"] += 1
+                log_event(
+                    "llm_gateway", "retry", level="warning",
+                    attempt=attempt, max_retries=self.max_retries, delay_seconds=round(delay, 2), error=type(e).__name__
+                )
+                await asyncio.sleep(delay)
+    
+    def _hedge_delay(self) -> float | None:
+        """Observed latency percentile after which a duplicate request is fired"""
+        if self.hedge_percentile is None or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))]
+    
+    async def _attempt(self, messages, config, kwargs, timeout: float):
+        """One provider call; if it outlives the hedge delay a second copy races it"""
+        self.counters["provider_calls"] += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.model.ainvoke(messages, config, **kwargs))
+        tasks = [primary]
+        outcome = "error"
+        LLM_IN_FLIGHT.inc()
+        try:
+            hedge_after = self._hedge_delay()
+            if hedge_after is not None and hedge_after < timeout:
+                await asyncio.wait(tasks, timeout=hedge_after)
+                # Hedges only use spare request budget, never queue behind the limiter
+                if not primary.done() and self.requests.try_acquire(1):
+                    self.counters["hedged"] += 1
+                    self.counters["provider_calls"] += 1
+                    # No callbacks on the hedge so streamed tokens are not duplicated
+                    hedge_config = {**(config or {}), "callbacks": []}
+                    tasks.append(asyncio.ensure_future(self.model.ainvoke(messages, hedge_config, **kwargs)))
+                    set_attributes(hedged=True)
+            
+            error = None
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=max(0.0, started + timeout - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counters["hedge_wins"] += 1
+                            set_attributes(hedge_won=True)
+                        self._latencies.append(time.monotonic() - started)
+                        outcome = "ok"
+                        return task.result()
+                    error = task.exception()
+            raise error
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec()
+            LLM_LATENCY.labels(outcome=outcome).observe(time.monotonic() - started)
+            set_attributes(outcome=outcome)
+            for task in tasks:
+                task.cancel()
+    
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "queue_wait_seconds": round(self.counters["queue_wait_seconds"], 3),
+            "in_flight": len(self._in_flight),
+            "model_initialized": self.initialized,
+            "hedge_after_seconds": self._hedge_delay(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens, 1),
+        }
+
+
+def build_gateway(model=None, model_factory=None) -> LLMGateway:
+    """Gateway configured from settings; pass model_factory to create the client lazily"""
+    return LLMGateway(
+        model,
+        model_factory=model_factory,
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute,
+        max_retries=settings.llm_max_retries,
+        retry_base_seconds=settings.llm_retry_base_seconds,
+        retry_max_seconds=settings.llm_retry_max_seconds,
+        deadline_seconds=settings.llm_deadline_seconds,
+        cache=llm_cache if settings.llm_cache_enabled else None,
+        hedge_percentile=settings.llm_hedge_percentile if settings.llm_hedge_enabled else None,
+        hedge_min_samples=settings.llm_hedge_min_samples,
+    )
@@ -3,12 +3,23 @@ Enhanced LangGraph Multi-Agent Orchestrator
 Complete analysis: stats, correlations, outliers, all columns listed
 """
 
-from typing import TypedDict, Annotated
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import TypedDict, Annotated, Any
 from langchain_core.messages import HumanMessage, SystemMessage
 from config.settings import settings
+from .executor import run_cpu_bound
+from .llm_gateway import build_gateway
+from services.metrics import DATAFRAME_BUILD, NODE_DURATION, NODES_IN_FLIGHT, observe_dataset, timed
+from services.tracing import log_event, set_attributes, start_span
+import asyncio
 import operator
+import threading
+import traceback
+import time
+
+
+def _merge_results(left: dict | None, right: dict | None) -> dict:
+    """Reducer for collaboration_results so parallel branches can each add their key"""
+    return {**(left or {}), **(right or {})}
 
 
 class AgentState(TypedDict):
@@ -17,23 +28,56 @@ class AgentState(TypedDict):
     user_id: str
     dataset_id: str | None
     data: list | None
+    frame: Any  # pandas DataFrame from columnar uploads, used instead of data
+    source: dict | None  # {"path", "format"} of a spooled upload analysed in streaming mode
     columns: list | None
     company_name: str | None
     topic: str | None
     context: str | None
     participants: str | None
+    meeting_mode: str | None  # "combined" (one prompt) or "parallel" (one call per section)
+    sections: list | None
+    analysis_options: dict | None
+    deadline: float | None  # absolute time.time() by which the request must answer
     next_agent: str
     delegate_to: str | None
-    collaboration_results: dict
+    collaboration_results: Annotated[dict, _merge_results]
     final_output: dict | None
 
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=settings.gemini_api_key,
-    temperature=0.7,
-    max_output_tokens=4096
-)
+# Sections data_analyst_agent can compute; insights need the quality score
+ANALYSIS_SECTIONS = ["statistics", "correlations", "outliers", "quality", "insights"]
+
+# The report writer turns the analysis into prose itself
+REPORT_ANALYSIS_SECTIONS = ["statistics", "correlations", "outliers", "quality"]
+
+# Sections the chunked streaming engine can produce in a single pass
+STREAMING_SECTIONS = ["statistics", "outliers", "quality", "insights"]
+
+TASK_SECTIONS = {
+    "data_analysis": ANALYSIS_SECTIONS,
+    "chat": ANALYSIS_SECTIONS,
+    "statistical": ["statistics"],
+    "correlation": ["correlations"],
+    "outliers": ["outliers"],
+}
+
+
+def _create_model():
+    if not settings.gemini_api_key:
+        raise RuntimeError("GEMINI_API_KEY is not configured")
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=settings.gemini_api_key,
+        temperature=0.7,
+        max_output_tokens=4096
+    )
+
+
+# All agents call the model through the gateway (rate limits, coalescing, retries);
+# the Gemini client is created on the first call or during warmup
+llm = build_gateway(model_factory=_create_model)
 
 
 def router_agent(state: AgentState) -> AgentState:
@@ -53,32 +97,19 @@ def router_agent(state: AgentState) -> AgentState:
     }
     
     next_agent = routing_map.get(task_type, "data_analyst_agent")
+    if next_agent == "data_analyst_agent":
+        requested = state.get("sections") or TASK_SECTIONS.get(task_type, ANALYSIS_SECTIONS)
+        state["sections"] = [sec for sec in ANALYSIS_SECTIONS if sec in requested]
     state["next_agent"] = next_agent
     state["delegate_to"] = None
     state["messages"].append(SystemMessage(content=f"🎯 Routing to {next_agent} for {task_type}"))
-    print(f"[Router] Task: {task_type} → Agent: {next_agent}")
+    log_event("router", "routed", task_type=task_type, next_agent=next_agent)
     return state
 
 
-def meeting_agent(state: AgentState) -> AgentState:
-    company_name = state.get("company_name", "")
-    topic = state.get("topic", "")
-    context = state.get("context", "")
-    participants = state.get("participants", "")
-    
-    print(f"[Meeting Agent] Generating for: {company_name} - {topic}")
-    
-    try:
-        prompt = f"""Create a meeting package for {company_name} on: {topic}
-
-Context: {context}
-Participants: {participants}
-
-Generate TWO sections with EXACT formatting:
-
-**RESEARCH:**
-
-Industry Trends:
+# Templates shared by the combined prompt and the per-section prompts of parallel mode
+def _research_template(topic: str) -> str:
+    return f"""Industry Trends:
 • Trend about {topic}
 • Another trend
 • Third trend
@@ -95,11 +126,10 @@ Challenges:
 Recommendations:
 • Recommendation 1
 • Recommendation 2
-• Recommendation 3
+• Recommendation 3"""
 
-**AGENDA:**
 
-09:00-09:10 (10 min) **Welcome & Objectives**
+AGENDA_TEMPLATE = """09:00-09:10 (10 min) **Welcome & Objectives**
 • Brief welcome and introduction
 • State meeting objectives
 • Outline expected outcomes
@@ -132,257 +162,610 @@ Recommendations:
 10:25-10:40 (15 min) **Action Items & Next Steps**
 • Summarize decisions
 • Assign action items
-• Schedule follow-ups
+• Schedule follow-ups"""
 
-CRITICAL: Use EXACT format "HH:MM-HH:MM (XX min) **Title**" for agenda. Keep bullets concise (one line each)."""
-        
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content
-        
-        print(f"[Meeting Agent] LLM Response length: {len(content)} chars")
+AGENDA_FORMAT_RULE = 'CRITICAL: Use EXACT format "HH:MM-HH:MM (XX min) **Title**" for agenda. Keep bullets concise (one line each).'
+
+
+def _meeting_header(company_name, topic, context, participants) -> str:
+    return f"""Create a meeting package for {company_name} on: {topic}
+
+Context: {context}
+Participants: {participants}"""
+
+
+def _meeting_prompt(company_name, topic, context, participants) -> str:
+    """Single prompt asking for both sections, split afterwards on the markers"""
+    return f"""{_meeting_header(company_name, topic, context, participants)}
+
+Generate TWO sections with EXACT formatting:
+
+**RESEARCH:**
+
+{_research_template(topic)}
+
+**AGENDA:**
+
+{AGENDA_TEMPLATE}
+
+{AGENDA_FORMAT_RULE}"""
+
+
+def _meeting_section_prompts(company_name, topic, context, participants) -> dict:
+    """Independent research and agenda prompts for parallel mode"""
+    header = _meeting_header(company_name, topic, context, participants)
+    return {
+        "research": f"""{header}
+
+Generate ONLY the research section, without a heading, in this format:
+
+{_research_template(topic)}
+
+Keep bullets concise (one line each).""",
+        "agenda": f"""{header}
+
+Generate ONLY the meeting agenda, without a heading, in this format:
+
+{AGENDA_TEMPLATE}
+
+{AGENDA_FORMAT_RULE}""",
+    }
+
+
+def _split_meeting(content: str) -> tuple[str, str]:
+    """Split a combined completion into (research, agenda) with multiple fallbacks"""
+    # Better splitting logic with multiple fallbacks
+    agenda = ""
+    research = ""
+    
+    if "**AGENDA:**" in content:
+        parts = content.split("**AGENDA:**")
+        research = parts[0].replace("**RESEARCH:**", "").strip()
+        agenda = parts[1].strip()
+    elif "AGENDA:" in content and "RESEARCH:" in content:
+        parts = content.split("AGENDA:")
+        research = parts[0].replace("RESEARCH:", "").replace("**RESEARCH:**", "").strip()
+        agenda = parts[1].strip()
+    else:
+        # Fallback: split by finding first time pattern
+        lines = content.split("\n")
+        research_lines = []
+        agenda_lines = []
+        found_agenda = False
         
-        # Better splitting logic with multiple fallbacks
-        agenda = ""
-        research = ""
+        for line in lines:
+            # Look for time pattern like "09:00-09:10"
+            if not found_agenda and ("09:00" in line or "10:00" in line or "11:00" in line):
+                found_agenda = True
+            
+            if found_agenda:
+                agenda_lines.append(line)
+            else:
+                research_lines.append(line)
         
-        if "**AGENDA:**" in content:
-            parts = content.split("**AGENDA:**")
-            research = parts[0].replace("**RESEARCH:**", "").strip()
-            agenda = parts[1].strip()
-        elif "AGENDA:" in content and "RESEARCH:" in content:
-            parts = content.split("AGENDA:")
-            research = parts[0].replace("RESEARCH:", "").replace("**RESEARCH:**", "").strip()
-            agenda = parts[1].strip()
+        research = "\n".join(research_lines).replace("**RESEARCH:**", "").replace("RESEARCH:", "").strip()
+        agenda = "\n".join(agenda_lines).strip()
+    
+    return research, agenda
+
+
+def _strip_heading(text: str, heading: str) -> str:
+    """Drop a section heading the model may echo despite the prompt"""
+    return text.replace(f"**{heading}:**", "").strip()
+
+
+def _ensure_meeting_content(research: str, agenda: str) -> tuple[str, str]:
+    if not agenda or len(agenda) < 50:
+        agenda = "Meeting agenda not properly generated. Please try again."
+    if not research or len(research) < 50:
+        research = "Research not properly generated. Please try again."
+    return research, agenda
+
+
+def _remaining(state: AgentState) -> float | None:
+    """Seconds left before the request deadline, None when unbounded"""
+    deadline = state.get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+
+async def _timed_section(prompt: str, max_tokens: int, tag: str, deadline: float | None) -> tuple[str, float]:
+    """One section completion with its own output budget; returns (text, latency ms)"""
+    started = time.perf_counter()
+    response = await llm.ainvoke(
+        [HumanMessage(content=prompt)],
+        {"tags": [tag]},
+        deadline=deadline,
+        generation_config={"max_output_tokens": max_tokens},
+    )
+    return response.content, round((time.perf_counter() - started) * 1000, 1)
+
+
+async def meeting_agent(state: AgentState) -> AgentState:
+    company_name = state.get("company_name", "")
+    topic = state.get("topic", "")
+    context = state.get("context", "")
+    participants = state.get("participants", "")
+    mode = state.get("meeting_mode") or settings.meeting_mode
+    
+    log_event("meeting_agent", "start", company=company_name, topic=topic, mode=mode)
+    
+    started = time.perf_counter()
+    try:
+        if mode == "parallel":
+            # Research and agenda are independent, so generate them concurrently
+            prompts = _meeting_section_prompts(company_name, topic, context, participants)
+            (research, research_ms), (agenda, agenda_ms) = await asyncio.gather(
+                _timed_section(prompts["research"], settings.meeting_research_max_tokens, "meeting_section:research", state.get("deadline")),
+                _timed_section(prompts["agenda"], settings.meeting_agenda_max_tokens, "meeting_section:agenda", state.get("deadline")),
+            )
+            research = _strip_heading(research, "RESEARCH")
+            agenda = _strip_heading(agenda, "AGENDA")
+            latency = {"research_ms": research_ms, "agenda_ms": agenda_ms}
         else:
-            # Fallback: split by finding first time pattern
-            lines = content.split("\n")
-            research_lines = []
-            agenda_lines = []
-            found_agenda = False
+            prompt = _meeting_prompt(company_name, topic, context, participants)
+            response = await llm.ainvoke([HumanMessage(content=prompt)], deadline=state.get("deadline"))
+            content = response.content
             
-            for line in lines:
-                # Look for time pattern like "09:00-09:10"
-                if not found_agenda and ("09:00" in line or "10:00" in line or "11:00" in line):
-                    found_agenda = True
-                
-                if found_agenda:
-                    agenda_lines.append(line)
-                else:
-                    research_lines.append(line)
-            
-            research = "\n".join(research_lines).replace("**RESEARCH:**", "").replace("RESEARCH:", "").strip()
-            agenda = "\n".join(agenda_lines).strip()
+            log_event("meeting_agent", "llm_response", chars=len(content))
+            research, agenda = _split_meeting(content)
+            latency = {}
         
         # Ensure we have content
-        if not agenda or len(agenda) < 50:
-            agenda = "Meeting agenda not properly generated. Please try again."
-        if not research or len(research) < 50:
-            research = "Research not properly generated. Please try again."
-        
-        print(f"[Meeting Agent] Split - Research: {len(research)} chars, Agenda: {len(agenda)} chars")
+        research, agenda = _ensure_meeting_content(research, agenda)
+        latency["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
         
-        state["final_output"] = {"agenda": agenda, "research": research}
+        state["final_output"] = {"agenda": agenda, "research": research, "mode": mode, "latency_ms": latency}
         state["next_agent"] = "end"
-        print(f"[Meeting Agent] ✓ Complete - Research: {len(research)} chars, Agenda: {len(agenda)} chars")
+        log_event("meeting_agent", "complete", research_chars=len(research), agenda_chars=len(agenda), **latency)
         
     except Exception as e:
-        print(f"[Meeting Agent] ERROR: {str(e)}")
+        log_event("meeting_agent", "error", level="error", error=str(e))
         state["final_output"] = {
             "agenda": f"Error generating agenda: {str(e)}",
-            "research": f"Error generating research: {str(e)}"
+            "research": f"Error generating research: {str(e)}",
+            "error": str(e)
         }
         state["next_agent"] = "end"
     
     return state
 
 
-def data_analyst_agent(state: AgentState) -> AgentState:
+def _dataset_input(state: AgentState):
+    """Uploaded DataFrame if present, otherwise the JSON rows"""
+    frame = state.get("frame")
+    return frame if frame is not None else state.get("data")
+
+
+def _to_frame(data):
     import pandas as pd
+    if isinstance(data, pd.DataFrame):
+        return data
+    with start_span("dataframe.build", source="json") as span, timed(DATAFRAME_BUILD, source="json"):
+        frame = pd.DataFrame(data)
+        span.set(rows=len(frame), columns=len(frame.columns))
+        return frame
+
+
+def _analysis_option(options: dict | None, key: str):
+    value = (options or {}).get(key)
+    return value if value is not None else getattr(settings, key)
+
+
+def _compute_analysis(data, sections: list, options: dict | None = None) -> dict:
+    """CPU-bound part of the analysis: only the requested sections are computed"""
     import numpy as np
+    from tools import (
+        KLLSketch,
+        categorical_associations,
+        correlation_matrix,
+        detect_outliers,
+        format_correlations,
+        format_rectangular
+    )
     
-    data = state.get("data", [])
-    print(f"[Data Analyst] Processing {len(data)} rows")
+    df = _to_frame(data)
+    observe_dataset(len(df), len(df.columns))
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    approximate = _analysis_option(options, "quantile_mode") == "approximate"
+    epsilon = _analysis_option(options, "quantile_epsilon")
+    sketches = {}
     
-    if not data or len(data) == 0:
-        state["final_output"] = {"quality_report": "No data", "analysis_report": "No data"}
-        state["next_agent"] = "end"
-        return state
+    def quantiles(col: str, col_data, qs: list) -> list:
+        if not approximate:
+            return [float(v) for v in col_data.quantile(qs)]
+        if col not in sketches:
+            sketches[col] = KLLSketch.from_epsilon(epsilon)
+            sketches[col].update(col_data.to_numpy(dtype="float64"))
+        return sketches[col].quantiles(qs)
+    result = {
+        "row_count": len(df),
+        "column_count": len(df.columns),
+        "numeric_count": len(numeric_cols)
+    }
     
-    try:
-        df = pd.DataFrame(data)
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        # Statistics
+    # Statistics
+    if "statistics" in sections:
         stats = {}
         for col in numeric_cols:
             col_data = df[col].dropna()
             if len(col_data) > 0:
+                # Sample std of a single value is NaN, which is not valid JSON
+                std = float(col_data.std())
                 stats[col] = {
                     "count": int(len(col_data)),
                     "mean": round(float(col_data.mean()), 2),
-                    "median": round(float(col_data.median()), 2),
-                    "std": round(float(col_data.std()), 2),
+                    "median": round(quantiles(col, col_data, [0.5])[0], 2),
+                    "std": None if np.isnan(std) else round(std, 2),
                     "min": round(float(col_data.min()), 2),
                     "max": round(float(col_data.max()), 2)
                 }
-        
-        # Correlations
+        result["statistics"] = stats
+    
+    # Correlations
+    if "correlations" in sections:
         correlations = {}
+        method = _analysis_option(options, "correlation_method")
+        shape = {
+            "mode": _analysis_option(options, "correlation_mode"),
+            "top_k": _analysis_option(options, "correlation_top_k"),
+            "threshold": _analysis_option(options, "correlation_threshold")
+        }
         if len(numeric_cols) >= 1:
-            corr_matrix = df[numeric_cols].corr()
-            for col1 in numeric_cols:
-                correlations[col1] = {}
-                for col2 in numeric_cols:
-                    correlations[col1][col2] = round(float(corr_matrix.loc[col1, col2]), 2)
-        
-        # Outliers
-        outliers_summary = {}
-        for col in numeric_cols:
-            col_data = df[col].dropna()
-            if len(col_data) > 0:
-                Q1 = col_data.quantile(0.25)
-                Q3 = col_data.quantile(0.75)
-                IQR = Q3 - Q1
-                lower = Q1 - 1.5 * IQR
-                upper = Q3 + 1.5 * IQR
-                outlier_count = int(((col_data < lower) | (col_data > upper)).sum())
-                
-                outliers_summary[col] = {
-                    "count": outlier_count,
-                    "percentage": round(float(outlier_count / len(col_data) * 100), 1) if outlier_count > 0 else 0,
-                    "bounds": {"lower": round(float(lower), 2), "upper": round(float(upper), 2)},
-                    "quartiles": {"Q1": round(float(Q1), 2), "Q3": round(float(Q3), 2), "IQR": round(float(IQR), 2)}
-                }
+            R = correlation_matrix(
+                df[numeric_cols].to_numpy(dtype="float64", na_value=np.nan),
+                method=method,
+                kendall_max_rows=settings.kendall_max_rows
+            )
+            correlations = format_correlations(numeric_cols, R, **shape)
+        result["correlations"] = correlations
+        result["correlation_method"] = method
         
-        # Quality
-        missing = int(df.isna().sum().sum())
+        categorical_cols = [col for col in df.columns if col not in numeric_cols]
+        if _analysis_option(options, "categorical_associations") and categorical_cols:
+            assoc = categorical_associations(df, categorical_cols, numeric_cols, settings.category_max_levels)
+            result["associations"] = {
+                "cramers_v": format_correlations(categorical_cols, assoc["cramers_v"], **shape),
+                "correlation_ratio": format_rectangular(categorical_cols, numeric_cols, assoc["correlation_ratio"], **shape)
+            }
+    
+    # Outliers
+    if "outliers" in sections:
+        fences = None
+        if approximate:
+            fences = np.array([
+                quantiles(col, df[col].dropna(), [0.25, 0.75]) if df[col].notna().any() else [np.nan, np.nan]
+                for col in numeric_cols
+            ]).T.reshape(2, len(numeric_cols))
+        result["outliers"] = detect_outliers(
+            df[numeric_cols],
+            methods=(options or {}).get("outlier_methods"),
+            fence=_analysis_option(options, "outlier_fence"),
+            zscore_threshold=settings.outlier_zscore_threshold,
+            mad_threshold=settings.outlier_mad_threshold,
+            top_n=(options or {}).get("outlier_top_n") or 0,
+            quartiles=fences
+        )
+    
+    # Quality
+    if "quality" in sections or "insights" in sections:
+        missing_by_column = df.isna().sum()
+        missing = int(missing_by_column.sum())
         total = len(df) * len(df.columns)
-        quality_score = round(100 - (missing / total * 100), 1)
+        result["missing_by_column"] = {str(col): int(count) for col, count in missing_by_column.items()}
+        result["missing"] = missing
+        result["total"] = total
+        result["quality_score"] = round(100 - (missing / total * 100), 1)
         
         # All columns list
         all_cols_list = []
         for col in df.columns:
             col_type = "numeric" if col in numeric_cols else "text"
             all_cols_list.append(f"  - {col} ({col_type})")
+        result["all_cols_list"] = all_cols_list
+    
+    return result
+
+
+def _compute_streaming_analysis(source: dict, sections: list, options: dict | None = None) -> dict:
+    """Single-pass chunked analysis of a spooled upload in bounded memory"""
+    from tools import StreamingStatistics, iter_frames
+    
+    acc = StreamingStatistics(epsilon=_analysis_option(options, "quantile_epsilon"))
+    for chunk in iter_frames(source["path"], source["format"], settings.streaming_chunk_rows):
+        acc.consume(chunk)
+    
+    numeric_cols = acc.numeric_columns
+    observe_dataset(acc.rows, len(acc.columns))
+    result = {
+        "row_count": acc.rows,
+        "column_count": len(acc.columns),
+        "numeric_count": len(numeric_cols)
+    }
+    if "statistics" in sections:
+        result["statistics"] = acc.statistics()
+    if "outliers" in sections:
+        result["outliers"] = acc.outliers(fence=_analysis_option(options, "outlier_fence"))
+    if "quality" in sections or "insights" in sections:
+        missing = acc.total_missing
+        total = acc.total_cells
+        result["missing_by_column"] = dict(acc.missing)
+        result["missing"] = missing
+        result["total"] = total
+        result["quality_score"] = round(100 - (missing / total * 100), 1) if total else 0
+        result["all_cols_list"] = [
+            f"  - {col} ({'numeric' if col in numeric_cols else 'text'})" for col in acc.columns
+        ]
+    return result
+
+
+async def _generate_insights(state: AgentState, analysis: dict) -> tuple[str, str]:
+    """
+    Rule-based insights in fast mode; otherwise LLM insights if the request
+    deadline allows, falling back to the rule-based ones
+    """
+    from tools import deterministic_insights
+    
+    if _analysis_option(state.get("analysis_options"), "analysis_mode") == "fast":
+        return deterministic_insights(analysis, limit=8, per_rule=3), "rules"
+    
+    remaining = _remaining(state)
+    if remaining is None or remaining >= settings.insight_min_budget_seconds:
+        insight_prompt = "Dataset: " + str(analysis["row_count"]) + " rows, " + str(analysis["column_count"]) + " cols. Quality: " + str(analysis["quality_score"]) + "/100. Give 2-3 key insights."
+        try:
+            response = await llm.ainvoke([HumanMessage(content=insight_prompt)], deadline=state.get("deadline"))
+            return response.content, "llm"
+        except Exception as e:
+            log_event("data_analyst", "insights_fallback", level="warning", reason=type(e).__name__)
+    else:
+        log_event("data_analyst", "insights_fallback", level="warning", reason="deadline", remaining_seconds=round(remaining, 2))
+    return deterministic_insights(analysis), "fallback"
+
+
+async def _run_data_analysis(state: AgentState, sections: list | None = None) -> dict:
+    """Analysis output for the dataset in state; shared by the analyst node and report branch"""
+    source = state.get("source")
+    data = _dataset_input(state)
+    data = data if data is not None else []
+    sections = sections or state.get("sections") or ANALYSIS_SECTIONS
+    if source:
+        sections = [sec for sec in sections if sec in STREAMING_SECTIONS]
+        log_event("data_analyst", "start", source=source["format"], sections=sections)
+    else:
+        log_event("data_analyst", "start", source="json", rows=len(data), sections=sections)
+    
+    if not source and len(data) == 0:
+        return {"quality_report": "No data", "analysis_report": "No data"}
+    
+    try:
+        options = state.get("analysis_options")
+        if source:
+            analysis = await run_cpu_bound(_compute_streaming_analysis, source, sections, options)
+        else:
+            analysis = await run_cpu_bound(_compute_analysis, data, sections, options)
+        row_count = analysis["row_count"]
+        column_count = analysis["column_count"]
+        numeric_count = analysis["numeric_count"]
+        output = {"sections_computed": list(sections)}
         
-        # AI Insights
-        insight_prompt = "Dataset: " + str(len(df)) + " rows, " + str(len(df.columns)) + " cols. Quality: " + str(quality_score) + "/100. Give 2-3 key insights."
-        response = llm.invoke([HumanMessage(content=insight_prompt)])
+        for key in ["statistics", "correlations", "correlation_method", "associations", "outliers", "quality_score"]:
+            if key in analysis:
+                output[key] = analysis[key]
         
-        analysis_report = "**Statistical Analysis**\n\n"
-        for col, s in stats.items():
-            analysis_report += f"**{col}**: Mean={s['mean']}, Median={s['median']}, StdDev={s['std']}, Range=[{s['min']}, {s['max']}]\n"
-        analysis_report += "\n**Insights:**\n" + response.content
+        if "statistics" in sections or "insights" in sections:
+            analysis_report = ""
+            if "statistics" in sections:
+                analysis_report += "**Statistical Analysis**\n\n"
+                for col, s in analysis["statistics"].items():
+                    analysis_report += f"**{col}**: Mean={s['mean']}, Median={s['median']}, StdDev={s['std']}, Range=[{s['min']}, {s['max']}]\n"
+            
+            # AI Insights
+            if "insights" in sections:
+                insights, output["insights_source"] = await _generate_insights(state, analysis)
+                analysis_report += "\n**Insights:**\n" + insights
+            output["analysis_report"] = analysis_report
         
-        quality_report = f"""**Quality Score: {quality_score}/100**
-- Total Rows: {len(df)}
-- Total Columns: {len(df.columns)} ({len(numeric_cols)} numeric, {len(df.columns) - len(numeric_cols)} text)
-- Missing: {missing}/{total} ({round(missing/total*100,1)}%)
-- Correlations: {len(correlations)} columns{' (self-corr)' if len(numeric_cols) == 1 else ''}
-- Outliers: {sum(1 for v in outliers_summary.values() if v['count'] > 0)} columns
-
-**All Columns:**
-{chr(10).join(all_cols_list)}"""
+        if "quality" in sections:
+            quality_score = analysis["quality_score"]
+            missing = analysis["missing"]
+            total = analysis["total"]
+            lines = [
+                f"**Quality Score: {quality_score}/100**",
+                f"- Total Rows: {row_count}",
+                f"- Total Columns: {column_count} ({numeric_count} numeric, {column_count - numeric_count} text)",
+                f"- Missing: {missing}/{total} ({round(missing/total*100,1)}%)"
+            ]
+            if "correlations" in analysis:
+                lines.append(f"- Correlations: {numeric_count} columns{' (self-corr)' if numeric_count == 1 else ''}")
+            if "outliers" in analysis:
+                lines.append(f"- Outliers: {sum(1 for v in analysis['outliers'].values() if v['count'] > 0)} columns")
+            output["quality_report"] = "\n".join(lines) + "\n\n**All Columns:**\n" + "\n".join(analysis["all_cols_list"])
         
-        state["final_output"] = {
-            "quality_report": quality_report,
-            "analysis_report": analysis_report,
-            "statistics": stats,
-            "correlations": correlations,
-            "outliers": outliers_summary,
-            "quality_score": quality_score
-        }
-        state["next_agent"] = "end"
-        print(f"[Data Analyst] ✓ Complete ({len(df)} rows, {len(df.columns)} cols: {len(numeric_cols)} numeric)")
-        return state
+        set_attributes(rows=row_count, columns=column_count, numeric_columns=numeric_count)
+        log_event("data_analyst", "complete", rows=row_count, columns=column_count, numeric_columns=numeric_count)
+        return output
         
     except Exception as e:
-        print(f"[Data Analyst] ✗ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        state["final_output"] = {"quality_report": f"Error: {e}", "analysis_report": f"Error: {e}"}
-        state[" next_agent"] = "end"
-        return state
+        log_event("data_analyst", "error", level="error", error=str(e), traceback=traceback.format_exc())
+        return {"quality_report": f"Error: {e}", "analysis_report": f"Error: {e}"}
 
 
-def quality_agent(state: AgentState) -> AgentState:
-    import pandas as pd
-    data = state.get("data", [])
-    print(f"[Quality Agent] Checking {len(data)} rows")
+async def data_analyst_agent(state: AgentState) -> AgentState:
+    state["final_output"] = await _run_data_analysis(state)
+    state["next_agent"] = "end"
+    return state
+
+
+def _compute_quality(data) -> dict:
+    """CPU-bound part of the quality check"""
+    df = _to_frame(data)
+    missing = int(df.isna().sum().sum())
+    total = len(df) * len(df.columns)
+    duplicates = int(df.duplicated().sum())
+    quality_score = round(100 - (missing / total * 100) - (duplicates / len(df) * 10), 1)
+    return {
+        "row_count": len(df),
+        "column_count": len(df.columns),
+        "missing": missing,
+        "total": total,
+        "duplicates": duplicates,
+        "quality_score": quality_score
+    }
+
+
+async def _run_quality_assessment(state: AgentState) -> dict:
+    """Quality report for the dataset in state; shared by the quality node and report branch"""
+    data = _dataset_input(state)
+    data = data if data is not None else []
+    log_event("quality_agent", "start", rows=len(data))
     
-    if not data:
-        state["final_output"] = {"quality_report": "No data", "quality_score": 0}
-        state["next_agent"] = "end"
-        return state
+    if len(data) == 0:
+        return {"quality_report": "No data", "quality_score": 0}
     
     try:
-        df = pd.DataFrame(data)
-        missing = int(df.isna().sum().sum())
-        total = len(df) * len(df.columns)
-        duplicates = df.duplicated().sum()
-        quality_score = round(100 - (missing / total * 100) - (duplicates / len(df) * 10), 1)
+        q = await run_cpu_bound(_compute_quality, data)
+        quality_score = q["quality_score"]
         
         report = f"""**Quality Assessment**
 
 Score: **{quality_score}/100**
 
-- Total Rows: {len(df):,}
-- Total Columns: {len(df.columns)}
-- Missing Values: {missing:,} ({round(missing/total*100,1)}%)
-- Duplicate Rows: {duplicates}
+- Total Rows: {q["row_count"]:,}
+- Total Columns: {q["column_count"]}
+- Missing Values: {q["missing"]:,} ({round(q["missing"]/q["total"]*100,1)}%)
+- Duplicate Rows: {q["duplicates"]}
 
 **Recommendation:** {"Good quality data" if quality_score > 80 else "Consider data cleaning"}"""
         
-        state["final_output"] = {"quality_report": report, "quality_score": quality_score}
-        state["next_agent"] = "end"
-        print(f"[Quality Agent] ✓ Score: {quality_score}/100")
-        return state
+        set_attributes(rows=q["row_count"], columns=q["column_count"], quality_score=quality_score)
+        log_event("quality_agent", "complete", quality_score=quality_score)
+        return {"quality_report": report, "quality_score": quality_score}
     except Exception as e:
-        print(f"[Quality Agent] ✗ Error: {e}")
-        state["final_output"] = {"quality_report": f"Error: {e}", "quality_score": 0}
-        state["next_agent"] = "end"
-        return state
+        log_event("quality_agent", "error", level="error", error=str(e))
+        return {"quality_report": f"Error: {e}", "quality_score": 0}
+
+
+async def quality_agent(state: AgentState) -> AgentState:
+    state["final_output"] = await _run_quality_assessment(state)
+    state["next_agent"] = "end"
+    return state
+
+
+# Report fan-out: each branch profiles the dataset independently and writes its
+# result into collaboration_results; report_writer_agent runs once all are in
+async def report_analysis_branch(state: AgentState) -> dict:
+    # The writer produces the narrative, so the branch skips the LLM insight call
+    output = await _run_data_analysis(state, REPORT_ANALYSIS_SECTIONS)
+    return {"collaboration_results": {"data_analysis": output}}
 
 
-def report_writer_agent(state: AgentState) -> AgentState:
-    print(f"[Report Writer] Starting")
+async def report_quality_branch(state: AgentState) -> dict:
+    output = await _run_quality_assessment(state)
+    return {"collaboration_results": {"data_quality": output}}
+
+
+REPORT_BRANCHES = {
+    "report_analysis": report_analysis_branch,
+    "report_quality": report_quality_branch,
+}
+REPORT_RESULTS = ["data_analysis", "data_quality"]
+
+
+async def run_report_branches(state: AgentState) -> dict:
+    """
+    Run every report branch outside the graph and return the merged collaboration_results
+    A report state that already carries them goes straight to the writer, so one
+    analysis can be shared by several reports on the same dataset
+    """
+    outputs = await asyncio.gather(*(branch(state) for branch in REPORT_BRANCHES.values()))
+    results = {}
+    for output in outputs:
+        results = _merge_results(results, output["collaboration_results"])
+    return results
+
+
+async def report_writer_agent(state: AgentState) -> AgentState:
+    log_event("report_writer", "start")
     collab = state.get("collaboration_results", {})
+    analysis = collab.get("data_analysis") or {}
+    quality = collab.get("data_quality") or {}
     
-    if not collab.get("data_analysis"):
-        print(f"[Report Writer] → Delegating to Data Analyst")
-        state["delegate_to"] = "data_analyst_agent"
-        return state
-    
-    analysis = collab["data_analysis"]
     prompt = f"""Create a concise executive report:
 
 **Analysis:** {analysis.get('analysis_report', 'N/A')}
-**Quality:** {analysis.get('quality_report', 'N/A')}
+**Quality:** {quality.get('quality_report') or analysis.get('quality_report', 'N/A')}
 
 Format as:
 1. Executive Summary (2-3 sentences)
 2. Key Findings (3 bullets)
 3. Recommendations (2-3 bullets)"""
     
-    response = llm.invoke([HumanMessage(content=prompt)])
-    state["final_output"] = {"report": response.content}
+    try:
+        response = await llm.ainvoke([HumanMessage(content=prompt)], deadline=state.get("deadline"))
+        state["final_output"] = {"report": response.content}
+    except Exception as e:
+        # Out of LLM budget: return the computed sections instead of failing the request
+        from tools import deterministic_insights
+        log_event("report_writer", "fallback", level="warning", reason=type(e).__name__)
+        state["final_output"] = {
+            "report": "\n\n".join([
+                "**Key Findings**\n" + deterministic_insights(analysis),
+                analysis.get("analysis_report", ""),
+                quality.get("quality_report") or analysis.get("quality_report", ""),
+            ]).strip(),
+            "fallback": True
+        }
     state["next_agent"] = "end"
-    print(f"[Report Writer] ✓ Complete")
+    log_event("report_writer", "complete")
     return state
 
 
+def _instrumented(name: str, node):
+    """Wrap a graph node with a trace span plus execution-time and in-flight metrics"""
+    if asyncio.iscoroutinefunction(node):
+        async def run(state):
+            NODES_IN_FLIGHT.labels(node=name).inc()
+            try:
+                with start_span("graph.node", node=name), timed(NODE_DURATION, with_status=True, node=name):
+                    return await node(state)
+            finally:
+                NODES_IN_FLIGHT.labels(node=name).dec()
+    else:
+        def run(state):
+            NODES_IN_FLIGHT.labels(node=name).inc()
+            try:
+                with start_span("graph.node", node=name), timed(NODE_DURATION, with_status=True, node=name):
+                    return node(state)
+            finally:
+                NODES_IN_FLIGHT.labels(node=name).dec()
+    return run
+
+
 def create_agent_graph():
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(AgentState)
     
-    workflow.add_node("router", router_agent)
-    workflow.add_node("meeting_agent", meeting_agent)
-    workflow.add_node("data_analyst_agent", data_analyst_agent)
-    workflow.add_node("quality_agent", quality_agent)
-    workflow.add_node("report_writer_agent", report_writer_agent)
+    nodes = {
+        "router": router_agent,
+        "meeting_agent": meeting_agent,
+        "data_analyst_agent": data_analyst_agent,
+        "quality_agent": quality_agent,
+        "report_writer_agent": report_writer_agent,
+        **REPORT_BRANCHES,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, _instrumented(name, node))
     
     workflow.set_entry_point("router")
     
-    def route_from_router(state: AgentState) -> str:
+    def route_from_router(state: AgentState) -> str | list[str]:
+        if state["next_agent"] == "report_writer_agent":
+            collab = state.get("collaboration_results") or {}
+            if all(key in collab for key in REPORT_RESULTS):
+                # Precomputed by run_report_branches
+                return "report_writer_agent"
+            # Fan out: all report branches run concurrently in one superstep
+            return list(REPORT_BRANCHES)
         return state["next_agent"]
     
     workflow.add_conditional_edges(
@@ -393,12 +776,15 @@ def create_agent_graph():
             "data_analyst_agent": "data_analyst_agent",
             "quality_agent": "quality_agent",
             "report_writer_agent": "report_writer_agent",
+            **{name: name for name in REPORT_BRANCHES},
         }
     )
+    # Fan in: the writer waits for every branch
+    workflow.add_edge(list(REPORT_BRANCHES), "report_writer_agent")
     
     def route_from_agent(state: AgentState) -> str:
         next_agent = state.get("next_agent", "end")
-        print(f"[Routing] next_agent = {next_agent}")
+        log_event("graph", "route", next_agent=next_agent)
         return next_agent
     
     for agent in ["data_analyst_agent", "quality_agent", "report_writer_agent"]:
@@ -416,5 +802,23 @@ def create_agent_graph():
     return workflow.compile()
 
 
-agent_graph = create_agent_graph()
-print("✓ LangGraph: All columns listed, Stats, Correlations, Outliers, Meetings, Chat")
+_agent_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_agent_graph():
+    """Compiled graph, built on first use (or by warmup) rather than at import"""
+    global _agent_graph
+    if _agent_graph is None:
+        with _graph_lock:
+            if _agent_graph is None:
+                _agent_graph = create_agent_graph()
+                log_event("graph", "compiled", nodes=len(_agent_graph.nodes))
+    return _agent_graph
+
+
+def __getattr__(name):
+    # `from agents.orchestrator import agent_graph` keeps working, compiled lazily
+    if name == "agent_graph":
+        return get_agent_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,84 @@
+"""
+Process warmup
+Pre-imports the data stack, creates the LLM client, compiles the agent graph and
+starts the analysis pool so the first request does not pay for them; GET /ready reports the state
+"""
+
+import threading
+import time
+from config.settings import settings
+from services.tracing import log_event
+
+
+warmup_state = {
+    "status": "pending",
+    "steps": {},
+    "error": None,
+    "duration_ms": None,
+}
+_lock = threading.Lock()
+
+
+def _import_data_stack() -> None:
+    import numpy
+    import pandas
+    import tools
+    try:
+        import pyarrow  # Arrow / Parquet uploads
+    except ImportError:
+        pass
+
+
+def _create_llm_client() -> str | None:
+    from .orchestrator import llm
+    if not settings.gemini_api_key:
+        return "skipped: GEMINI_API_KEY not configured"
+    llm.model  # first access creates the client
+    return None
+
+
+def _compile_graph() -> None:
+    from .orchestrator import get_agent_graph
+    get_agent_graph()
+
+
+def _start_executor() -> None:
+    from .executor import get_executor
+    get_executor()
+
+
+WARMUP_STEPS = {
+    "data_stack": _import_data_stack,
+    "llm_client": _create_llm_client,
+    "graph": _compile_graph,
+    "executor": _start_executor,
+}
+
+
+def warmup() -> dict:
+    """Run every warmup step once (thread-safe, later calls return the recorded state)"""
+    with _lock:
+        if warmup_state["status"] in ("ready", "failed"):
+            return warmup_state
+        warmup_state["status"] = "warming"
+        started = time.perf_counter()
+        try:
+            for name, step in WARMUP_STEPS.items():
+                step_started = time.perf_counter()
+                note = step()
+                warmup_state["steps"][name] = note or round((time.perf_counter() - step_started) * 1000, 1)
+            warmup_state["status"] = "ready"
+        except Exception as e:
+            warmup_state["status"] = "failed"
+            warmup_state["error"] = f"{type(e).__name__}: {e}"
+        warmup_state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        log_event(
+            "warmup", warmup_state["status"],
+            level="error" if warmup_state["status"] == "failed" else "info",
+            duration_ms=warmup_state["duration_ms"], steps=warmup_state["steps"], error=warmup_state.get("error")
+        )
+        return warmup_state
+
+
+def is_ready() -> bool:
+    return warmup_state["status"] == "ready"
@@ -5,15 +5,49 @@ from pathlib import Path
 backend_root = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_root))
 
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
-from api.routes import analysis, meetings, reports
+from api.routes import analysis, dashboards, jobs, meetings, reports, schedules
+from api.tracing import trace_request
+from agents import is_ready, warmup, warmup_state
+from agents.executor import shutdown_executor
+from agents.orchestrator import llm
+from services import job_manager, report_scheduler
+from services.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, render_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: warm up the process, start the background job workers and the report scheduler
+    Shutdown: stop background jobs and the scheduler, then release the analysis worker pool
+    """
+    if settings.warmup_mode == "blocking":
+        # Uvicorn only starts accepting connections once startup returns
+        await asyncio.get_running_loop().run_in_executor(None, warmup)
+    elif settings.warmup_mode == "background":
+        app.state.warmup = asyncio.get_running_loop().run_in_executor(None, warmup)
+    job_manager.start()
+    if settings.scheduler_enabled:
+        report_scheduler.start()
+    
+    yield
+    
+    await report_scheduler.shutdown()
+    await job_manager.shutdown()
+    shutdown_executor()
+
 
 app = FastAPI(
     title="InsightFlow AI Backend",
     description="LangGraph Multi-Agent Backend for InsightFlow Analytics Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for Next.js frontend
@@ -25,10 +59,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request latency per route template (until the response starts) and in-flight gauge"""
+    started = time.perf_counter()
+    status = 500
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            # Unmatched paths share one label to keep cardinality bounded
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+
+
+# Registered last so it is outermost: the trace span covers the metrics middleware too
+app.middleware("http")(trace_request)
+
+
 # Include routers
 app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
 app.include_router(meetings.router, prefix="/api/meetings", tags=["meetings"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(schedules.router, prefix="/api/schedules", tags=["schedules"])
+app.include_router(dashboards.router, prefix="/api/dashboards", tags=["dashboards"])
 
 
 @app.get("/")
@@ -54,6 +116,27 @@ async def health():
     }
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until warmup (imports, LLM client, graph) has finished"""
+    if settings.warmup_mode == "off" or is_ready():
+        return {"status": "ready", "warmup": warmup_state}
+    return JSONResponse(status_code=503, content={"status": warmup_state["status"], "warmup": warmup_state})
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """LLM gateway counters (queued, coalesced, retried calls) and limiter headroom"""
+    return llm.stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,9 +1,28 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from agents import agent_graph, AgentState
+import asyncio
+import os
+import time
+import traceback
+from fastapi import APIRouter, HTTPException, Query, Request
+from starlette.datastructures import UploadFile
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Dict, Any, Optional, Literal
+from agents import AgentState, get_agent_graph
+from agents.executor import run_cpu_bound
+from api.sse import run_graph_with_progress
+from api.tracing import TracedRoute
+from config.settings import settings
+from services import analysis_cache, dataset_store, fingerprint, profile_store
+from services.metrics import DATAFRAME_BUILD, timed
+from services.tracing import log_event, start_span
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+
+AnalysisSection = Literal["statistics", "correlations", "outliers", "quality", "insights"]
+QuantileMode = Literal["exact", "approximate"]
+OutlierMethod = Literal["iqr", "zscore", "mad"]
+CorrelationMode = Literal["matrix", "top_k", "threshold", "compact"]
+CorrelationMethod = Literal["pearson", "spearman", "kendall"]
+AnalysisMode = Literal["standard", "fast"]
 
 
 class AnalysisRequest(BaseModel):
@@ -12,6 +31,44 @@ class AnalysisRequest(BaseModel):
     dataset_id: str
     data: List[Dict[str, Any]]
     columns: List[str]
+    # Subset of sections to compute; None computes everything
+    sections: Optional[List[AnalysisSection]] = None
+    # Median / IQR quantiles: exact sort or KLL sketch (defaults from settings)
+    quantile_mode: Optional[QuantileMode] = None
+    quantile_epsilon: Optional[float] = Field(None, gt=0, lt=1)
+    # Outlier methods (IQR summary is always included), fence multiplier and
+    # number of most extreme rows to return per column
+    outlier_methods: Optional[List[OutlierMethod]] = None
+    outlier_fence: Optional[float] = Field(None, gt=0)
+    outlier_top_n: int = Field(0, ge=0, le=1000)
+    # Correlation output shape: full matrix, strongest pairs, |r| >= threshold
+    # or a compact upper-triangle array
+    correlation_mode: Optional[CorrelationMode] = None
+    correlation_top_k: Optional[int] = Field(None, ge=1)
+    correlation_threshold: Optional[float] = Field(None, ge=0, le=1)
+    # Rank correlations and categorical associations (Cramér's V, correlation ratio)
+    correlation_method: Optional[CorrelationMethod] = None
+    categorical_associations: Optional[bool] = None
+    # fast: rule-based insights from the computed results, no LLM call
+    mode: Optional[AnalysisMode] = None
+    # Request deadline; LLM insights fall back to computed ones when it runs short
+    timeout_seconds: Optional[float] = Field(None, gt=0)
+    
+    def options(self) -> dict:
+        """Analysis options passed to the graph (None means the settings default)"""
+        return {
+            "quantile_mode": self.quantile_mode,
+            "quantile_epsilon": self.quantile_epsilon,
+            "outlier_methods": self.outlier_methods,
+            "outlier_fence": self.outlier_fence,
+            "outlier_top_n": self.outlier_top_n,
+            "correlation_mode": self.correlation_mode,
+            "correlation_top_k": self.correlation_top_k,
+            "correlation_threshold": self.correlation_threshold,
+            "correlation_method": self.correlation_method,
+            "categorical_associations": self.categorical_associations,
+            "analysis_mode": self.mode
+        }
 
 
 class AnalysisResponse(BaseModel):
@@ -21,59 +78,475 @@ class AnalysisResponse(BaseModel):
     analysis_report: str
     statistics: Optional[Dict[str, Any]] = {}
     correlations: Optional[Dict[str, Any]] = {}
+    correlation_method: Optional[str] = None
+    associations: Optional[Dict[str, Any]] = {}
     outliers: Optional[Dict[str, Any]] = {}
     quality_score: Optional[float] = 0
+    sections_computed: List[str] = []
+    # "llm", "rules" (mode=fast) or "fallback" (deadline / LLM exhausted)
+    insights_source: Optional[str] = None
+    cached: bool = False
     error: Optional[str] = None
 
 
+async def _run_analysis(
+    user_id: str,
+    dataset_id: str,
+    sections: Optional[List[str]],
+    options: dict,
+    data: Optional[List[Dict[str, Any]]] = None,
+    frame: Any = None,
+    source: Optional[dict] = None,
+    columns: Optional[List[str]] = None,
+    timeout_seconds: Optional[float] = None,
+    on_node=None
+) -> dict:
+    """
+    Run the analysis graph and shape its output as an AnalysisResponse dict
+    on_node: optional async callback invoked with each graph node as it completes
+    """
+    # Create initial state
+    initial_state: AgentState = {
+        "messages": [],
+        "task_type": "data_analysis",
+        "user_id": user_id,
+        "dataset_id": dataset_id,
+        "data": data,
+        "frame": frame,
+        "source": source,
+        "columns": columns,
+        "company_name": None,
+        "topic": None,
+        "context": None,
+        "participants": None,
+        "meeting_mode": None,
+        "sections": sections,
+        "analysis_options": options,
+        "deadline": time.time() + (timeout_seconds or settings.request_deadline_seconds),
+        "next_agent": "",
+        "delegate_to": None,
+        "collaboration_results": {},
+        "final_output": None
+    }
+    
+    # Run the agent graph
+    if on_node is None:
+        result = await get_agent_graph().ainvoke(initial_state)
+        output = result.get("final_output", {})
+    else:
+        output = await run_graph_with_progress(get_agent_graph(), initial_state, on_node)
+    
+    # Return complete analysis data
+    return {
+        "success": True,
+        "quality_report": output.get("quality_report", ""),
+        "analysis_report": output.get("analysis_report", ""),
+        "statistics": output.get("statistics", {}),
+        "correlations": output.get("correlations", {}),
+        "correlation_method": output.get("correlation_method"),
+        "associations": output.get("associations", {}),
+        "outliers": output.get("outliers", {}),
+        "quality_score": output.get("quality_score", 0),
+        "sections_computed": output.get("sections_computed", []),
+        "insights_source": output.get("insights_source"),
+        # Fallback insights are not cached so the next request can try the LLM again
+        "_complete": "sections_computed" in output and output.get("insights_source") != "fallback"
+    }
+
+
+async def _cached(content: Any, options: dict, compute) -> dict:
+    """Serve compute() through the analysis cache, keyed by content + options"""
+    if not settings.analysis_cache_enabled:
+        response = await compute()
+        cached = False
+    else:
+        # Hashing serializes every row: keep it off the event loop for large payloads
+        key = await asyncio.to_thread(fingerprint, content, options)
+        response, cached = await analysis_cache.get_or_compute(
+            key,
+            compute,
+            should_cache=lambda value: value["_complete"]
+        )
+    
+    response = {k: v for k, v in response.items() if k != "_complete"}
+    response["cached"] = cached
+    return response
+
+
 @router.post("/analyze")
 async def analyze_data(request: AnalysisRequest):
     """
     Analyze dataset using LangGraph orchestrator
     Returns complete analysis with stats, correlations, and outliers
+    Identical datasets + options are served from the analysis cache
     """
     try:
-        # Create initial state
-        initial_state: AgentState = {
-            "messages": [],
-            "task_type": "data_analysis",
-            "user_id": request.user_id,
-            "dataset_id": request.dataset_id,
-            "data": request.data,
-            "columns": request.columns,
-            "company_name": None,
-            "topic": None,
-            "context": None,
-            "participants": None,
-            "next_agent": "",
-            "delegate_to": None,
-            "collaboration_results": {},
-            "final_output": None
-        }
-        
-        # Run the agent graph
-        result = agent_graph.invoke(initial_state)
-        output = result.get("final_output", {})
+        return await _cached(
+            request.data,
+            {
+                "task_type": "data_analysis",
+                "sections": sorted(request.sections) if request.sections else None,
+                **request.options()
+            },
+            lambda: _run_analysis(
+                request.user_id,
+                request.dataset_id,
+                request.sections,
+                request.options(),
+                data=request.data,
+                columns=request.columns,
+                timeout_seconds=request.timeout_seconds
+            )
+        )
+    
+    except Exception as e:
+        log_event("analysis_api", "analyze_error", level="error", dataset_id=request.dataset_id, error=str(e), traceback=traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+
+async def _upload_chunks(upload: UploadFile, chunk_size: int = 1024 * 1024):
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def _spool_request(request: Request, format: Optional[str]) -> tuple[str, str, str, int]:
+    """
+    Spool a multipart ("file" field) or raw-body upload to a temporary file
+    Returns (path, format, sha256 digest, size); the caller removes the file
+    """
+    from tools import detect_format, spool_upload
+    
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise ValueError("Multipart upload must include a 'file' field")
+        fmt = detect_format(format, upload.content_type, upload.filename)
+        chunks = _upload_chunks(upload)
+    else:
+        fmt = detect_format(format, content_type)
+        chunks = request.stream()
+    path, digest, size = await spool_upload(chunks, settings.upload_max_bytes)
+    return path, fmt, digest, size
+
+
+@router.post("/analyze/upload")
+async def analyze_upload(
+    request: Request,
+    user_id: str,
+    dataset_id: str,
+    format: Optional[str] = None,
+    sections: Optional[List[AnalysisSection]] = Query(None),
+    streaming: bool = False,
+    quantile_mode: Optional[QuantileMode] = None,
+    quantile_epsilon: Optional[float] = Query(None, gt=0, lt=1),
+    outlier_methods: Optional[List[OutlierMethod]] = Query(None),
+    outlier_fence: Optional[float] = Query(None, gt=0),
+    outlier_top_n: int = Query(0, ge=0, le=1000),
+    correlation_mode: Optional[CorrelationMode] = None,
+    correlation_top_k: Optional[int] = Query(None, ge=1),
+    correlation_threshold: Optional[float] = Query(None, ge=0, le=1),
+    correlation_method: Optional[CorrelationMethod] = None,
+    categorical_associations: Optional[bool] = None,
+    mode: Optional[AnalysisMode] = None,
+    timeout_seconds: Optional[float] = Query(None, gt=0)
+):
+    """
+    Analyze a CSV, Arrow IPC or Parquet file without the JSON row overhead
+    Accepts a multipart upload (field "file") or the raw file as the request body;
+    the format comes from ?format=, the content type or the file name
+    streaming=true profiles the file chunk by chunk in bounded memory
+    (statistics, outliers, quality and insights; quantiles are always sketched)
+    """
+    import pyarrow as pa
+    from tools import read_frame
+    
+    path = None
+    options = {
+        "quantile_mode": quantile_mode,
+        "quantile_epsilon": quantile_epsilon,
+        "outlier_methods": outlier_methods,
+        "outlier_fence": outlier_fence,
+        "outlier_top_n": outlier_top_n,
+        "correlation_mode": correlation_mode,
+        "correlation_top_k": correlation_top_k,
+        "correlation_threshold": correlation_threshold,
+        "correlation_method": correlation_method,
+        "categorical_associations": categorical_associations,
+        "analysis_mode": mode
+    }
+    try:
+        path, fmt, digest, size = await _spool_request(request, format)
+        log_event("analysis_api", "upload", dataset_id=dataset_id, bytes=size, format=fmt)
         
-        # Return complete analysis data
-        return {
-            "success": True,
-            "quality_report": output.get("quality_report", ""),
-            "analysis_report": output.get("analysis_report", ""),
-            "statistics": output.get("statistics", {}),
-            "correlations": output.get("correlations", {}),
-            "outliers": output.get("outliers", {}),
-            "quality_score": output.get("quality_score", 0)
-        }
+        async def compute() -> dict:
+            if streaming:
+                return await _run_analysis(
+                    user_id,
+                    dataset_id,
+                    sections,
+                    options,
+                    source={"path": path, "format": fmt},
+                    timeout_seconds=timeout_seconds
+                )
+            with start_span("dataframe.build", source=fmt, bytes=size) as span, timed(DATAFRAME_BUILD, source=fmt):
+                try:
+                    frame = await run_cpu_bound(read_frame, path, fmt)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as e:
+                    # Malformed body: a client error, not a 500
+                    raise HTTPException(status_code=400, detail=f"Cannot read {fmt} upload: {e}")
+                span.set(rows=len(frame), columns=len(frame.columns))
+            return await _run_analysis(
+                user_id,
+                dataset_id,
+                sections,
+                options,
+                frame=frame,
+                columns=[str(col) for col in frame.columns],
+                timeout_seconds=timeout_seconds
+            )
         
+        return await _cached(
+            digest,
+            {
+                "task_type": "data_analysis",
+                "format": fmt,
+                "streaming": streaming,
+                "sections": sorted(sections) if sections else None,
+                **options
+            },
+            compute
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OverflowError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[Analysis API] Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log_event("analysis_api", "analyze_error", level="error", dataset_id=dataset_id, error=str(e), traceback=traceback.format_exc())
         raise HTTPException(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
         )
+    finally:
+        if path:
+            os.remove(path)
+
+
+def _store_upload(dataset_id: str, path: str, fmt: str) -> dict:
+    """Read a spooled upload and replace the dataset's stored rows (runs on the analysis pool)"""
+    from tools import read_frame
+    frame = read_frame(path, fmt)
+    version = dataset_store.save(dataset_id, frame)
+    return {"rows": len(frame), "columns": [str(col) for col in frame.columns], "version": version}
+
+
+@router.put("/datasets/{dataset_id}")
+async def store_dataset(dataset_id: str, request: Request, format: Optional[str] = None):
+    """
+    Store a dataset's rows for server-side jobs (queries, dashboards, scheduled reports)
+    Same body as /analyze/upload: a CSV, Arrow IPC or Parquet file, multipart or raw;
+    the rows replace any previously stored file for dataset_id
+    """
+    path = None
+    try:
+        path, fmt, _, size = await _spool_request(request, format)
+        with start_span("dataset.store", dataset_id=dataset_id, source=fmt, bytes=size) as span:
+            stored = await run_cpu_bound(_store_upload, dataset_id, path, fmt)
+            span.set(rows=stored["rows"], columns=len(stored["columns"]))
+        log_event("analysis_api", "stored", dataset_id=dataset_id, rows=stored["rows"], format=fmt)
+        return {"success": True, "dataset_id": dataset_id, **stored}
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OverflowError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        log_event("analysis_api", "store_error", level="error", dataset_id=dataset_id, error=str(e), traceback=traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Storing dataset failed: {str(e)}"
+        )
+    finally:
+        if path:
+            os.remove(path)
+
+
+class AppendRequest(BaseModel):
+    """Rows appended to a dataset whose profile is kept incrementally"""
+    user_id: str
+    data: List[Dict[str, Any]]
+    correlation_mode: Optional[CorrelationMode] = None
+    correlation_top_k: Optional[int] = Field(None, ge=1)
+    correlation_threshold: Optional[float] = Field(None, ge=0, le=1)
+    outlier_fence: Optional[float] = Field(None, gt=0)
+    
+    def shape(self) -> dict:
+        return _profile_shape(self.correlation_mode, self.correlation_top_k, self.correlation_threshold, self.outlier_fence)
+
+
+def _profile_shape(mode, top_k, threshold, fence) -> dict:
+    return {
+        "correlation_mode": mode or settings.correlation_mode,
+        "top_k": top_k or settings.correlation_top_k,
+        "threshold": threshold if threshold is not None else settings.correlation_threshold,
+        "fence": fence or settings.outlier_fence
+    }
+
+
+def _profile_response(snapshot: dict, appended: int) -> dict:
+    return {
+        "success": True,
+        "statistics": snapshot["statistics"],
+        "correlations": snapshot["correlations"],
+        "correlation_method": snapshot["correlation_method"],
+        "outliers": snapshot["outliers"],
+        "quality_score": snapshot["quality_score"],
+        "missing_by_column": snapshot["missing_by_column"],
+        "rows_total": snapshot["row_count"],
+        "rows_appended": appended,
+        "sections_computed": ["statistics", "correlations", "outliers", "quality"]
+    }
+
+
+def _append_rows(dataset_id: str, rows: List[Dict[str, Any]], shape: dict) -> dict:
+    """Fold the new rows into the stored profile (runs on the analysis pool)"""
+    import pandas as pd
+    from tools import DatasetProfile
+    
+    def apply(payload):
+        profile = DatasetProfile.from_dict(payload) if payload else DatasetProfile(settings.quantile_epsilon)
+        if rows:
+            profile.update(pd.DataFrame(rows))
+        return profile.to_dict(), profile.snapshot(**shape)
+    
+    return profile_store.update(dataset_id, apply)
+
+
+@router.post("/datasets/{dataset_id}/append")
+async def append_rows(dataset_id: str, request: AppendRequest):
+    """
+    Append rows to a dataset and return refreshed statistics, correlations,
+    outliers and quality score; only the new rows are processed
+    The first append for a dataset_id seeds its profile
+    """
+    try:
+        snapshot = await run_cpu_bound(_append_rows, dataset_id, request.data, request.shape())
+        log_event("analysis_api", "appended", dataset_id=dataset_id, rows=len(request.data), total_rows=snapshot["row_count"])
+        return _profile_response(snapshot, len(request.data))
+    except Exception as e:
+        log_event("analysis_api", "append_error", level="error", dataset_id=dataset_id, error=str(e), traceback=traceback.format_exc())
+        raise HTTPException(
+            status_code=500,
+            detail=f"Append failed: {str(e)}"
+        )
+
+
+@router.get("/datasets/{dataset_id}/profile")
+async def get_profile(
+    dataset_id: str,
+    correlation_mode: Optional[CorrelationMode] = None,
+    correlation_top_k: Optional[int] = Query(None, ge=1),
+    correlation_threshold: Optional[float] = Query(None, ge=0, le=1),
+    outlier_fence: Optional[float] = Query(None, gt=0)
+):
+    """Current incremental profile of a dataset"""
+    from tools import DatasetProfile
+    
+    # SQLite I/O: a thread, not the analysis pool where it would queue behind pandas work
+    payload = await asyncio.to_thread(profile_store.load, dataset_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="No profile for this dataset")
+    shape = _profile_shape(correlation_mode, correlation_top_k, correlation_threshold, outlier_fence)
+    return _profile_response(DatasetProfile.from_dict(payload).snapshot(**shape), 0)
+
+
+@router.delete("/datasets/{dataset_id}/profile")
+async def delete_profile(dataset_id: str):
+    """Drop the stored profile so the next append starts from scratch"""
+    deleted = await asyncio.to_thread(profile_store.delete, dataset_id)
+    return {"success": True, "deleted": deleted}
+
+
+class QueryFilter(BaseModel):
+    column: str
+    op: Literal["==", "!=", ">", ">=", "<", "<=", "in", "not_in", "is_null", "not_null", "contains"] = "=="
+    value: Any = None
+
+
+class QueryAggregate(BaseModel):
+    func: Literal["count", "sum", "mean", "min", "max", "median", "nunique"] = "count"
+    # count without a column counts rows
+    column: Optional[str] = None
+    alias: Optional[str] = None
+
+
+class QuerySort(BaseModel):
+    # A group_by key or an aggregate alias
+    column: str
+    descending: bool = False
+
+
+class QueryRequest(BaseModel):
+    """Declarative aggregation over a stored dataset (see tools/query.py)"""
+    dataset_id: str = Field(..., pattern=r"^[A-Za-z0-9_-]+$")
+    filters: List[QueryFilter] = []
+    group_by: List[str] = []
+    aggregates: List[QueryAggregate] = []
+    sort: List[QuerySort] = []
+    limit: int = Field(1000, ge=1)
+    
+    @field_validator("limit")
+    @classmethod
+    def _within_max_limit(cls, limit: int) -> int:
+        # Imported here: tools pulls in numpy, which must not load at import time
+        from tools.query import MAX_LIMIT
+        if limit > MAX_LIMIT:
+            raise ValueError(f"limit must be at most {MAX_LIMIT}")
+        return limit
+
+
+@router.post("/query")
+async def query_dataset(request: QueryRequest):
+    """
+    Filter, group and aggregate a stored dataset, e.g. sum of revenue by region where year = 2025
+    Only the aggregated rows are returned; identical queries on an unchanged dataset hit the analysis cache
+    """
+    spec = request.model_dump(exclude={"dataset_id"})
+    
+    async def compute():
+        with start_span("dataset.query", dataset_id=request.dataset_id, filters=len(request.filters)) as span:
+            result = await run_cpu_bound(dataset_store.query, request.dataset_id, spec)
+            span.set(matched_rows=result["matched_rows"], result_rows=result["row_count"])
+        return result
+    
+    try:
+        # version() stats the data file: keep it off the loop like the scan (an invalid id is a 400)
+        version = await asyncio.to_thread(dataset_store.version, request.dataset_id)
+        if version is None:
+            raise FileNotFoundError(request.dataset_id)
+        if not settings.analysis_cache_enabled:
+            return {**await compute(), "cached": False}
+        result, cached = await analysis_cache.get_or_compute(
+            fingerprint([version], {"task_type": "query", "dataset_id": request.dataset_id, **spec}),
+            compute
+        )
+        return {**result, "cached": cached}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Analysis cache counters"""
+    return analysis_cache.stats()
 
 
 @router.get("/health")
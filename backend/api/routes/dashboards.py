@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from api.tracing import TracedRoute
+from services import dashboard_evaluator
+
+router = APIRouter(route_class=TracedRoute)
+
+
+class WidgetRequest(BaseModel):
+    """A dashboard_widgets row (position is not needed to evaluate it)"""
+    id: str
+    dataset_id: str = Field(..., pattern=r"^[A-Za-z0-9_-]+$")
+    # Unsupported types get a per-widget error instead of failing the whole request
+    widget_type: str
+    title: Optional[str] = None
+    config: Dict[str, Any] = {}
+
+
+class DashboardEvaluateRequest(BaseModel):
+    refresh_interval: int = Field(300, ge=0)
+    widgets: List[WidgetRequest] = Field(..., max_length=200)
+    force_refresh: bool = False
+
+
+@router.post("/{dashboard_id}/evaluate")
+async def evaluate_dashboard(dashboard_id: str, request: DashboardEvaluateRequest):
+    """
+    Evaluate all widgets of a dashboard in one request
+    Widgets on the same dataset share one scan; results are reused until refresh_interval expires
+    """
+    result = await dashboard_evaluator.evaluate(
+        [widget.model_dump() for widget in request.widgets],
+        refresh_interval=request.refresh_interval,
+        force_refresh=request.force_refresh
+    )
+    return {"dashboard_id": dashboard_id, "refresh_interval": request.refresh_interval, **result}
+
+
+@router.get("/stats")
+async def dashboard_stats():
+    return dashboard_evaluator.stats()
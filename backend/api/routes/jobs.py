@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from api.routes.analysis import AnalysisRequest, _cached, _run_analysis
+from api.routes.reports import ReportRequest, _run_report
+from api.sse import sse_event, sse_response
+from api.tracing import TracedRoute
+from services import job_manager
+from services.jobs import TERMINAL_STATUSES
+
+router = APIRouter(route_class=TracedRoute)
+
+
+def _job_response(job: dict, include_result: bool = True) -> dict:
+    response = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "error": job["error"],
+        "cancel_requested": job["cancel_requested"],
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at")
+    }
+    if include_result:
+        response["result"] = job["result"]
+    return response
+
+
+def _request_summary(request, exclude: set) -> dict:
+    """What is stored with the job: the request minus the (potentially large) rows"""
+    summary = request.model_dump(exclude=exclude)
+    summary["rows"] = len(request.data)
+    return summary
+
+
+@router.post("/analysis", status_code=202)
+async def submit_analysis(request: AnalysisRequest):
+    """
+    Queue an analysis; returns the job id immediately
+    Same request body and result shape as /api/analysis/analyze
+    """
+    async def work(progress) -> dict:
+        return await _cached(
+            request.data,
+            {
+                "task_type": "data_analysis",
+                "sections": sorted(request.sections) if request.sections else None,
+                **request.options()
+            },
+            lambda: _run_analysis(
+                request.user_id,
+                request.dataset_id,
+                request.sections,
+                request.options(),
+                data=request.data,
+                columns=request.columns,
+                timeout_seconds=request.timeout_seconds,
+                on_node=progress
+            )
+        )
+    
+    job = await job_manager.submit("analysis", request.user_id, _request_summary(request, {"data"}), work)
+    return _job_response(job)
+
+
+@router.post("/reports", status_code=202)
+async def submit_report(request: ReportRequest):
+    """Queue a report; the result matches /api/reports/generate"""
+    async def work(progress) -> dict:
+        return (await _run_report(request, on_node=progress)).model_dump()
+    
+    job = await job_manager.submit("report", request.user_id, _request_summary(request, {"data"}), work)
+    return _job_response(job)
+
+
+@router.get("")
+async def list_jobs(user_id: Optional[str] = None, limit: int = 50):
+    """Most recent jobs, optionally for one user (results omitted)"""
+    jobs = await job_manager.call_store("list", user_id, limit)
+    return {"jobs": [_job_response(job, include_result=False) for job in jobs]}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status, per-node progress and, once succeeded, the result"""
+    job = await job_manager.call_store("get", job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events for a job: status and progress on every change,
+    ending with done (the final job including its result)
+    """
+    if await job_manager.call_store("get", job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        last = None
+        async for job in job_manager.watch(job_id):
+            if job["status"] in TERMINAL_STATUSES:
+                yield sse_event("done", _job_response(job))
+                return
+            update = _job_response(job, include_result=False)
+            if update != last:
+                yield sse_event("progress", update)
+                last = update
+    
+    return sse_response(events())
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job (no-op once it has finished)"""
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job, include_result=False)
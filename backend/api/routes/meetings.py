@@ -1,9 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
-from agents import agent_graph, AgentState
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional
+from agents import AgentState, get_agent_graph
+from api.sse import SectionSplitter, sse_event, sse_response, stream_graph
+from api.tracing import TracedRoute
+from config.settings import settings
+from services.tracing import log_event
+import asyncio
+import time
+import uuid
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 class MeetingRequest(BaseModel):
@@ -13,6 +20,14 @@ class MeetingRequest(BaseModel):
     topic: str
     context: str = ""
     participants: str = ""
+    meeting_mode: Optional[Literal["combined", "parallel"]] = None  # defaults to settings.meeting_mode
+
+
+class MeetingBatchRequest(BaseModel):
+    """Request model for batch meeting generation"""
+    items: List[MeetingRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)  # defaults to settings.meeting_batch_concurrency
+    timeout_seconds: Optional[float] = Field(None, gt=0)  # per item; defaults to settings.meeting_batch_timeout_seconds
 
 
 class MeetingResponse(BaseModel):
@@ -23,44 +38,55 @@ class MeetingResponse(BaseModel):
     error: str = None
 
 
+MEETING_MARKERS = {"**RESEARCH:**": "research", "**AGENDA:**": "agenda"}
+
+
+def _initial_state(request: MeetingRequest, timeout_seconds: Optional[float] = None) -> AgentState:
+    return {
+        "messages": [],
+        "task_type": "meeting",
+        "user_id": request.user_id,
+        "dataset_id": None,
+        "data": None,
+        "frame": None,
+        "source": None,
+        "columns": None,
+        "company_name": request.company_name,
+        "topic": request.topic,
+        "context": request.context,
+        "participants": request.participants,
+        "meeting_mode": request.meeting_mode,
+        "sections": None,
+        "analysis_options": None,
+        "deadline": time.time() + (timeout_seconds or settings.generation_deadline_seconds),
+        "next_agent": "",
+        "delegate_to": None,
+        "collaboration_results": {},
+        "final_output": None
+    }
+
+
 @router.post("/generate")
 async def generate_meeting(request: MeetingRequest):
     """
     Generate meeting agenda and research using LangGraph orchestrator
     """
     try:
-        # Create initial state
-        initial_state: AgentState = {
-            "messages": [],
-            "task_type": "meeting",
-            "user_id": request.user_id,
-            "dataset_id": None,
-            "data": None,
-            "columns": None,
-            "company_name": request.company_name,
-            "topic": request.topic,
-            "context": request.context,
-            "participants": request.participants,
-            "next_agent": "",
-            "delegate_to": None,
-            "collaboration_results": {},
-            "final_output": None
-        }
-        
         # Run the agent graph
-        result = agent_graph.invoke(initial_state)
+        result = await get_agent_graph().ainvoke(_initial_state(request))
         
         output = result.get("final_output", {})
         
         # Generate a meeting ID (in production, save to database)
-        import uuid
         meeting_id = str(uuid.uuid4())
         
         return {
             "success": True,
             "meeting_id": meeting_id,
             "agenda": output.get("agenda", ""),
-            "research": output.get("research", "")
+            "research": output.get("research", ""),
+            "mode": output.get("mode"),
+            "latency_ms": output.get("latency_ms", {})
         }
         
     except Exception as e:
@@ -70,6 +96,135 @@ async def generate_meeting(request: MeetingRequest):
         )
 
 
+def _replay_sections(output: dict) -> list:
+    """Section text for a meeting served without tokens (LLM cache hit or coalesced call)"""
+    if output.get("error"):
+        return []
+    if output.get("mode") == "parallel":
+        return [(output.get(section, ""), [f"meeting_section:{section}"]) for section in ("research", "agenda")]
+    return [(f"**RESEARCH:**\n{output.get('research', '')}\n\n**AGENDA:**\n{output.get('agenda', '')}", [])]
+
+
+@router.post("/generate/stream")
+async def generate_meeting_stream(request: MeetingRequest):
+    """
+    Stream meeting generation as server-sent events:
+    node (graph progress), research / agenda (text deltas as tokens arrive),
+    done (final split, same shape as /generate) or error
+    """
+    async def events():
+        splitter = SectionSplitter(MEETING_MARKERS, initial="research")
+        try:
+            async for item in stream_graph(get_agent_graph(), _initial_state(request), {"meeting_agent"}, replay=_replay_sections):
+                kind = item[0]
+                if kind == "node":
+                    yield sse_event("node", {"node": item[1]})
+                elif kind == "token":
+                    # Parallel mode tags each section's call; combined mode is split on markers
+                    tagged = [t.split(":", 1)[1] for t in item[3] if t.startswith("meeting_section:")]
+                    if tagged:
+                        yield sse_event(tagged[0], {"delta": item[2]})
+                        continue
+                    for section, delta in splitter.feed(item[2]):
+                        yield sse_event(section, {"delta": delta})
+                else:
+                    for section, delta in splitter.flush():
+                        yield sse_event(section, {"delta": delta})
+                    output = item[1] or {}
+                    yield sse_event("done", {
+                        "success": True,
+                        "meeting_id": str(uuid.uuid4()),
+                        "agenda": output.get("agenda", ""),
+                        "research": output.get("research", ""),
+                        "mode": output.get("mode"),
+                        "latency_ms": output.get("latency_ms", {})
+                    })
+        except Exception as e:
+            log_event("meetings_api", "stream_error", level="error", error=str(e))
+            yield sse_event("error", {"detail": f"Meeting generation failed: {str(e)}"})
+    
+    return sse_response(events())
+
+
+async def _generate_batch_item(index: int, request: MeetingRequest, semaphore: asyncio.Semaphore, timeout: float) -> dict:
+    """One batch item; failures and timeouts become an error result instead of aborting the batch"""
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(get_agent_graph().ainvoke(_initial_state(request, timeout)), timeout)
+            output = result.get("final_output") or {}
+            # The meeting node turns LLM failures (quota, timeouts) into error text plus an error flag
+            if output.get("error"):
+                raise RuntimeError(output["error"])
+            return {
+                "index": index,
+                "success": True,
+                "meeting_id": str(uuid.uuid4()),
+                "company_name": request.company_name,
+                "topic": request.topic,
+                "agenda": output.get("agenda", ""),
+                "research": output.get("research", ""),
+                "mode": output.get("mode"),
+                "latency_ms": output.get("latency_ms", {})
+            }
+        except asyncio.TimeoutError:
+            error = f"Timed out after {timeout:g}s"
+        except Exception as e:
+            error = f"Meeting generation failed: {str(e)}"
+        log_event("meetings_api", "batch_item_failed", level="error", index=index, company=request.company_name, error=error)
+        return {
+            "index": index,
+            "success": False,
+            "company_name": request.company_name,
+            "topic": request.topic,
+            "error": error,
+            "latency_ms": {"total_ms": round((time.perf_counter() - started) * 1000, 1)}
+        }
+
+
+@router.post("/generate/batch")
+async def generate_meeting_batch(request: MeetingBatchRequest):
+    """
+    Generate many meeting packages with bounded concurrency, streamed as
+    server-sent events: one result event per item in completion order
+    (index refers to the position in items), then done with totals
+    """
+    if len(request.items) > settings.meeting_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.meeting_batch_max_items} items"
+        )
+    concurrency = request.concurrency or settings.meeting_batch_concurrency
+    timeout = request.timeout_seconds or settings.meeting_batch_timeout_seconds
+    
+    async def events():
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.ensure_future(_generate_batch_item(index, item, semaphore, timeout))
+            for index, item in enumerate(request.items)
+        ]
+        started = time.perf_counter()
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                succeeded += result["success"]
+                yield sse_event("result", result)
+            yield sse_event("done", {
+                "total": len(tasks),
+                "succeeded": succeeded,
+                "failed": len(tasks) - succeeded,
+                "concurrency": concurrency,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+        finally:
+            # Client went away mid-batch: stop the remaining generations
+            for task in tasks:
+                task.cancel()
+    
+    return sse_response(events())
+
+
 @router.get("/health")
 async def health_check():
     """Health check for meetings service"""
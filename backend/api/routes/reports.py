@@ -1,9 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from agents import agent_graph, AgentState
+from agents import AgentState, get_agent_graph
+from api.sse import run_graph_with_progress, sse_event, sse_response, stream_graph
+from api.tracing import TracedRoute
+from config.settings import settings
+from services.tracing import log_event
+import time
+import traceback
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 class ReportRequest(BaseModel):
@@ -18,9 +24,50 @@ class ReportResponse(BaseModel):
     """Response model for report generation"""
     success: bool
     report: str
+    fallback: bool = False  # LLM budget exhausted; report assembled from computed results
     error: Optional[str] = None
 
 
+def _initial_state(request: ReportRequest) -> AgentState:
+    return {
+        "messages": [],
+        "task_type": "report",
+        "user_id": request.user_id,
+        "dataset_id": request.dataset_id,
+        "data": request.data,
+        "frame": None,
+        "source": None,
+        "columns": request.columns,
+        "company_name": None,
+        "topic": None,
+        "context": None,
+        "participants": None,
+        "meeting_mode": None,
+        "sections": None,
+        "analysis_options": None,
+        "deadline": time.time() + settings.generation_deadline_seconds,
+        "next_agent": "",
+        "delegate_to": None,
+        "collaboration_results": {},
+        "final_output": None
+    }
+
+
+async def _run_report(request: ReportRequest, on_node=None) -> ReportResponse:
+    """Run the report graph; on_node is an optional async per-node progress callback"""
+    if on_node is None:
+        result = await get_agent_graph().ainvoke(_initial_state(request))
+        output = result.get("final_output", {})
+    else:
+        output = await run_graph_with_progress(get_agent_graph(), _initial_state(request), on_node)
+    
+    return ReportResponse(
+        success=True,
+        report=output.get("report", ""),
+        fallback=output.get("fallback", False)
+    )
+
+
 @router.post("/generate", response_model=ReportResponse)
 async def generate_report(request: ReportRequest):
     """
@@ -28,44 +75,48 @@ async def generate_report(request: ReportRequest):
     Routes to Report Writer agent automatically
     """
     try:
-        # Create initial state
-        initial_state: AgentState = {
-            "messages": [],
-            "task_type": "report",
-            "user_id": request.user_id,
-            "dataset_id": request.dataset_id,
-            "data": request.data,
-            "columns": request.columns,
-            "company_name": None,
-            "topic": None,
-            "context": None,
-            "participants": None,
-            "next_agent": "",
-            "delegate_to": None,
-            "collaboration_results": {},
-            "final_output": None
-        }
-        
-        # Run the agent graph
-        result = agent_graph.invoke(initial_state)
-        
-        output = result.get("final_output", {})
-        
-        return ReportResponse(
-            success=True,
-            report=output.get("report", "")
-        )
+        return await _run_report(request)
         
     except Exception as e:
-        print(f"[Reports API] Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log_event("reports_api", "error", level="error", error=str(e), traceback=traceback.format_exc())
         raise HTTPException(
             status_code=500,
             detail=f"Report generation failed: {str(e)}"
         )
 
 
+@router.post("/generate/stream")
+async def generate_report_stream(request: ReportRequest):
+    """
+    Stream report generation as server-sent events:
+    node (graph progress), token (report text deltas),
+    done (same shape as /generate) or error
+    """
+    async def events():
+        try:
+            async for item in stream_graph(
+                get_agent_graph(), _initial_state(request), {"report_writer_agent"},
+                replay=lambda output: [(output.get("report", ""), [])]
+            ):
+                kind = item[0]
+                if kind == "node":
+                    yield sse_event("node", {"node": item[1]})
+                elif kind == "token":
+                    yield sse_event("token", {"delta": item[2]})
+                else:
+                    output = item[1] or {}
+                    yield sse_event("done", {
+                        "success": True,
+                        "report": output.get("report", ""),
+                        "fallback": output.get("fallback", False)
+                    })
+        except Exception as e:
+            log_event("reports_api", "stream_error", level="error", error=str(e))
+            yield sse_event("error", {"detail": f"Report generation failed: {str(e)}"})
+    
+    return sse_response(events())
+
+
 @router.get("/health")
 async def health_check():
     """Health check for reports service"""
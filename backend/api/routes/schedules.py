@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from api.tracing import TracedRoute
+from services import report_scheduler, schedule_store
+from services.scheduler import next_run_after
+import asyncio
+import time
+import uuid
+
+router = APIRouter(route_class=TracedRoute)
+
+
+class ScheduleRequest(BaseModel):
+    """Same fields as the scheduled_reports rows written by the frontend"""
+    user_id: str
+    dataset_id: str = Field(..., pattern=r"^[A-Za-z0-9_-]+$")
+    title: str
+    description: Optional[str] = None
+    frequency: Literal["daily", "weekly", "monthly"]
+    day_of_week: Optional[int] = Field(None, ge=0, le=6)
+    day_of_month: Optional[int] = Field(None, ge=1, le=31)
+    time_of_day: str = Field("09:00", pattern=r"^([01]\d|2[0-3]):[0-5]\d(:[0-5]\d)?$")
+    email_recipients: List[str] = []
+    report_type: str = "scheduled"
+
+
+@router.post("", status_code=201)
+async def create_schedule(request: ScheduleRequest):
+    """Add a scheduled report; next_run_at is the first occurrence after now (UTC)"""
+    now = time.time()
+    schedule = {
+        "id": str(uuid.uuid4()),
+        **request.model_dump(),
+        "is_active": 1,
+        "next_run_at": next_run_after(request.model_dump(), now),
+        "created_at": now,
+        "updated_at": now,
+    }
+    await asyncio.to_thread(schedule_store.create, schedule)
+    return {**schedule, "is_active": True}
+
+
+@router.get("")
+async def list_schedules(user_id: Optional[str] = None, limit: int = 50):
+    return {"schedules": await asyncio.to_thread(schedule_store.list, user_id, limit)}
+
+
+@router.post("/run-due")
+async def run_due():
+    """Run one scheduler tick now (claims due reports like the background loop does)"""
+    return await report_scheduler.tick()
+
+
+@router.get("/stats")
+async def scheduler_stats():
+    return report_scheduler.stats()
+
+
+@router.get("/{schedule_id}/reports")
+async def list_reports(schedule_id: str, limit: int = 20):
+    """Reports generated for a schedule, newest first"""
+    if await asyncio.to_thread(schedule_store.get, schedule_id) is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {"reports": await asyncio.to_thread(schedule_store.list_reports, schedule_id, limit)}
@@ -0,0 +1,129 @@
+"""
+Server-sent events helpers for the streaming generation endpoints
+"""
+
+import json
+from typing import Any, AsyncIterator
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one SSE frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async generator of SSE frames, disabling proxy buffering"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def chunk_text(chunk) -> str:
+    """Text of an LLM message chunk (Gemini may return a list of content parts)"""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return ""
+
+
+async def stream_graph(graph, initial_state: dict, token_nodes: set, replay=None) -> AsyncIterator[tuple]:
+    """
+    Run the graph, yielding ("node", name), ("token", node, text, tags) and finally
+    ("final", final_output) as they happen.
+    Tokens are only forwarded for nodes in token_nodes. Answers served from the LLM
+    cache or a coalesced call produce no tokens, so replay(final_output) returns
+    [(text, tags), ...] to emit for a token node before its "node" event; an entry
+    is skipped when the node already streamed tokens carrying all of its tags
+    """
+    final_output = None
+    streamed: dict = {}
+    async for mode, chunk in graph.astream(initial_state, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            node = metadata.get("langgraph_node")
+            if node in token_nodes:
+                text = chunk_text(message)
+                if text:
+                    tags = metadata.get("tags", [])
+                    streamed.setdefault(node, []).append(set(tags))
+                    yield ("token", node, text, tags)
+        elif mode == "updates":
+            for node, update in chunk.items():
+                output = update.get("final_output") if isinstance(update, dict) else None
+                if replay is not None and node in token_nodes and output is not None:
+                    for text, tags in replay(output):
+                        if text and not any(set(tags) <= seen for seen in streamed.get(node, [])):
+                            yield ("token", node, text, tags)
+                yield ("node", node)
+                if output is not None:
+                    final_output = output
+    yield ("final", final_output)
+
+
+async def run_graph_with_progress(graph, initial_state: dict, on_node) -> dict:
+    """Run the graph, awaiting on_node(name) after each node; returns final_output"""
+    final_output = {}
+    async for item in stream_graph(graph, initial_state, set()):
+        if item[0] == "node":
+            await on_node(item[1])
+        elif item[0] == "final":
+            final_output = item[1] or {}
+    return final_output
+
+
+class SectionSplitter:
+    """
+    Incrementally splits a token stream into named sections at marker strings.
+    Text that could be the start of a marker is held back until the next
+    token decides it, so markers never leak into section content.
+    """
+    
+    def __init__(self, markers: dict, initial: str):
+        self.markers = markers
+        self.section = initial
+        self.buffer = ""
+        self.max_hold = max(len(m) for m in markers) - 1
+    
+    def _held(self) -> int:
+        """Length of the longest buffer suffix that is a proper prefix of a marker"""
+        for k in range(min(self.max_hold, len(self.buffer)), 0, -1):
+            tail = self.buffer[-k:]
+            if any(m.startswith(tail) for m in self.markers):
+                return k
+        return 0
+    
+    def feed(self, text: str) -> list:
+        """Add text; returns [(section, delta), ...] that are safe to emit"""
+        self.buffer += text
+        out = []
+        while True:
+            hits = [(self.buffer.find(m), m) for m in self.markers if m in self.buffer]
+            if not hits:
+                break
+            index, marker = min(hits)
+            if index:
+                out.append((self.section, self.buffer[:index]))
+            self.section = self.markers[marker]
+            self.buffer = self.buffer[index + len(marker):]
+        
+        held = self._held()
+        ready = self.buffer[:len(self.buffer) - held]
+        if ready:
+            out.append((self.section, ready))
+        self.buffer = self.buffer[len(self.buffer) - held:]
+        return out
+    
+    def flush(self) -> list:
+        """Emit whatever is still held back at end of stream"""
+        out = [(self.section, self.buffer)] if self.buffer else []
+        self.buffer = ""
+        return out
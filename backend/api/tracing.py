@@ -0,0 +1,83 @@
+"""
+HTTP side of request tracing
+The middleware continues the caller's W3C traceparent (the Next.js API routes
+send one) and opens the root span; TracedRoute adds a request.parse span for
+body reading and validation before the endpoint runs
+"""
+
+import asyncio
+import contextvars
+import functools
+import time
+from fastapi import Request
+from fastapi.routing import APIRoute
+from services.tracing import record_span, start_span
+
+
+# Timings the frontend measured before calling us, e.g. "supabase_fetch=123.4;serialize=5"
+UPSTREAM_TIMING_HEADER = "x-insightflow-timing"
+
+_parse_started: contextvars.ContextVar[int | None] = contextvars.ContextVar("parse_started", default=None)
+
+
+def _upstream_timings(header: str | None) -> dict:
+    timings = {}
+    for part in (header or "").split(";"):
+        name, _, value = part.strip().partition("=")
+        try:
+            timings[f"upstream.{name}_ms"] = float(value)
+        except ValueError:
+            continue
+    return timings
+
+
+async def trace_request(request: Request, call_next):
+    """Root span per request; the trace id is returned in traceparent / x-trace-id"""
+    with start_span(
+        "http.request",
+        traceparent=request.headers.get("traceparent"),
+        method=request.method,
+        path=request.url.path,
+        content_length=request.headers.get("content-length"),
+        **_upstream_timings(request.headers.get(UPSTREAM_TIMING_HEADER))
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        span.set(route=getattr(route, "path", "unmatched"), status=response.status_code)
+        if response.status_code >= 500:
+            span.status = "error"
+        response.headers["traceparent"] = span.traceparent
+        response.headers["x-trace-id"] = span.trace_id
+        return response
+
+
+class TracedRoute(APIRoute):
+    """APIRoute recording a request.parse span: body read, JSON decoding and validation"""
+    
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router re-creates routes from already wrapped endpoints
+        if asyncio.iscoroutinefunction(endpoint) and not hasattr(endpoint, "__traced__"):
+            endpoint = self._traced(path, endpoint)
+        super().__init__(path, endpoint, **kwargs)
+    
+    @staticmethod
+    def _traced(path: str, endpoint):
+        # Same signature (via __wrapped__) so FastAPI resolves the same parameters
+        @functools.wraps(endpoint)
+        async def traced_endpoint(*args, **kwargs):
+            started = _parse_started.get()
+            if started is not None:
+                record_span("request.parse", started, route=path)
+            return await endpoint(*args, **kwargs)
+        
+        traced_endpoint.__traced__ = True
+        return traced_endpoint
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        
+        async def traced_handler(request: Request):
+            _parse_started.set(time.time_ns())
+            return await handler(request)
+        
+        return traced_handler
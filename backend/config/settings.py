@@ -10,13 +10,13 @@ class Settings(BaseSettings):
     api_port: int = 8000
     cors_origins: str = "http://localhost:3000"  # Changed to string, will split in main.py
     
-    # Google Gemini
-    gemini_api_key: str
+    # Google Gemini (LLM calls fail over to computed results until configured)
+    gemini_api_key: str = ""
     
     # Supabase
-    supabase_url: str
-    supabase_key: str
-    supabase_service_key: str
+    supabase_url: str = ""
+    supabase_key: str = ""
+    supabase_service_key: str = ""
     
     # Optional APIs
     openai_api_key: str = ""
@@ -25,6 +25,119 @@ class Settings(BaseSettings):
     # Environment
     environment: str = "development"
     
+    # Execution - CPU-bound agent work (pandas/numpy) runs on a bounded pool
+    # so the event loop stays free for other requests
+    analysis_pool_type: str = "thread"  # "thread" or "process"
+    analysis_pool_workers: int = 4
+    
+    # Analysis result cache (keyed by dataset fingerprint + options)
+    analysis_cache_enabled: bool = True
+    analysis_cache_ttl_seconds: int = 900
+    analysis_cache_max_bytes: int = 64 * 1024 * 1024
+    
+    # File uploads (CSV / Arrow / Parquet ingestion)
+    upload_max_bytes: int = 1024 * 1024 * 1024
+    
+    # Streaming statistics (chunked single-pass analysis of large uploads)
+    streaming_chunk_rows: int = 100_000
+    
+    # Quantiles (median, IQR bounds): "exact" sorts each column, "approximate"
+    # uses a mergeable KLL sketch with the given normalized rank error
+    quantile_mode: str = "exact"
+    quantile_epsilon: float = 0.01
+    
+    # Outlier detection (IQR fence multiplier, z-score and modified z-score cut-offs)
+    outlier_fence: float = 1.5
+    outlier_zscore_threshold: float = 3.0
+    outlier_mad_threshold: float = 3.5
+    
+    # Correlation output: matrix | top_k | threshold | compact
+    correlation_mode: str = "matrix"
+    correlation_top_k: int = 20
+    correlation_threshold: float = 0.5
+    # pearson | spearman | kendall; Kendall samples rows above kendall_max_rows
+    correlation_method: str = "pearson"
+    kendall_max_rows: int = 2000
+    # Cramér's V / correlation ratio for text columns, capped at category_max_levels
+    categorical_associations: bool = False
+    category_max_levels: int = 50
+    
+    # Meeting generation: "combined" asks for research and agenda in one completion,
+    # "parallel" issues one smaller call per section concurrently
+    meeting_mode: str = "combined"
+    meeting_research_max_tokens: int = 1536
+    meeting_agenda_max_tokens: int = 1536
+    # Batch meeting endpoint: concurrent generations, per-item timeout, batch size cap
+    meeting_batch_concurrency: int = 5
+    meeting_batch_timeout_seconds: float = 120.0
+    meeting_batch_max_items: int = 100
+    
+    # LLM gateway: provider rate limits, retry backoff (full jitter) and overall deadline per call
+    llm_requests_per_minute: int = 60
+    llm_tokens_per_minute: int = 1_000_000
+    llm_max_retries: int = 4
+    llm_retry_base_seconds: float = 1.0
+    llm_retry_max_seconds: float = 20.0
+    llm_deadline_seconds: float = 90.0
+    # Hedged requests: fire a duplicate call once the primary outlives this
+    # percentile of recent latencies (needs llm_hedge_min_samples observations)
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    # LLM response cache (model + temperature + normalized prompt); set
+    # llm_cache_path to a SQLite file to persist across restarts and share between workers
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1000
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_path: str = ""
+    # Expired rows in the SQLite tier are deleted at most this often
+    llm_cache_prune_interval_seconds: float = 300.0
+    
+    # Request deadlines carried through the graph state: analysis answers with
+    # deterministic insights when less than insight_min_budget_seconds remain
+    request_deadline_seconds: float = 30.0
+    generation_deadline_seconds: float = 120.0
+    insight_min_budget_seconds: float = 2.0
+    
+    # Insights: "standard" asks the LLM, "fast" uses rule-based templates only
+    analysis_mode: str = "standard"
+    
+    # Background jobs (POST /api/jobs/...): concurrent jobs per process and store
+    job_workers: int = 2
+    job_store_path: str = "data/jobs.sqlite3"
+    job_heartbeat_seconds: float = 10.0
+    
+    # Incremental re-analysis: sufficient statistics per dataset_id
+    profile_store_path: str = "data/profiles.sqlite3"
+    
+    # Dataset files for server-side jobs: {dataset_store_path}/{dataset_id}.csv|parquet|arrow
+    dataset_store_path: str = "data/datasets"
+    
+    # Dashboard widgets: evaluated results kept per (dataset version, widget spec)
+    # and reused until the dashboard's refresh_interval has passed
+    dashboard_materialization_max_entries: int = 5000
+    
+    # Scheduled reports: poll interval, reports claimed per tick and concurrent
+    # dataset analyses / report generations per process
+    scheduler_enabled: bool = False
+    scheduler_store_path: str = "data/schedules.sqlite3"
+    scheduler_interval_seconds: float = 60.0
+    scheduler_batch_size: int = 100
+    scheduler_workers: int = 4
+    
+    # Tracing: spans per request, graph node and LLM call, continued from the
+    # frontend's traceparent header; exporter is none | file | otlp
+    trace_exporter: str = "none"
+    trace_file_path: str = "data/traces.jsonl"
+    trace_otlp_endpoint: str = "http://localhost:4318"
+    trace_service_name: str = "insightflow-backend"
+    trace_sample_rate: float = 1.0
+    
+    # Startup warmup (pre-import pandas/numpy, create the LLM client, compile the
+    # graph): "blocking" finishes before the worker accepts traffic, "background"
+    # serves immediately with GET /ready returning 503 until done, "off" skips it
+    warmup_mode: str = "blocking"
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
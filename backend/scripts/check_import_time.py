@@ -0,0 +1,76 @@
+"""
+Import-time budget for the API process
+Imports api.main in fresh interpreters and fails if heavy modules (pandas,
+numpy, the Gemini client, LangGraph) are loaded eagerly; warmup is what loads
+them. With a budget, also fails if api.main adds more than that on top of a
+baseline `import fastapi`, so the check doesn't depend on how fast the machine
+imports the framework itself
+
+    python scripts/check_import_time.py --budget-ms 400
+    python scripts/check_import_time.py              # lazy-module check only
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ["pandas", "numpy", "pyarrow", "langchain_google_genai", "google.genai", "langgraph"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import fastapi
+baseline = time.perf_counter()
+import api.main
+finished = time.perf_counter()
+print(json.dumps({
+    "baseline_ms": (baseline - started) * 1000,
+    "ms": (finished - baseline) * 1000,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure(runs: int) -> list:
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Max time api.main may add on top of `import fastapi` (off by default)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    
+    results = measure(args.runs)
+    best = min(result["ms"] for result in results)
+    baseline = min(result["baseline_ms"] for result in results)
+    loaded = sorted({module for result in results for module in result["loaded"]})
+    budget = f"budget {args.budget_ms:.0f}ms" if args.budget_ms is not None else "no budget"
+    print(f"import api.main: best +{best:.0f}ms over import fastapi ({baseline:.0f}ms) of {args.runs} runs ({budget})")
+    
+    failed = False
+    if args.budget_ms is not None and best > args.budget_ms:
+        print(f"✗ Over budget by {best - args.budget_ms:.0f}ms (python -X importtime -c 'import api.main' shows where)")
+        failed = True
+    if loaded:
+        print(f"✗ Loaded at import time, should be deferred to warmup: {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print("✓ Within budget" if args.budget_ms is not None else "✓ No heavy modules loaded at import time")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
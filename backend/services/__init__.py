@@ -0,0 +1,18 @@
+# Services package - shared infrastructure used by the API routes
+from .analysis_cache import AnalysisCache, analysis_cache, fingerprint
+from .profile_store import ProfileStore, SQLiteProfileStore, profile_store
+from .llm_cache import LLMResponseCache, llm_cache, prompt_key
+from .jobs import JobManager, JobStore, SQLiteJobStore, job_manager, job_store
+from .datasets import DatasetStore, LocalDatasetStore, dataset_store
+from .scheduler import ReportScheduler, ScheduleStore, SQLiteScheduleStore, report_scheduler, schedule_store
+from .dashboards import DashboardEvaluator, WidgetMaterializations, dashboard_evaluator, widget_materializations
+
+__all__ = [
+    "AnalysisCache", "analysis_cache", "fingerprint",
+    "ProfileStore", "SQLiteProfileStore", "profile_store",
+    "LLMResponseCache", "llm_cache", "prompt_key",
+    "JobManager", "JobStore", "SQLiteJobStore", "job_manager", "job_store",
+    "DatasetStore", "LocalDatasetStore", "dataset_store",
+    "ReportScheduler", "ScheduleStore", "SQLiteScheduleStore", "report_scheduler", "schedule_store",
+    "DashboardEvaluator", "WidgetMaterializations", "dashboard_evaluator", "widget_materializations",
+]
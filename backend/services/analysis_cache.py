@@ -0,0 +1,137 @@
+"""
+Content-addressed cache for analysis results
+Keyed by a stable hash of the dataset rows plus the analysis options, so the
+statistical / correlation / outlier / quality tabs of one dataset share a run
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from config.settings import settings
+
+
+def fingerprint(data: Any, options: dict | None = None) -> str:
+    """Stable SHA-256 of the dataset contents and analysis options"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+    digest.update(b"\0")
+    digest.update(json.dumps(data, sort_keys=True, default=str, separators=(",", ":")).encode())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """In-process LRU cache with TTL expiry and a byte budget"""
+    
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda value: True
+    ) -> tuple[Any, bool]:
+        """
+        Return (value, hit); concurrent misses for one key share a single computation
+        A shared computation is fresh, so it is not a hit. If the computing request is
+        cancelled (client disconnect), a waiter takes over the computation
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value, True
+            
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending), False
+            except asyncio.CancelledError:
+                # Only the leader was cancelled, not this request: retry, possibly as the new leader
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        
+        if should_cache(value):
+            self.put(key, value)
+        future.set_result(value)
+        return value, False
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+    
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions
+        }
+    
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+analysis_cache = AnalysisCache(
+    max_bytes=settings.analysis_cache_max_bytes,
+    ttl_seconds=settings.analysis_cache_ttl_seconds
+)
@@ -0,0 +1,183 @@
+"""
+Server-side dashboard widgets
+Widgets are evaluated per dataset in one pass (tools.widgets) and each result is
+materialized under (dataset version, widget spec). A dashboard reuses a result
+while it is younger than the dashboard's refresh_interval, so reloads and other
+dashboards showing the same widget do not rescan the data
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from config.settings import settings
+from services.datasets import DatasetStore, dataset_store
+from services.tracing import start_span
+
+
+def materialization_key(dataset_id: str, version: str, spec: dict) -> str:
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{dataset_id}:{version}:{digest}"
+
+
+class WidgetMaterializations:
+    """LRU of evaluated widget results; freshness is decided by the reader's max_age"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str, max_age: float) -> tuple[float, dict] | None:
+        """(computed_at, result) if materialized within the last max_age seconds"""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key: str, computed_at: float, result: dict) -> None:
+        self._entries[key] = (computed_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+class DashboardEvaluator:
+    """Evaluates a dashboard's widgets: materialized where fresh, otherwise one scan per dataset"""
+    
+    def __init__(self, datasets: DatasetStore, materializations: WidgetMaterializations):
+        self.datasets = datasets
+        self.materializations = materializations
+        # One lock per dataset being scanned, dropped once nobody holds or waits on it
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+        self.scans = 0
+    
+    async def evaluate(self, widgets: list, refresh_interval: float, force_refresh: bool = False) -> dict:
+        """
+        widgets: [{"id", "dataset_id", "widget_type", "config"}]
+        Returns {"widgets": {id: result}, "datasets_scanned": n}; every result carries
+        computed_at and cached, or an error that does not affect the other widgets
+        """
+        from tools.widgets import widget_spec
+        
+        results: dict = {}
+        by_dataset: dict[str, dict] = defaultdict(dict)
+        for widget in widgets:
+            try:
+                by_dataset[widget["dataset_id"]][widget["id"]] = widget_spec(widget["widget_type"], widget.get("config"))
+            except (ValueError, TypeError) as e:
+                results[widget["id"]] = {"error": str(e)}
+        
+        scanned = await asyncio.gather(*(
+            self._evaluate_dataset(dataset_id, specs, refresh_interval, force_refresh, results)
+            for dataset_id, specs in by_dataset.items()
+        ))
+        return {"widgets": results, "datasets_scanned": sum(scanned)}
+    
+    async def _evaluate_dataset(
+        self,
+        dataset_id: str,
+        specs: dict,
+        max_age: float,
+        force_refresh: bool,
+        results: dict
+    ) -> bool:
+        """Fill results for one dataset's widgets; True if the dataset was scanned"""
+        from agents.executor import run_cpu_bound
+        
+        try:
+            # version() stats the data file: keep that I/O off the loop like the scan
+            version = await asyncio.to_thread(self.datasets.version, dataset_id)
+        except ValueError as e:
+            version, missing = None, str(e)
+        else:
+            missing = f"No data file for dataset {dataset_id}"
+        if version is None:
+            for widget_id in specs:
+                results[widget_id] = {"error": missing}
+            return False
+        
+        keys = {widget_id: materialization_key(dataset_id, version, spec) for widget_id, spec in specs.items()}
+        stale = self._collect(keys, max_age, force_refresh, results)
+        if not stale:
+            return False
+        
+        async with self._dataset_lock(dataset_id):
+            # A concurrent request may have materialized these while we waited
+            if not force_refresh:
+                stale = self._collect({widget_id: keys[widget_id] for widget_id in stale}, max_age, False, results)
+                if not stale:
+                    return False
+            self.materializations.misses += len(stale)
+            with start_span("dashboard.scan", dataset_id=dataset_id, widgets=len(stale)):
+                computed_at = time.time()
+                try:
+                    computed = await run_cpu_bound(_scan, self.datasets, dataset_id, {widget_id: specs[widget_id] for widget_id in stale})
+                except Exception as e:
+                    for widget_id in stale:
+                        results[widget_id] = {"error": f"Dataset unavailable: {e}"}
+                    return False
+            self.scans += 1
+        
+        for widget_id, result in computed.items():
+            if "error" not in result:
+                self.materializations.put(keys[widget_id], computed_at, result)
+            results[widget_id] = {**result, "computed_at": computed_at, "cached": False}
+        return True
+    
+    @asynccontextmanager
+    async def _dataset_lock(self, dataset_id: str):
+        lock = self._locks.setdefault(dataset_id, asyncio.Lock())
+        self._lock_users[dataset_id] = self._lock_users.get(dataset_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[dataset_id] -= 1
+            if not self._lock_users[dataset_id]:
+                del self._lock_users[dataset_id], self._locks[dataset_id]
+    
+    def _collect(self, keys: dict, max_age: float, force_refresh: bool, results: dict) -> list:
+        """Fill results from fresh materializations; returns the widget ids still to compute"""
+        stale = []
+        for widget_id, key in keys.items():
+            entry = None if force_refresh else self.materializations.get(key, max_age)
+            if entry is None:
+                stale.append(widget_id)
+                continue
+            self.materializations.hits += 1
+            computed_at, result = entry
+            results[widget_id] = {**result, "computed_at": computed_at, "cached": True}
+        return stale
+    
+    def stats(self) -> dict:
+        return {**self.materializations.stats(), "scans": self.scans}
+
+
+def _scan(datasets: DatasetStore, dataset_id: str, specs: dict) -> dict:
+    """Load the dataset once and evaluate every requested widget on it (runs on the analysis pool)"""
+    from tools.widgets import evaluate_widgets
+    return evaluate_widgets(datasets.load(dataset_id), specs)
+
+
+widget_materializations = WidgetMaterializations(settings.dashboard_materialization_max_entries)
+dashboard_evaluator = DashboardEvaluator(dataset_store, widget_materializations)
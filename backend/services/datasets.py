@@ -0,0 +1,94 @@
+"""
+Dataset files for server-side jobs (scheduled reports, dashboards)
+The frontend keeps dataset metadata in Supabase; the rows themselves are stored
+(PUT /api/analysis/datasets/{dataset_id}) and read here from
+{dataset_store_path}/{dataset_id}.csv|parquet|arrow
+"""
+
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from config.settings import settings
+
+
+_DATASET_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+DATASET_SUFFIXES = (".csv", ".parquet", ".arrow", ".arrows", ".ipc", ".feather")
+
+
+class DatasetStore(ABC):
+    """Interface: load(dataset_id) -> DataFrame (blocking, run it on the analysis pool)"""
+    
+    @abstractmethod
+    def load(self, dataset_id: str):
+        ...
+    
+    @abstractmethod
+    def version(self, dataset_id: str) -> str | None:
+        """Changes whenever the dataset's rows change; None if the dataset does not exist"""
+    
+    @abstractmethod
+    def save(self, dataset_id: str, frame) -> str:
+        """Replace the dataset's rows with a DataFrame; returns the new version"""
+    
+    def query(self, dataset_id: str, spec: dict) -> dict:
+        """Aggregated result of a tools.query spec (blocking)"""
+        from tools.query import query_frame
+        return query_frame(self.load(dataset_id), spec)
+
+
+class LocalDatasetStore(DatasetStore):
+    """One file per dataset in a local directory"""
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def path(self, dataset_id: str) -> Path | None:
+        if not _DATASET_ID.match(dataset_id):
+            raise ValueError(f"Invalid dataset id '{dataset_id}'")
+        for path in sorted(self.root.glob(f"{dataset_id}.*")):
+            if path.suffix.lower() in DATASET_SUFFIXES:
+                return path
+        return None
+    
+    def load(self, dataset_id: str):
+        from tools import detect_format, read_frame
+        path = self.path(dataset_id)
+        if path is None:
+            raise FileNotFoundError(f"No data file for dataset {dataset_id} in {self.root}")
+        return read_frame(str(path), detect_format(filename=path.name))
+    
+    def version(self, dataset_id: str) -> str | None:
+        path = self.path(dataset_id)
+        if path is None:
+            return None
+        stat = path.stat()
+        return f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def save(self, dataset_id: str, frame) -> str:
+        """Write {dataset_id}.parquet atomically and drop files in other formats, which would shadow it"""
+        if not _DATASET_ID.match(dataset_id):
+            raise ValueError(f"Invalid dataset id '{dataset_id}'")
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.root / f"{dataset_id}.parquet"
+        partial = self.root / f".{dataset_id}.parquet.partial"
+        try:
+            frame.rename(columns=str).to_parquet(partial, index=False)
+            os.replace(partial, target)
+        finally:
+            partial.unlink(missing_ok=True)
+        for path in self.root.glob(f"{dataset_id}.*"):
+            if path != target and path.suffix.lower() in DATASET_SUFFIXES:
+                path.unlink(missing_ok=True)
+        return self.version(dataset_id)
+    
+    def query(self, dataset_id: str, spec: dict) -> dict:
+        from tools import detect_format
+        from tools.query import query_file
+        path = self.path(dataset_id)
+        if path is None:
+            raise FileNotFoundError(f"No data file for dataset {dataset_id} in {self.root}")
+        return query_file(str(path), detect_format(filename=path.name), spec)
+
+
+dataset_store = LocalDatasetStore(settings.dataset_store_path)
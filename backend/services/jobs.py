@@ -0,0 +1,302 @@
+"""
+Background jobs for long-running analyses and reports
+A job is submitted, runs on a bounded in-process worker pool, reports progress
+per graph node, and keeps its status and result in a pluggable JobStore
+(SQLite by default, so any worker process can answer status polls)
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Awaitable, Callable
+from config.settings import settings
+from services.tracing import log_event
+
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested from another process"""
+
+
+class JobStore(ABC):
+    """Interface for job persistence; jobs are plain dicts and every call is blocking"""
+    
+    @abstractmethod
+    def create(self, job: dict) -> None:
+        ...
+    
+    @abstractmethod
+    def get(self, job_id: str) -> dict | None:
+        ...
+    
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+    
+    @abstractmethod
+    def list(self, user_id: str | None = None, limit: int = 50) -> list:
+        ...
+    
+    @abstractmethod
+    def heartbeat(self, job_ids: list) -> None:
+        """Mark the given jobs as owned by a live process"""
+    
+    @abstractmethod
+    def fail_stale(self, older_than: float) -> int:
+        """Fail unfinished jobs without a heartbeat in older_than seconds; returns how many"""
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs table in a local SQLite file; JSON columns for request, progress and result"""
+    
+    JSON_FIELDS = ("request", "progress", "result")
+    COLUMNS = (
+        "id", "kind", "user_id", "status", "request", "progress", "result", "error",
+        "cancel_requested", "created_at", "started_at", "finished_at", "updated_at", "heartbeat_at"
+    )
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, user_id TEXT, status TEXT NOT NULL, "
+                "request TEXT, progress TEXT, result TEXT, error TEXT, "
+                "cancel_requested INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, updated_at REAL NOT NULL, "
+                "heartbeat_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_user_created ON jobs (user_id, created_at)")
+            conn.commit()
+            self._initialized = True
+        return conn
+    
+    def _row(self, row: sqlite3.Row) -> dict:
+        job = dict(row)
+        for field in self.JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+    
+    def create(self, job: dict) -> None:
+        values = {**job, **{f: json.dumps(job.get(f), default=str) for f in self.JSON_FIELDS}}
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+                [values.get(col) for col in self.COLUMNS]
+            )
+    
+    def get(self, job_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+    
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        for field in self.JSON_FIELDS:
+            if field in fields:
+                fields[field] = json.dumps(fields[field], default=str)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                [*fields.values(), job_id]
+            )
+    
+    def list(self, user_id: str | None = None, limit: int = 50) -> list:
+        query = "SELECT * FROM jobs"
+        params: list = []
+        if user_id:
+            query += " WHERE user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            return [self._row(row) for row in conn.execute(query, params).fetchall()]
+    
+    def heartbeat(self, job_ids: list) -> None:
+        if not job_ids:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({', '.join('?' for _ in job_ids)})",
+                [time.time(), *job_ids]
+            )
+    
+    def fail_stale(self, older_than: float) -> int:
+        """Queued/running jobs whose owning process stopped heartbeating can never finish"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Worker stopped before the job finished', "
+                "finished_at = ?, updated_at = ? WHERE status IN ('queued', 'running') AND heartbeat_at < ?",
+                (now, now, now - older_than)
+            )
+        return cursor.rowcount
+
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+class JobManager:
+    """Runs submitted work on at most `workers` concurrent jobs and tracks it in the store"""
+    
+    def __init__(self, store: JobStore, workers: int, heartbeat_seconds: float = 10.0):
+        self.store = store
+        self.workers = workers
+        self.heartbeat_seconds = heartbeat_seconds
+        self._slots: asyncio.Semaphore | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._watchers: dict[str, set[asyncio.Event]] = {}
+    
+    def start(self) -> None:
+        """Create the worker slots and heartbeat loop on the running event loop"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+    
+    async def _heartbeat_loop(self) -> None:
+        # Keeps this process's jobs alive in the store and fails jobs whose
+        # process died (no heartbeat for three intervals)
+        while True:
+            try:
+                await self.call_store("heartbeat", list(self._tasks))
+                failed = await self.call_store("fail_stale", older_than=3 * self.heartbeat_seconds)
+                if failed:
+                    log_event("jobs", "orphans_failed", level="warning", count=failed)
+            except Exception as e:
+                log_event("jobs", "heartbeat_error", level="error", error=str(e))
+            await asyncio.sleep(self.heartbeat_seconds)
+    
+    async def call_store(self, method: str, *args, **kwargs):
+        """
+        Run a (blocking) store call in a thread so the event loop keeps serving
+        Not on the analysis pool: heartbeats must not queue behind pandas work
+        """
+        return await asyncio.to_thread(getattr(self.store, method), *args, **kwargs)
+    
+    async def submit(
+        self,
+        kind: str,
+        user_id: str | None,
+        request: dict,
+        work: Callable[[ProgressCallback], Awaitable[dict]]
+    ) -> dict:
+        """Record the job as queued and schedule it; work(progress) returns the result"""
+        self.start()
+        now = time.time()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "user_id": user_id,
+            "status": "queued",
+            "request": request,
+            "progress": {"nodes_completed": [], "current_node": None},
+            "result": None,
+            "error": None,
+            "cancel_requested": False,
+            "created_at": now,
+            "updated_at": now,
+            "heartbeat_at": now,
+        }
+        await self.call_store("create", job)
+        self._tasks[job["id"]] = asyncio.create_task(self._run(job["id"], work))
+        log_event("jobs", "queued", kind=kind, job_id=job["id"])
+        return job
+    
+    async def _run(self, job_id: str, work: Callable[[ProgressCallback], Awaitable[dict]]) -> None:
+        completed: list = []
+        
+        async def progress(node: str) -> None:
+            if (await self.call_store("get", job_id))["cancel_requested"]:
+                raise JobCancelled()
+            completed.append(node)
+            await self._update(job_id, progress={"nodes_completed": completed, "current_node": node})
+        
+        try:
+            async with self._slots:
+                if (await self.call_store("get", job_id))["cancel_requested"]:
+                    raise JobCancelled()
+                await self._update(job_id, status="running", started_at=time.time())
+                result = await work(progress)
+            await self._update(job_id, status="succeeded", result=result, finished_at=time.time())
+            log_event("jobs", "succeeded", job_id=job_id)
+        except (asyncio.CancelledError, JobCancelled):
+            await self._update(job_id, status="cancelled", finished_at=time.time())
+            log_event("jobs", "cancelled", job_id=job_id)
+        except Exception as e:
+            await self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            log_event("jobs", "failed", level="error", job_id=job_id, error=str(e))
+        finally:
+            self._tasks.pop(job_id, None)
+    
+    async def cancel(self, job_id: str) -> dict | None:
+        """Flag the job for cancellation (seen by any process) and stop it if it runs here"""
+        job = await self.call_store("get", job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        await self._update(job_id, cancel_requested=1)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return await self.call_store("get", job_id)
+    
+    async def _update(self, job_id: str, **fields) -> None:
+        await self.call_store("update", job_id, **fields)
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+    
+    async def watch(self, job_id: str, poll_seconds: float = 1.0):
+        """
+        Yield the job each time it changes until it reaches a terminal status
+        Local updates wake the watcher immediately; polling covers jobs run by other workers
+        """
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(event)
+        last_update = None
+        try:
+            while True:
+                job = await self.call_store("get", job_id)
+                if job is None:
+                    return
+                if job["updated_at"] != last_update:
+                    last_update = job["updated_at"]
+                    yield job
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            self._watchers[job_id].discard(event)
+            if not self._watchers[job_id]:
+                del self._watchers[job_id]
+    
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        if self._heartbeat is not None:
+            tasks.append(self._heartbeat)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_store = SQLiteJobStore(settings.job_store_path)
+job_manager = JobManager(job_store, workers=settings.job_workers, heartbeat_seconds=settings.job_heartbeat_seconds)
@@ -0,0 +1,182 @@
+"""
+Response cache for LLM calls
+Keyed by model, temperature and the normalized prompt; in-process LRU with TTL
+expiry, optionally backed by a SQLite file shared across restarts and workers
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from config.settings import settings
+from services.metrics import LLM_CACHE_EVICTIONS, LLM_CACHE_HITS, LLM_CACHE_MISSES
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry"""
+    return " ".join(str(text).split())
+
+
+def prompt_key(model: str, temperature, messages, options: dict | None = None) -> str:
+    """SHA-256 of (model, temperature, normalized messages, generation options)"""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [
+            [type(message).__name__, normalize_prompt(getattr(message, "content", message))]
+            for message in messages
+        ],
+        "options": options or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LRU + TTL over response text; the SQLite tier is consulted on memory misses
+    Async callers use aget / aput, which run the SQLite tier on a worker thread
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, path: str = "", prune_interval_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.prune_interval_seconds = prune_interval_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._initialized = False
+        self._last_prune = time.monotonic()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_expires ON llm_responses (expires_at)")
+            self._initialized = True
+        return conn
+    
+    def get(self, key: str) -> str | None:
+        content = self._memory_get(key)
+        if content is None and self.path:
+            content = self._disk_hit(key, self._disk_get(key))
+        return self._count(content)
+    
+    async def aget(self, key: str) -> str | None:
+        content = self._memory_get(key)
+        if content is None and self.path:
+            content = self._disk_hit(key, await asyncio.to_thread(self._disk_get, key))
+        return self._count(content)
+    
+    def put(self, key: str, content: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, content, expires_at)
+        if self.path:
+            self._disk_put(key, content, expires_at, self._prune_due())
+    
+    async def aput(self, key: str, content: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, content, expires_at)
+        if self.path:
+            await asyncio.to_thread(self._disk_put, key, content, expires_at, self._prune_due())
+    
+    def _memory_get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.time():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            LLM_CACHE_MISSES.labels(tier="memory").inc()
+            return None
+        self._entries.move_to_end(key)
+        LLM_CACHE_HITS.labels(tier="memory").inc()
+        return entry[1]
+    
+    def _disk_hit(self, key: str, row: tuple | None) -> str | None:
+        if row is None:
+            LLM_CACHE_MISSES.labels(tier="sqlite").inc()
+            return None
+        self._remember(key, row[0], row[1])
+        self.disk_hits += 1
+        LLM_CACHE_HITS.labels(tier="sqlite").inc()
+        return row[0]
+    
+    def _count(self, content: str | None) -> str | None:
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+    
+    def _prune_due(self) -> bool:
+        """Expired rows are pruned at most once per prune_interval_seconds, not on every write"""
+        now = time.monotonic()
+        if now - self._last_prune < self.prune_interval_seconds:
+            return False
+        self._last_prune = now
+        return True
+    
+    def _disk_get(self, key: str) -> tuple | None:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT content, expires_at FROM llm_responses WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+    
+    def _disk_put(self, key: str, content: str, expires_at: float, prune: bool) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, content, expires_at) VALUES (?, ?, ?)",
+                (key, content, expires_at)
+            )
+            if prune:
+                pruned = conn.execute("DELETE FROM llm_responses WHERE expires_at < ?", (time.time(),)).rowcount
+                LLM_CACHE_EVICTIONS.labels(tier="sqlite").inc(pruned)
+    
+    def _remember(self, key: str, content: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, content)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            LLM_CACHE_EVICTIONS.labels(tier="memory").inc()
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM llm_responses")
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": bool(self.path),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    path=settings.llm_cache_path,
+    prune_interval_seconds=settings.llm_cache_prune_interval_seconds
+)
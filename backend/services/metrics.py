@@ -0,0 +1,136 @@
+"""
+Prometheus metrics for the API, the agent graph and LLM calls
+Served by GET /metrics; with PROMETHEUS_MULTIPROC_DIR set, samples from all
+uvicorn worker processes are aggregated
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUEST_LATENCY = Histogram(
+    "insightflow_http_request_duration_seconds",
+    "HTTP request latency until the response starts, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "insightflow_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+NODE_DURATION = Histogram(
+    "insightflow_graph_node_duration_seconds",
+    "Execution time per LangGraph node",
+    ["node", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+NODES_IN_FLIGHT = Gauge(
+    "insightflow_graph_nodes_in_flight",
+    "LangGraph nodes currently executing",
+    ["node"],
+    multiprocess_mode="livesum",
+)
+LLM_LATENCY = Histogram(
+    "insightflow_llm_request_duration_seconds",
+    "Provider call latency (one attempt, including a hedge if fired)",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "insightflow_llm_tokens",
+    "Tokens per LLM call",
+    ["kind"],
+    buckets=(16, 64, 256, 512, 1024, 2048, 4096, 8192, 32768),
+)
+LLM_CALLS = Counter(
+    "insightflow_llm_calls_total",
+    "LLM gateway calls by how they were served",
+    ["served_by"],
+)
+LLM_CACHE_HITS = Counter(
+    "insightflow_llm_cache_hits_total",
+    "LLM response cache hits by tier (memory, sqlite)",
+    ["tier"],
+)
+LLM_CACHE_MISSES = Counter(
+    "insightflow_llm_cache_misses_total",
+    "LLM response cache misses by tier; a memory miss falls through to sqlite when persistent",
+    ["tier"],
+)
+LLM_CACHE_EVICTIONS = Counter(
+    "insightflow_llm_cache_evictions_total",
+    "LLM response cache entries dropped: LRU overflow in memory, expired rows pruned from sqlite",
+    ["tier"],
+)
+LLM_IN_FLIGHT = Gauge(
+    "insightflow_llm_requests_in_flight",
+    "Provider calls currently outstanding",
+    multiprocess_mode="livesum",
+)
+POOL_TASK_DURATION = Histogram(
+    "insightflow_pool_task_duration_seconds",
+    "Wait plus run time of a call on the analysis pool, measured in the calling process",
+    ["task", "pool", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DATAFRAME_BUILD = Histogram(
+    "insightflow_dataframe_build_seconds",
+    "Time to build a DataFrame from JSON rows or an uploaded file",
+    ["source"],
+    buckets=LATENCY_BUCKETS,
+)
+DATASET_ROWS = Histogram(
+    "insightflow_dataset_rows",
+    "Rows per analysed dataset",
+    buckets=SIZE_BUCKETS,
+)
+DATASET_COLUMNS = Histogram(
+    "insightflow_dataset_columns",
+    "Columns per analysed dataset",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, with_status: bool = False, **labels):
+    """Observe the duration of the block; with_status adds status=ok|error"""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        if with_status:
+            labels["status"] = status
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def observe_dataset(rows: int, columns: int) -> None:
+    DATASET_ROWS.observe(rows)
+    DATASET_COLUMNS.observe(columns)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition payload and content type for GET /metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
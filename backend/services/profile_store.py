@@ -0,0 +1,91 @@
+"""
+Persistent store for incremental dataset profiles
+One JSON payload of sufficient statistics per dataset_id in a local SQLite file
+"""
+
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from config.settings import settings
+
+
+class ProfileStore(ABC):
+    """Interface: dataset_id -> serialized DatasetProfile; every call is blocking"""
+    
+    @abstractmethod
+    def load(self, dataset_id: str) -> dict | None:
+        ...
+    
+    @abstractmethod
+    def delete(self, dataset_id: str) -> bool:
+        """Drop a dataset's profile; returns whether one existed"""
+    
+    @abstractmethod
+    def update(self, dataset_id: str, apply):
+        """Atomic read-modify-write: apply(payload or None) -> (new payload, result); returns result"""
+
+
+class SQLiteProfileStore(ProfileStore):
+    """SQLite-backed key/value store: dataset_id -> serialized DatasetProfile"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dataset_profiles ("
+                "dataset_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+    
+    def load(self, dataset_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT payload FROM dataset_profiles WHERE dataset_id = ?", (dataset_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def delete(self, dataset_id: str) -> bool:
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute("DELETE FROM dataset_profiles WHERE dataset_id = ?", (dataset_id,))
+        return cursor.rowcount > 0
+    
+    def update(self, dataset_id: str, apply):
+        """
+        Atomic read-modify-write: apply(payload or None) -> (new payload, result)
+        BEGIN IMMEDIATE serializes concurrent appends across threads and workers
+        """
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT payload FROM dataset_profiles WHERE dataset_id = ?", (dataset_id,)
+            ).fetchone()
+            payload, result = apply(json.loads(row[0]) if row else None)
+            conn.execute(
+                "INSERT INTO dataset_profiles (dataset_id, payload, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(dataset_id) DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at",
+                (dataset_id, json.dumps(payload), time.time())
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            # BEGIN itself may have failed (database is locked): nothing to roll back
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+profile_store = SQLiteProfileStore(settings.profile_store_path)
@@ -0,0 +1,388 @@
+"""
+Scheduled report execution
+Mirrors the scheduled_reports table (scripts/004): due rows are claimed by
+advancing next_run_at with a compare-and-set, grouped by dataset_id so each
+dataset is loaded and analysed once per tick, and every report in a group is
+written by the report graph on a bounded worker pool
+"""
+
+import asyncio
+import calendar
+import json
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from config.settings import settings
+from services.datasets import DatasetStore, dataset_store
+from services.tracing import log_event, start_span
+
+
+FREQUENCIES = ["daily", "weekly", "monthly"]
+
+
+def next_run_after(schedule: dict, after: float) -> float:
+    """
+    Next occurrence strictly after `after` (epoch seconds, UTC) of a daily, weekly
+    or monthly schedule; missed runs are skipped rather than replayed
+    day_of_week follows the frontend's numbering (0 = Sunday)
+    """
+    now = datetime.fromtimestamp(after, timezone.utc)
+    hours, minutes = (int(part) for part in (schedule.get("time_of_day") or "09:00").split(":")[:2])
+    at = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    frequency = schedule["frequency"]
+    
+    if frequency == "daily":
+        if at <= now:
+            at += timedelta(days=1)
+    elif frequency == "weekly":
+        target = schedule.get("day_of_week")
+        target = 1 if target is None else target
+        at += timedelta(days=(target - (at.weekday() + 1)) % 7)
+        if at <= now:
+            at += timedelta(days=7)
+    elif frequency == "monthly":
+        target = schedule.get("day_of_month") or 1
+        year, month = now.year, now.month
+        while True:
+            # Short months run on their last day
+            at = at.replace(year=year, month=month, day=min(target, calendar.monthrange(year, month)[1]))
+            if at > now:
+                break
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    else:
+        raise ValueError(f"Unsupported frequency '{frequency}', expected one of {FREQUENCIES}")
+    return at.timestamp()
+
+
+class ScheduleStore(ABC):
+    """Interface for scheduled reports and the reports they produce; rows are plain dicts"""
+    
+    @abstractmethod
+    def create(self, schedule: dict) -> None:
+        ...
+    
+    @abstractmethod
+    def get(self, schedule_id: str) -> dict | None:
+        ...
+    
+    @abstractmethod
+    def list(self, user_id: str | None = None, limit: int = 50) -> list:
+        ...
+    
+    @abstractmethod
+    def claim_due(self, now: float, limit: int) -> list:
+        """Due active schedules whose next_run_at this caller advanced (no other worker gets them)"""
+    
+    @abstractmethod
+    def record_run(self, schedule_id: str, ran_at: float, error: str | None = None) -> None:
+        ...
+    
+    @abstractmethod
+    def save_report(self, report: dict) -> None:
+        ...
+    
+    @abstractmethod
+    def list_reports(self, schedule_id: str, limit: int = 20) -> list:
+        ...
+
+
+class SQLiteScheduleStore(ScheduleStore):
+    """Local stand-in for scheduled_reports / reports (timestamps as epoch seconds)"""
+    
+    SCHEDULE_COLUMNS = (
+        "id", "user_id", "dataset_id", "title", "description", "frequency", "day_of_week",
+        "day_of_month", "time_of_day", "email_recipients", "report_type", "is_active",
+        "last_run_at", "next_run_at", "last_error", "created_at", "updated_at"
+    )
+    REPORT_COLUMNS = ("id", "user_id", "dataset_id", "schedule_id", "title", "description", "report_type", "content", "created_at")
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_reports ("
+                "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, dataset_id TEXT NOT NULL, title TEXT NOT NULL, "
+                "description TEXT, frequency TEXT NOT NULL, day_of_week INTEGER, day_of_month INTEGER, "
+                "time_of_day TEXT DEFAULT '09:00', email_recipients TEXT, report_type TEXT NOT NULL, "
+                "is_active INTEGER NOT NULL DEFAULT 1, last_run_at REAL, next_run_at REAL, last_error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Partial index: the due scan only ever touches active rows, in next_run_at order
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS scheduled_reports_due "
+                "ON scheduled_reports (next_run_at) WHERE is_active = 1"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scheduled_reports_user ON scheduled_reports (user_id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, dataset_id TEXT NOT NULL, schedule_id TEXT, "
+                "title TEXT NOT NULL, description TEXT, report_type TEXT NOT NULL, content TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_schedule ON reports (schedule_id, created_at)")
+            conn.commit()
+            self._initialized = True
+        return conn
+    
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        item = dict(row)
+        for field in ("email_recipients", "content"):
+            if field in item:
+                item[field] = json.loads(item[field]) if item[field] else None
+        if "is_active" in item:
+            item["is_active"] = bool(item["is_active"])
+        return item
+    
+    def create(self, schedule: dict) -> None:
+        values = {**schedule, "email_recipients": json.dumps(schedule.get("email_recipients") or [])}
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT INTO scheduled_reports ({', '.join(self.SCHEDULE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.SCHEDULE_COLUMNS)})",
+                [values.get(col) for col in self.SCHEDULE_COLUMNS]
+            )
+    
+    def get(self, schedule_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM scheduled_reports WHERE id = ?", (schedule_id,)).fetchone()
+        return self._row(row) if row else None
+    
+    def list(self, user_id: str | None = None, limit: int = 50) -> list:
+        query = "SELECT * FROM scheduled_reports"
+        params: list = []
+        if user_id:
+            query += " WHERE user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            return [self._row(row) for row in conn.execute(query, params).fetchall()]
+    
+    def claim_due(self, now: float, limit: int) -> list:
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM scheduled_reports WHERE is_active = 1 AND next_run_at <= ? "
+                "ORDER BY next_run_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            claimed = []
+            for row in rows:
+                schedule = self._row(row)
+                next_run_at = next_run_after(schedule, now)
+                # Compare-and-set on next_run_at: a row another worker already
+                # advanced is skipped, so each run is claimed exactly once
+                cursor = conn.execute(
+                    "UPDATE scheduled_reports SET next_run_at = ?, updated_at = ? WHERE id = ? AND next_run_at = ?",
+                    (next_run_at, now, schedule["id"], schedule["next_run_at"])
+                )
+                if cursor.rowcount == 1:
+                    claimed.append({**schedule, "scheduled_for": schedule["next_run_at"], "next_run_at": next_run_at})
+            conn.execute("COMMIT")
+            return claimed
+        except BaseException:
+            # BEGIN itself may have failed (database is locked): nothing to roll back
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def record_run(self, schedule_id: str, ran_at: float, error: str | None = None) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE scheduled_reports SET last_run_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (ran_at, error, ran_at, schedule_id)
+            )
+    
+    def save_report(self, report: dict) -> None:
+        values = {**report, "content": json.dumps(report["content"], default=str)}
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT INTO reports ({', '.join(self.REPORT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.REPORT_COLUMNS)})",
+                [values.get(col) for col in self.REPORT_COLUMNS]
+            )
+    
+    def list_reports(self, schedule_id: str, limit: int = 20) -> list:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM reports WHERE schedule_id = ? ORDER BY created_at DESC LIMIT ?",
+                (schedule_id, limit)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+
+class ReportScheduler:
+    """Polls the store every interval_seconds and runs due reports on `workers` slots"""
+    
+    def __init__(
+        self,
+        store: ScheduleStore,
+        datasets: DatasetStore,
+        workers: int,
+        interval_seconds: float = 60.0,
+        batch_size: int = 100
+    ):
+        self.store = store
+        self.datasets = datasets
+        self.workers = workers
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._slots: asyncio.Semaphore | None = None
+        self._loop_task: asyncio.Task | None = None
+        self.counters = {"ticks": 0, "claimed": 0, "datasets_analysed": 0, "succeeded": 0, "failed": 0}
+    
+    def start(self) -> None:
+        """Start polling on the running event loop"""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._poll())
+    
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                log_event("scheduler", "tick_error", level="error", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+    
+    async def tick(self, now: float | None = None) -> dict:
+        """Claim every due report, analyse each dataset once, then write the reports"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        started = time.perf_counter()
+        with start_span("scheduler.tick") as span:
+            # Store calls block (claim_due may wait on another worker's lock): keep them off the loop
+            claimed = await asyncio.to_thread(self.store.claim_due, time.time() if now is None else now, self.batch_size)
+            groups: dict[str, list] = defaultdict(list)
+            for schedule in claimed:
+                groups[schedule["dataset_id"]].append(schedule)
+            outcomes = await asyncio.gather(*(
+                self._run_dataset(dataset_id, schedules) for dataset_id, schedules in groups.items()
+            ))
+            succeeded = sum(ok for results in outcomes for ok in results)
+            summary = {
+                "claimed": len(claimed),
+                "datasets": len(groups),
+                "succeeded": succeeded,
+                "failed": len(claimed) - succeeded,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            span.set(**summary)
+        self.counters["ticks"] += 1
+        self.counters["claimed"] += summary["claimed"]
+        self.counters["succeeded"] += summary["succeeded"]
+        self.counters["failed"] += summary["failed"]
+        if claimed:
+            log_event("scheduler", "tick", **summary)
+        return summary
+    
+    async def _run_dataset(self, dataset_id: str, schedules: list) -> list:
+        from agents.executor import run_cpu_bound
+        from agents.orchestrator import run_report_branches
+        
+        try:
+            async with self._slots:
+                with start_span("scheduler.dataset", dataset_id=dataset_id, reports=len(schedules)):
+                    frame = await run_cpu_bound(self.datasets.load, dataset_id)
+                    collab = await run_report_branches(_report_state(schedules[0], frame))
+            self.counters["datasets_analysed"] += 1
+        except Exception as e:
+            log_event("scheduler", "dataset_failed", level="error", dataset_id=dataset_id, error=str(e))
+            for schedule in schedules:
+                await asyncio.to_thread(self.store.record_run, schedule["id"], time.time(), error=f"Dataset unavailable: {e}")
+            return [False] * len(schedules)
+        
+        return await asyncio.gather(*(self._run_report(schedule, frame, collab) for schedule in schedules))
+    
+    async def _run_report(self, schedule: dict, frame, collab: dict) -> bool:
+        from agents import get_agent_graph
+        
+        try:
+            async with self._slots:
+                with start_span("scheduler.report", schedule_id=schedule["id"]):
+                    result = await get_agent_graph().ainvoke(_report_state(schedule, frame, collab))
+            output = result.get("final_output") or {}
+            now = time.time()
+            await asyncio.to_thread(self.store.save_report, {
+                "id": str(uuid.uuid4()),
+                "user_id": schedule["user_id"],
+                "dataset_id": schedule["dataset_id"],
+                "schedule_id": schedule["id"],
+                "title": schedule["title"],
+                "description": schedule.get("description"),
+                "report_type": schedule["report_type"],
+                "content": {
+                    "report": output.get("report", ""),
+                    "fallback": output.get("fallback", False),
+                    "scheduled_for": schedule["scheduled_for"],
+                    "email_recipients": schedule.get("email_recipients") or [],
+                },
+                "created_at": now,
+            })
+            await asyncio.to_thread(self.store.record_run, schedule["id"], now)
+            return True
+        except Exception as e:
+            log_event("scheduler", "report_failed", level="error", schedule_id=schedule["id"], error=str(e))
+            await asyncio.to_thread(self.store.record_run, schedule["id"], time.time(), error=str(e))
+            return False
+    
+    def stats(self) -> dict:
+        return {**self.counters, "running": self._loop_task is not None, "workers": self.workers}
+    
+    async def shutdown(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+
+def _report_state(schedule: dict, frame, collab: dict | None = None) -> dict:
+    return {
+        "messages": [],
+        "task_type": "report",
+        "user_id": schedule["user_id"],
+        "dataset_id": schedule["dataset_id"],
+        "data": None,
+        "frame": frame,
+        "source": None,
+        "columns": [str(col) for col in frame.columns],
+        "company_name": None,
+        "topic": None,
+        "context": None,
+        "participants": None,
+        "meeting_mode": None,
+        "sections": None,
+        "analysis_options": None,
+        "deadline": time.time() + settings.generation_deadline_seconds,
+        "next_agent": "",
+        "delegate_to": None,
+        "collaboration_results": collab or {},
+        "final_output": None
+    }
+
+
+schedule_store = SQLiteScheduleStore(settings.scheduler_store_path)
+report_scheduler = ReportScheduler(
+    schedule_store,
+    dataset_store,
+    workers=settings.scheduler_workers,
+    interval_seconds=settings.scheduler_interval_seconds,
+    batch_size=settings.scheduler_batch_size
+)
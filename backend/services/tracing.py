@@ -0,0 +1,281 @@
+"""
+Request-scoped tracing
+W3C traceparent propagation, spans held in a contextvar (so they follow asyncio
+tasks, graph nodes and pool threads), export to a JSONL file or an OTLP/HTTP
+JSON collector, and structured log events tied to the active span
+"""
+
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from config.settings import settings
+
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; attributes and events are plain JSON-able values"""
+    
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, sampled: bool, attributes: dict | None = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.events: list = []
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+    
+    def set(self, **attributes) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+    
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+    
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+    
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header, None if invalid"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, traceparent: str | None = None, **attributes):
+    """
+    Child of the active span, or a new root (continuing traceparent when given)
+    New traces are sampled at settings.trace_sample_rate; the decision is inherited
+    """
+    parent = _current_span.get()
+    remote = parse_traceparent(traceparent) if parent is None else None
+    if parent is not None:
+        span = Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+    elif remote is not None:
+        span = Span(name, remote[0], remote[1], remote[2], attributes)
+    else:
+        sampled = random.random() < settings.trace_sample_rate
+        span = Span(name, os.urandom(16).hex(), None, sampled, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        if span.sampled:
+            exporter.export(span)
+
+
+def record_span(name: str, start_ns: int, **attributes) -> None:
+    """Child span of the active span for an interval that has already elapsed (start_ns until now)"""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return
+    span = Span(name, parent.trace_id, parent.span_id, True, attributes)
+    span.start_ns = start_ns
+    span.end_ns = time.time_ns()
+    exporter.export(span)
+
+
+def set_attributes(**attributes) -> None:
+    """Attach attributes to the active span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def log_event(component: str, event: str, level: str = "info", **fields) -> None:
+    """
+    Structured log line tied to the active span
+    Recorded on the span and printed as JSON when the trace is sampled
+    (errors are always printed)
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.add_event(f"{component}.{event}", **fields)
+    if level != "error" and not (span.sampled if span is not None else random.random() < settings.trace_sample_rate):
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "level": level,
+        "component": component,
+        "event": event,
+        "trace_id": span.trace_id if span else None,
+        "span_id": span.span_id if span else None,
+        **fields,
+    }
+    print(json.dumps(record, default=str, ensure_ascii=False), flush=True)
+
+
+class SpanExporter(ABC):
+    """Buffers finished spans and flushes them from a background thread; write() sends a batch"""
+    
+    def __init__(self, batch_size: int = 256, interval_seconds: float = 2.0):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._buffer: list = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+    
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span.to_dict())
+            full = len(self._buffer) >= self.batch_size
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+            self._thread.start()
+        if full:
+            self._wakeup.set()
+    
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+            self.flush()
+    
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            try:
+                self.write(batch)
+            except Exception as e:
+                log_event("tracing", "export_failed", level="error", spans=len(batch), error=str(e))
+    
+    @abstractmethod
+    def write(self, spans: list) -> None:
+        ...
+
+
+class NoopExporter(SpanExporter):
+    def export(self, span: Span) -> None:
+        pass
+    
+    def write(self, spans: list) -> None:
+        pass
+
+
+class FileExporter(SpanExporter):
+    """One JSON span per line"""
+    
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    
+    def write(self, spans: list) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else json.dumps(value, default=str)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPExporter(SpanExporter):
+    """POSTs batches to an OTLP/HTTP collector using the JSON encoding (/v1/traces)"""
+    
+    def __init__(self, endpoint: str, service_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+    
+    def write(self, spans: list) -> None:
+        import httpx
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "insightflow"},
+                    "spans": [
+                        {
+                            "traceId": span["trace_id"],
+                            "spanId": span["span_id"],
+                            "parentSpanId": span["parent_id"] or "",
+                            "name": span["name"],
+                            "kind": 1,
+                            "startTimeUnixNano": str(span["start_ns"]),
+                            "endTimeUnixNano": str(span["end_ns"]),
+                            "attributes": _otlp_attributes(span["attributes"]),
+                            "events": [
+                                {
+                                    "name": event["name"],
+                                    "timeUnixNano": str(event["time_ns"]),
+                                    "attributes": _otlp_attributes(event["attributes"]),
+                                }
+                                for event in span["events"]
+                            ],
+                            "status": {"code": 2 if span["status"] == "error" else 1},
+                        }
+                        for span in spans
+                    ],
+                }],
+            }]
+        }
+        httpx.post(self.url, json=payload, timeout=5.0).raise_for_status()
+
+
+def build_exporter() -> SpanExporter:
+    if settings.trace_exporter == "file":
+        return FileExporter(settings.trace_file_path)
+    if settings.trace_exporter == "otlp":
+        return OTLPExporter(settings.trace_otlp_endpoint, settings.trace_service_name)
+    return NoopExporter()
+
+
+exporter = build_exporter()
@@ -0,0 +1,5 @@
+# Backend modules import each other from the backend root (config, services, tools, ...)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+
+
+def test_analyze_statistics_of_a_one_row_dataset():
+    from api.main import app
+    
+    response = TestClient(app).post("/api/analysis/analyze", json={
+        "user_id": "u",
+        "dataset_id": "d",
+        "data": [{"a": 1.5, "b": 2}],
+        "columns": ["a", "b"],
+        "sections": ["statistics"],
+        "mode": "fast"
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["statistics"]["a"]["std"] is None
+
+
+def test_cache_key_of_a_large_payload_is_hashed_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+    from api.routes import analysis
+    from services.analysis_cache import fingerprint
+    
+    hash_threads = []
+    
+    def recording_fingerprint(content, options):
+        hash_threads.append(threading.get_ident())
+        return fingerprint(content, options)
+    
+    async def compute():
+        return {"value": 1, "_complete": False}
+    
+    monkeypatch.setattr(analysis, "fingerprint", recording_fingerprint)
+    rows = [{"a": i, "b": str(i) * 8, "c": i / 3} for i in range(300_000)]
+    
+    async def run():
+        beats = 0
+        
+        async def heartbeat():
+            nonlocal beats
+            while True:
+                await asyncio.sleep(0.005)
+                beats += 1
+        
+        ticker = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0)
+        response = await analysis._cached(rows, {"task_type": "data_analysis"}, compute)
+        ticker.cancel()
+        return response, beats, threading.get_ident()
+    
+    response, beats, loop_thread = asyncio.run(run())
+    assert response == {"value": 1, "cached": False}
+    assert hash_threads and loop_thread not in hash_threads
+    # The loop kept ticking while the rows were serialized and hashed
+    assert beats >= 5
+
+
+def test_malformed_upload_is_a_client_error():
+    from api.main import app
+    
+    client = TestClient(app)
+    for fmt, body in [("parquet", b"not a parquet file"), ("arrow", b"not an arrow file"), ("csv", b'a,b\n1,2,3\n"x')]:
+        response = client.post(f"/api/analysis/analyze/upload?user_id=u&dataset_id=d&format={fmt}&mode=fast", content=body)
+        assert response.status_code == 400, (fmt, response.text)
+        assert response.json()["detail"].startswith(f"Cannot read {fmt} upload")
+
+
+class _InsightModel:
+    """Answers insight prompts after `delay` seconds"""
+    model = "insights"
+    temperature = 0.7
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+    
+    async def ainvoke(self, messages, *args, **kwargs):
+        import asyncio
+        from langchain_core.messages import AIMessage
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return AIMessage(content="LLM insights")
+
+
+def test_deadline_fallback_insights_are_not_cached(monkeypatch):
+    import agents.orchestrator as orchestrator
+    from api.main import app
+    from config.settings import settings
+    
+    model = _InsightModel(delay=3.0)
+    monkeypatch.setattr(orchestrator.llm, "_model", model)
+    monkeypatch.setattr(orchestrator.llm, "cache", None)
+    # Let the call start, so the gateway (not the pre-call budget check) hits the deadline
+    monkeypatch.setattr(settings, "insight_min_budget_seconds", 0.0)
+    client = TestClient(app)
+    request = {
+        "user_id": "u", "dataset_id": "deadline",
+        "data": [{"x": i, "y": i * 3 % 7} for i in range(30)], "columns": ["x", "y"]
+    }
+    
+    # Compile the graph and load pandas first so the analysis itself fits the short deadline
+    client.post("/api/analysis/analyze", json={**request, "dataset_id": "warm", "data": request["data"][:2], "mode": "fast"})
+    
+    short = client.post("/api/analysis/analyze", json={**request, "timeout_seconds": 1.0}).json()
+    assert short["insights_source"] == "fallback" and short["cached"] is False
+    assert model.calls == 1
+    
+    # With budget left the next identical request is not served the fallback from the cache
+    model.delay = 0.0
+    retried = client.post("/api/analysis/analyze", json=request).json()
+    assert retried["insights_source"] == "llm" and retried["cached"] is False
+    assert "LLM insights" in retried["analysis_report"] and model.calls == 2
+    assert client.post("/api/analysis/analyze", json=request).json()["cached"] is True
@@ -0,0 +1,47 @@
+import asyncio
+from services.analysis_cache import AnalysisCache
+
+
+def test_coalesced_results_are_not_reported_as_hits():
+    cache = AnalysisCache(max_bytes=1_000_000, ttl_seconds=60)
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+    
+    async def run():
+        first = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(3)))
+        return first, await cache.get_or_compute("k", compute)
+    
+    first, again = asyncio.run(run())
+    assert len(calls) == 1
+    assert [hit for _, hit in first] == [False, False, False]
+    assert again == ({"value": 1}, True)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1 and cache.stats()["coalesced"] == 2
+
+
+def test_waiters_take_over_when_the_leader_is_cancelled():
+    cache = AnalysisCache(max_bytes=1_000_000, ttl_seconds=60)
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": len(calls)}
+    
+    async def run():
+        leader = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        return results
+    
+    results = asyncio.run(run())
+    # One waiter recomputes; the other shares its computation
+    assert len(calls) == 2
+    assert results == [({"value": 2}, False), ({"value": 2}, False)]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from tools.correlations import categorical_associations, correlation_matrix
+
+
+def test_kendall_matches_scipy_tau_b_with_ties_and_missing_values():
+    rng = np.random.default_rng(5)
+    X = np.column_stack([
+        rng.integers(0, 5, 300),
+        rng.integers(0, 3, 300) + rng.integers(0, 5, 300),
+        rng.normal(size=300),
+    ]).astype(float)
+    X[rng.choice(300, 30, replace=False), 2] = np.nan
+    R = correlation_matrix(X, "kendall")
+    for i in range(3):
+        for j in range(i + 1, 3):
+            complete = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+            expected = stats.kendalltau(X[complete, i], X[complete, j], variant="b").statistic
+            assert R[i, j] == pytest.approx(expected, abs=1e-12)
+            assert R[j, i] == R[i, j]
+
+
+def test_kendall_of_a_constant_column_is_undefined():
+    X = np.array([[1.0, 4.0], [2.0, 4.0], [3.0, 4.0]])
+    R = correlation_matrix(X, "kendall")
+    assert R[0, 0] == 1.0
+    assert np.isnan(R[0, 1]) and np.isnan(R[1, 1])
+
+
+def test_cramers_v_matches_scipy_and_handles_constant_columns():
+    rng = np.random.default_rng(2)
+    a = rng.choice(["x", "y", "z"], 500)
+    b = np.where(rng.random(500) < 0.7, a, rng.choice(["x", "y", "z"], 500))
+    frame = pd.DataFrame({"a": a, "b": b, "same": a, "constant": "k"})
+    V = categorical_associations(frame, ["a", "b", "same", "constant"], [])["cramers_v"]
+    
+    table = pd.crosstab(frame["a"], frame["b"]).to_numpy()
+    assert V[0, 1] == pytest.approx(stats.contingency.association(table, method="cramer"), abs=1e-12)
+    assert V[0, 2] == pytest.approx(1.0)
+    # One level: no degrees of freedom, so the association is undefined
+    assert np.isnan(V[0, 3]) and np.isnan(V[3, 3])
+
+
+def test_correlation_ratio_matches_hand_computed_values():
+    frame = pd.DataFrame({
+        "group": ["a", "a", "b", "b", None],
+        "constant_group": ["k"] * 5,
+        "y": [1.0, 2.0, 3.0, 5.0, 7.0],
+        "flat": [2.0] * 5,
+    })
+    eta = categorical_associations(frame, ["group", "constant_group"], ["y", "flat"])["correlation_ratio"]
+    # Rows with a missing group are left out: y = 1, 2 | 3, 5 around mean 2.75
+    between = 2 * 1.25 ** 2 + 2 * 1.25 ** 2
+    total = 1.75 ** 2 + 0.75 ** 2 + 0.25 ** 2 + 2.25 ** 2
+    assert eta[0, 0] == pytest.approx(np.sqrt(between / total))
+    assert eta[1, 0] == 0.0
+    # A constant numeric column has no variance to explain
+    assert np.isnan(eta[0, 1]) and np.isnan(eta[1, 1])
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from api.main import app
+from services import dataset_store
+
+
+def test_put_stores_rows_as_parquet_for_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "root", tmp_path)
+    (tmp_path / "sales.csv").write_text("region,revenue\nnorth,1\n")
+    client = TestClient(app)
+    
+    response = client.put(
+        "/api/analysis/datasets/sales",
+        content="region,revenue\nnorth,10\nsouth,5\nnorth,2\n",
+        headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["rows"] == 3 and response.json()["columns"] == ["region", "revenue"]
+    # The stale CSV would otherwise shadow the stored Parquet file
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["sales.parquet"]
+    
+    result = client.post("/api/analysis/query", json={
+        "dataset_id": "sales",
+        "group_by": ["region"],
+        "aggregates": [{"func": "sum", "column": "revenue", "alias": "revenue"}],
+        "sort": [{"column": "revenue", "descending": True}]
+    }).json()
+    assert result["rows"] == [["north", 12], ["south", 5]]
+
+
+def test_put_rejects_invalid_dataset_ids(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "root", tmp_path)
+    response = TestClient(app).put(
+        "/api/analysis/datasets/bad.id",
+        content="a\n1\n",
+        headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
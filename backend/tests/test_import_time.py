@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+# Time api.main may add on top of `import fastapi` (about 300ms today)
+DEFAULT_BUDGET_MS = 500
+
+
+def run_check(*args):
+    return subprocess.run(
+        [sys.executable, "scripts/check_import_time.py", "--runs", "3", *args],
+        cwd=BACKEND_ROOT, capture_output=True, text=True
+    )
+
+
+def test_api_import_stays_within_budget():
+    # Fails if pandas/numpy/pyarrow, the Gemini client or LangGraph load at import (warmup
+    # loads them), or if api.main adds more than the budget on top of `import fastapi`;
+    # IMPORT_BUDGET_MS overrides the default on slower machines
+    result = run_check("--budget-ms", os.environ.get("IMPORT_BUDGET_MS", str(DEFAULT_BUDGET_MS)))
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from tools.insights import deterministic_insights
+
+
+class _CountingModel:
+    model = "counting"
+    temperature = 0.7
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.calls += 1
+        raise AssertionError("fast mode must not call the LLM")
+
+
+def _rows() -> list:
+    # y tracks x, z has two extreme values, w is 40% missing
+    return [
+        {"x": i, "y": 2 * i + i % 3, "z": 500 if i in (5, 17) else 10 + i % 4, "w": None if i % 5 < 2 else i % 7}
+        for i in range(40)
+    ]
+
+
+def test_fast_mode_derives_findings_without_the_llm(monkeypatch):
+    import agents.orchestrator as orchestrator
+    from api.main import app
+    
+    model = _CountingModel()
+    monkeypatch.setattr(orchestrator.llm, "_model", model)
+    monkeypatch.setattr(orchestrator.llm, "cache", None)
+    response = TestClient(app).post("/api/analysis/analyze", json={
+        "user_id": "u", "dataset_id": "fast", "data": _rows(), "columns": ["x", "y", "z", "w"], "mode": "fast"
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    
+    assert model.calls == 0 and body["insights_source"] == "rules"
+    insights = body["analysis_report"].split("**Insights:**")[1]
+    assert "• x and y are strongly positively correlated (r=1.0)." in insights
+    assert "• w is 40.0% missing; consider imputing or excluding it." in insights
+    assert "• z has 2 outlier value(s) (5.0%) outside the IQR fences." in insights
+    assert "• z is right-skewed" in insights
+    assert "• Data quality is 90.0/100 with 10.0% of cells missing across 40 rows and 4 columns." in insights
+
+
+def test_insights_are_ordered_by_rule_and_capped():
+    analysis = {
+        "quality_score": 80.0, "missing": 0, "total": 0,
+        "correlations": {"pairs": [{"x": "a", "y": "b", "r": -0.8}, {"x": "a", "y": "c", "r": 0.1}]},
+        "outliers": {"c": {"count": 3, "percentage": 15.0}},
+    }
+    assert deterministic_insights(analysis, limit=2).splitlines() == [
+        "• Data quality is 80.0/100.",
+        "• a and b are strongly negatively correlated (r=-0.8).",
+    ]
+    assert deterministic_insights({}) == "• Not enough computed results to derive insights."
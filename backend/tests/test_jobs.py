@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import pytest
+from services.jobs import JobManager, JobStore, SQLiteJobStore
+
+
+def test_job_store_requires_every_method_the_manager_uses():
+    class NoHeartbeat(JobStore):
+        def create(self, job): ...
+        def get(self, job_id): ...
+        def update(self, job_id, **fields): ...
+        def list(self, user_id=None, limit=50): ...
+    
+    with pytest.raises(TypeError):
+        NoHeartbeat()
+
+
+def test_store_calls_run_off_the_event_loop(tmp_path):
+    loop_thread = threading.get_ident()
+    store_threads = []
+    
+    class Recording(SQLiteJobStore):
+        def get(self, job_id):
+            store_threads.append(threading.get_ident())
+            return super().get(job_id)
+        
+        def update(self, job_id, **fields):
+            store_threads.append(threading.get_ident())
+            return super().update(job_id, **fields)
+    
+    async def run_job():
+        manager = JobManager(Recording(str(tmp_path / "jobs.sqlite3")), workers=1, heartbeat_seconds=60)
+        
+        async def work(progress):
+            await progress("router")
+            return {"ok": True}
+        
+        job = await manager.submit("analysis", "u", {}, work)
+        async for current in manager.watch(job["id"], poll_seconds=0.05):
+            pass
+        await manager.shutdown()
+        return current
+    
+    job = asyncio.run(run_job())
+    assert job["status"] == "succeeded" and job["result"] == {"ok": True}
+    assert job["progress"]["nodes_completed"] == ["router"]
+    assert store_threads and loop_thread not in store_threads
+
+
+def test_heartbeat_store_calls_do_not_queue_behind_the_analysis_pool(tmp_path):
+    loop_thread = threading.get_ident()
+    store_threads = []
+    
+    class Recording(SQLiteJobStore):
+        def heartbeat(self, job_ids):
+            store_threads.append((threading.get_ident(), threading.current_thread().name))
+            return super().heartbeat(job_ids)
+        
+        def fail_stale(self, older_than):
+            store_threads.append((threading.get_ident(), threading.current_thread().name))
+            return super().fail_stale(older_than)
+    
+    manager = JobManager(Recording(str(tmp_path / "jobs.sqlite3")), workers=1)
+    
+    async def run():
+        await manager.call_store("heartbeat", ["missing"])
+        return await manager.call_store("fail_stale", older_than=30)
+    
+    assert asyncio.run(run()) == 0
+    assert len(store_threads) == 2
+    # Neither on the loop nor on the analysis pool's threads (named "analysis_*")
+    assert all(ident != loop_thread and not name.startswith("analysis") for ident, name in store_threads)
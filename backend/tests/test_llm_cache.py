@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+import threading
+from services.llm_cache import LLMResponseCache
+
+
+def test_sqlite_tier_runs_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    loop_thread = threading.get_ident()
+    disk_threads = []
+    
+    class Recording(LLMResponseCache):
+        def _disk_get(self, key):
+            disk_threads.append(threading.get_ident())
+            return super()._disk_get(key)
+        
+        def _disk_put(self, *args):
+            disk_threads.append(threading.get_ident())
+            return super()._disk_put(*args)
+    
+    async def roundtrip():
+        await Recording(10, 60, path).aput("k", "cached text")
+        # A fresh instance has an empty memory tier and must read the row back from SQLite
+        reader = Recording(10, 60, path)
+        assert await reader.aget("k") == "cached text"
+        assert await reader.aget("missing") is None
+        return reader.stats()
+    
+    stats = asyncio.run(roundtrip())
+    assert stats["disk_hits"] == 1 and stats["misses"] == 1
+    assert disk_threads and loop_thread not in disk_threads
+
+
+def test_expired_rows_are_pruned_on_an_interval(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    cache = LLMResponseCache(10, 60, path, prune_interval_seconds=3600)
+    cache.put("old", "a")
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE llm_responses SET expires_at = 0")
+    cache.put("new", "b")
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] == 2
+        conn.execute("UPDATE llm_responses SET expires_at = 0")
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list(llm_responses)")]
+    assert "llm_responses_expires" in indexes
+    
+    from prometheus_client import REGISTRY
+    pruned_before = REGISTRY.get_sample_value("insightflow_llm_cache_evictions_total", {"tier": "sqlite"}) or 0.0
+    cache._last_prune -= 3600
+    cache.put("newest", "c")
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT key FROM llm_responses").fetchall() == [("newest",)]
+    assert REGISTRY.get_sample_value("insightflow_llm_cache_evictions_total", {"tier": "sqlite"}) - pruned_before == 2
+
+
+def test_hits_misses_and_evictions_are_exported_per_tier(tmp_path):
+    from prometheus_client import REGISTRY
+    
+    def sample(name, tier):
+        return REGISTRY.get_sample_value(f"insightflow_llm_cache_{name}_total", {"tier": tier}) or 0.0
+    
+    names = [(name, tier) for name in ("hits", "misses", "evictions") for tier in ("memory", "sqlite")]
+    before = {key: sample(*key) for key in names}
+    
+    async def run():
+        writer = LLMResponseCache(1, 60, str(tmp_path / "llm.sqlite3"))
+        await writer.aput("a", "first")
+        await writer.aput("b", "second")  # evicts "a" from memory
+        assert await writer.aget("b") == "second"  # memory hit
+        assert await writer.aget("a") == "first"  # memory miss, sqlite hit
+        assert await writer.aget("c") is None  # miss in both tiers
+    
+    asyncio.run(run())
+    delta = {key: sample(*key) - before[key] for key in names}
+    assert delta == {
+        ("hits", "memory"): 1, ("hits", "sqlite"): 1,
+        ("misses", "memory"): 2, ("misses", "sqlite"): 1,
+        # Re-reading "a" from sqlite pushes "b" out of the one-entry memory tier
+        ("evictions", "memory"): 2, ("evictions", "sqlite"): 0,
+    }
@@ -0,0 +1,133 @@
+import asyncio
+import time
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.llm_gateway import LLMBudgetExhausted, LLMGateway, TokenBucket
+
+
+class _FakeModel:
+    """ainvoke returns after `delays[i]` seconds for call i, or raises `errors[i]`"""
+    model = "fake"
+    temperature = 0.0
+    
+    def __init__(self, delays=(), errors=()):
+        self.delays = list(delays)
+        self.errors = list(errors)
+        self.calls = 0
+    
+    async def ainvoke(self, messages, config=None, **kwargs):
+        index = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.delays[index] if index < len(self.delays) else 0.0)
+        if index < len(self.errors) and self.errors[index] is not None:
+            raise self.errors[index]
+        return AIMessage(content=f"answer {index}")
+
+
+def _gateway(model, **kwargs) -> LLMGateway:
+    options = {"retry_base_seconds": 0.01, "retry_max_seconds": 0.02, "deadline_seconds": 5.0, **kwargs}
+    return LLMGateway(model, **options)
+
+
+PROMPT = [HumanMessage(content="Summarize the dataset")]
+
+
+def test_identical_concurrent_prompts_share_one_provider_call():
+    model = _FakeModel(delays=[0.05])
+    gateway = _gateway(model)
+    
+    async def run():
+        return await asyncio.gather(*(gateway.ainvoke(PROMPT) for _ in range(5)))
+    
+    responses = asyncio.run(run())
+    assert model.calls == 1
+    assert {response.content for response in responses} == {"answer 0"}
+    assert gateway.counters["coalesced"] == 4 and gateway.stats()["in_flight"] == 0
+
+
+
+def test_waiters_coalesce_again_when_the_leader_is_cancelled():
+    model = _FakeModel(delays=[0.2, 0.05])
+    gateway = _gateway(model)
+    
+    async def run():
+        leader = asyncio.create_task(gateway.ainvoke(PROMPT))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(gateway.ainvoke(PROMPT)) for _ in range(2)]
+        cancelled_waiter = asyncio.create_task(gateway.ainvoke(PROMPT))
+        await asyncio.sleep(0.01)
+        # The leader and one waiter are cancelled at the same moment
+        leader.cancel()
+        cancelled_waiter.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled_waiter
+        return results
+    
+    results = asyncio.run(run())
+    # One provider call for the cancelled leader, then one shared by both surviving waiters
+    assert model.calls == 2
+    assert [response.content for response in results] == ["answer 1", "answer 1"]
+    assert gateway.stats()["in_flight"] == 0
+
+def test_transient_errors_are_retried_and_others_are_not():
+    model = _FakeModel(errors=[ConnectionError("reset"), RuntimeError("429 ResourceExhausted")])
+    gateway = _gateway(model)
+    assert asyncio.run(gateway.ainvoke(PROMPT)).content == "answer 2"
+    assert gateway.counters["retried"] == 2
+    
+    model = _FakeModel(errors=[ValueError("bad request")])
+    gateway = _gateway(model)
+    with pytest.raises(ValueError):
+        asyncio.run(gateway.ainvoke(PROMPT))
+    assert model.calls == 1 and gateway.counters["failed"] == 1
+
+
+def test_deadline_expiry_raises_budget_exhausted():
+    model = _FakeModel(delays=[1.0])
+    gateway = _gateway(model)
+    started = time.monotonic()
+    with pytest.raises(LLMBudgetExhausted):
+        asyncio.run(gateway.ainvoke(PROMPT, deadline=time.time() + 0.1))
+    assert time.monotonic() - started < 0.5
+    
+    # A deadline that has already passed never reaches the provider
+    model = _FakeModel()
+    with pytest.raises(LLMBudgetExhausted):
+        asyncio.run(_gateway(model).ainvoke(PROMPT, deadline=time.time() - 1))
+    assert model.calls == 0
+
+
+def test_rate_limit_wait_counts_against_the_deadline():
+    model = _FakeModel()
+    gateway = _gateway(model, requests_per_minute=1)
+    
+    async def run():
+        await gateway.ainvoke(PROMPT)
+        # The bucket refills one request per minute, far beyond this deadline
+        await gateway.ainvoke([HumanMessage(content="Another prompt")], deadline=time.time() + 0.1)
+    
+    with pytest.raises(LLMBudgetExhausted, match="rate limits"):
+        asyncio.run(run())
+    assert model.calls == 1
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(per_minute=600)
+        assert await bucket.acquire(600) == 0.0
+        assert not bucket.try_acquire(10)
+        return await bucket.acquire(2)
+    
+    waited = asyncio.run(run())
+    assert 0.15 <= waited <= 0.5
+
+
+def test_slow_call_is_hedged_and_the_faster_copy_wins():
+    model = _FakeModel(delays=[1.0, 0.01])
+    gateway = _gateway(model, hedge_percentile=0.5, hedge_min_samples=1)
+    gateway._latencies.append(0.02)
+    started = time.monotonic()
+    response = asyncio.run(gateway.ainvoke(PROMPT))
+    assert response.content == "answer 1" and time.monotonic() - started < 0.5
+    assert gateway.counters["hedged"] == 1 and gateway.counters["hedge_wins"] == 1
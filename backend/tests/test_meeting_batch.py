@@ -0,0 +1,75 @@
+import json
+from fastapi.testclient import TestClient
+
+
+class _FailingModel:
+    model = "failing"
+    temperature = 0.7
+    
+    async def ainvoke(self, messages, *args, **kwargs):
+        raise ValueError("quota exhausted")
+
+
+def _events(body: str) -> list:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_batch_items_with_llm_errors_are_failures(monkeypatch):
+    import agents.orchestrator as orchestrator
+    from api.main import app
+    
+    monkeypatch.setattr(orchestrator.llm, "_model", _FailingModel())
+    monkeypatch.setattr(orchestrator.llm, "cache", None)
+    response = TestClient(app).post("/api/meetings/generate/batch", json={
+        "items": [{"user_id": "u", "company_name": "Acme", "topic": "Q1"}]
+    })
+    assert response.status_code == 200
+    events = _events(response.text)
+    
+    result = [data for event, data in events if event == "result"][0]
+    assert result["success"] is False
+    assert "quota exhausted" in result["error"]
+    done = [data for event, data in events if event == "done"][0]
+    assert done["succeeded"] == 0 and done["failed"] == 1
+
+
+class _SlowModel:
+    """Answers every section after DELAY seconds, with enough text to pass the length checks"""
+    model = "slow"
+    temperature = 0.7
+    DELAY = 0.3
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def ainvoke(self, messages, *args, **kwargs):
+        import asyncio
+        from langchain_core.messages import AIMessage
+        self.calls += 1
+        await asyncio.sleep(self.DELAY)
+        return AIMessage(content="Generated section text " * 5)
+
+
+def test_parallel_mode_generates_sections_concurrently(monkeypatch):
+    import agents.orchestrator as orchestrator
+    from api.main import app
+    
+    model = _SlowModel()
+    monkeypatch.setattr(orchestrator.llm, "_model", model)
+    monkeypatch.setattr(orchestrator.llm, "cache", None)
+    response = TestClient(app).post("/api/meetings/generate", json={
+        "user_id": "u", "company_name": "Acme", "topic": "Q1", "meeting_mode": "parallel"
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    latency = body["latency_ms"]
+    
+    assert model.calls == 2 and body["mode"] == "parallel"
+    # Each section carries its own latency, and the total is well under their sum
+    assert latency["research_ms"] >= _SlowModel.DELAY * 1000 and latency["agenda_ms"] >= _SlowModel.DELAY * 1000
+    assert latency["total_ms"] < 2 * _SlowModel.DELAY * 1000
+    assert latency["total_ms"] < latency["research_ms"] + latency["agenda_ms"]
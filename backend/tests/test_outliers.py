@@ -0,0 +1,44 @@
+import json
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from tools.outliers import detect_outliers
+
+
+def _strict_json(payload) -> None:
+    json.dumps(payload, allow_nan=False)
+
+
+def test_constant_column_has_no_nan_scores():
+    frame = pd.DataFrame({"constant": [5.0] * 20, "values": np.arange(20, dtype=float)})
+    summary = detect_outliers(frame, methods=["zscore", "mad"], top_n=3)
+    _strict_json(summary)
+    assert summary["constant"]["methods"]["zscore"]["count"] == 0
+    assert summary["constant"]["top_extremes"] == []
+    assert len(summary["values"]["top_extremes"]) == 3
+    
+    by_mad = detect_outliers(frame, methods=["mad"], top_n=3)
+    _strict_json(by_mad)
+    assert by_mad["constant"]["top_extremes"] == []
+
+
+def test_single_row_column_reports_missing_std():
+    summary = detect_outliers(pd.DataFrame({"x": [1.0]}), methods=["zscore"], top_n=1)
+    _strict_json(summary)
+    assert summary["x"]["methods"]["zscore"]["std"] is None
+
+
+def test_analyze_endpoint_with_degenerate_columns():
+    from api.main import app
+    
+    response = TestClient(app).post("/api/analysis/analyze", json={
+        "user_id": "u",
+        "dataset_id": "d",
+        "data": [{"constant": 1, "single": 2 if i == 0 else None} for i in range(5)],
+        "columns": ["constant", "single"],
+        "sections": ["outliers"],
+        "outlier_methods": ["zscore", "mad"],
+        "outlier_top_n": 3,
+        "mode": "fast"
+    })
+    assert response.status_code == 200, response.text
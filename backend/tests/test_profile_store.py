@@ -0,0 +1,64 @@
+import sqlite3
+import pytest
+from services.profile_store import SQLiteProfileStore
+
+
+class _NoWaitProfileStore(SQLiteProfileStore):
+    def _connect(self) -> sqlite3.Connection:
+        conn = super()._connect()
+        conn.execute("PRAGMA busy_timeout = 0")
+        return conn
+
+
+def test_update_reports_lock_error_when_begin_fails(tmp_path):
+    store = _NoWaitProfileStore(str(tmp_path / "profiles.sqlite3"))
+    store.update("d", lambda payload: ({"rows": 1}, None))
+    
+    holder = sqlite3.connect(store.path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            store.update("d", lambda payload: (payload, None))
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    
+    assert store.update("d", lambda payload: ({"rows": payload["rows"] + 1}, payload["rows"])) == 1
+    assert store.load("d") == {"rows": 2}
+
+
+def test_appended_chunks_match_a_full_recompute(tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from fastapi.testclient import TestClient
+    from api.main import app
+    from api.routes import analysis
+    
+    monkeypatch.setattr(analysis, "profile_store", SQLiteProfileStore(str(tmp_path / "profiles.sqlite3")))
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({"a": rng.normal(10, 3, 60), "b": rng.normal(0, 1, 60)})
+    frame["c"] = frame["a"] * 2 + rng.normal(0, 1, 60)
+    frame.loc[rng.choice(60, 8, replace=False), "b"] = np.nan
+    # All-null in the first chunk, numeric afterwards
+    frame["late"] = np.where(np.arange(60) < 20, np.nan, rng.normal(5, 2, 60))
+    
+    client = TestClient(app)
+    for start in range(0, 60, 20):
+        chunk = frame.iloc[start:start + 20].astype(object).where(frame.iloc[start:start + 20].notna(), None)
+        response = client.post("/api/analysis/datasets/d/append", json={"user_id": "u", "data": chunk.to_dict("records")})
+        assert response.status_code == 200, response.text
+    
+    profile = client.get("/api/analysis/datasets/d/profile?correlation_mode=matrix").json()
+    assert profile["rows_total"] == 60
+    assert profile["missing_by_column"] == {column: int(count) for column, count in frame.isna().sum().items()}
+    # Responses are rounded to two decimals
+    close = lambda expected: pytest.approx(expected, abs=0.011)
+    for column in frame:
+        stats = profile["statistics"][column]
+        assert stats["count"] == frame[column].count()
+        assert stats["mean"] == close(frame[column].mean())
+        assert stats["std"] == close(frame[column].std())
+    expected = frame.corr(method="pearson")
+    for left in frame:
+        for right in frame:
+            assert profile["correlations"][left][right] == close(expected.loc[left, right])
@@ -0,0 +1,76 @@
+import asyncio
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from services import dataset_store
+from tools.query import query_file, query_frame
+
+
+def _frame():
+    return pd.DataFrame({
+        "region": ["north", "south", None, "north", "east", None, "south", "west"],
+        "product": ["apple pie", "banana", "apple", None, "cherry", "apple tart", "pineapple", "kiwi"],
+        "revenue": [10.0, None, 7.5, 3.0, None, 1.0, 4.5, 8.0],
+        "units": [1, 2, 3, 4, 5, 6, 7, 8],
+    })
+
+
+def _files(tmp_path):
+    frame = _frame()
+    frame.to_csv(tmp_path / "sales.csv", index=False)
+    frame.to_parquet(tmp_path / "sales.parquet", index=False)
+    return {"csv": str(tmp_path / "sales.csv"), "parquet": str(tmp_path / "sales.parquet")}
+
+
+CASES = [
+    [{"column": "region", "op": "not_in", "value": ["north"]}],
+    [{"column": "region", "op": "in", "value": ["north", "east"]}],
+    [{"column": "region", "op": "!=", "value": "south"}],
+    [{"column": "product", "op": "contains", "value": "apple"}],
+    [{"column": "revenue", "op": ">", "value": 2}],
+    [{"column": "revenue", "op": "<=", "value": 7.5}, {"column": "region", "op": "not_null"}],
+    [{"column": "revenue", "op": "is_null"}],
+    [{"column": "units", "op": "not_in", "value": [1, 2, 3]}, {"column": "product", "op": "contains", "value": "a"}],
+]
+
+
+@pytest.mark.parametrize("filters", CASES)
+def test_pushdown_scan_matches_in_memory_filtering(tmp_path, filters):
+    paths = _files(tmp_path)
+    for spec in [
+        {"filters": filters, "group_by": ["units"], "sort": [{"column": "units"}]},
+        {"filters": filters, "aggregates": [{"func": "sum", "column": "revenue"}, {"func": "count"}]},
+    ]:
+        expected = query_frame(_frame(), spec)
+        for fmt, path in paths.items():
+            assert query_file(path, fmt, spec) == expected, (fmt, spec)
+
+
+def test_query_endpoint_reads_the_version_off_the_event_loop(tmp_path, monkeypatch):
+    from api.main import app
+    
+    on_loop = []
+    original = type(dataset_store).version
+    
+    def recording(self, dataset_id):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return original(self, dataset_id)
+    
+    monkeypatch.setattr(dataset_store, "root", tmp_path)
+    monkeypatch.setattr(type(dataset_store), "version", recording)
+    _frame().to_parquet(tmp_path / "sales.parquet", index=False)
+    client = TestClient(app)
+    
+    response = client.post("/api/analysis/query", json={
+        "dataset_id": "sales",
+        "filters": [{"column": "region", "op": "not_in", "value": ["north"]}],
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["rows"] == [[4]]
+    assert on_loop and not any(on_loop)
+    
+    assert client.post("/api/analysis/query", json={"dataset_id": "missing"}).status_code == 404
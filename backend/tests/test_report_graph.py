@@ -0,0 +1,72 @@
+import asyncio
+import time
+from langchain_core.messages import AIMessage
+from agents import orchestrator
+
+
+class _FakeLLM:
+    """Stands in for the gateway: records prompts and answers immediately"""
+    
+    def __init__(self):
+        self.prompts = []
+    
+    async def ainvoke(self, messages, config=None, deadline=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return AIMessage(content="Executive summary")
+
+
+def _state(**overrides) -> dict:
+    state = {
+        "messages": [], "task_type": "report", "user_id": "u", "dataset_id": "d",
+        "data": [{"a": i, "b": i * 2.0, "c": "x" if i % 2 else None} for i in range(20)],
+        "frame": None, "source": None, "columns": ["a", "b", "c"],
+        "company_name": None, "topic": None, "context": None, "participants": None, "meeting_mode": None,
+        "sections": None, "analysis_options": None, "deadline": time.time() + 30,
+        "next_agent": "", "delegate_to": None, "collaboration_results": {}, "final_output": None,
+    }
+    return {**state, **overrides}
+
+
+def _recording_graph(monkeypatch):
+    """Fresh graph whose report branches and writer record when they run"""
+    calls = []
+    
+    def record(name, node):
+        async def run(state):
+            calls.append((name, sorted(state.get("collaboration_results") or {})))
+            return await node(state)
+        return run
+    
+    for name, branch in list(orchestrator.REPORT_BRANCHES.items()):
+        monkeypatch.setitem(orchestrator.REPORT_BRANCHES, name, record(name, branch))
+    monkeypatch.setattr(orchestrator, "report_writer_agent", record("writer", orchestrator.report_writer_agent))
+    llm = _FakeLLM()
+    monkeypatch.setattr(orchestrator, "llm", llm)
+    return orchestrator.create_agent_graph(), calls, llm
+
+
+def test_report_fans_out_to_both_branches_then_writes_once(monkeypatch):
+    graph, calls, llm = _recording_graph(monkeypatch)
+    
+    result = asyncio.run(graph.ainvoke(_state()))
+    
+    assert sorted(name for name, _ in calls[:2]) == ["report_analysis", "report_quality"]
+    # The writer runs once, after both branches have written their results
+    assert calls[2:] == [("writer", ["data_analysis", "data_quality"])]
+    collab = result["collaboration_results"]
+    assert collab["data_analysis"]["sections_computed"] == orchestrator.REPORT_ANALYSIS_SECTIONS
+    assert "quality_score" in collab["data_quality"]
+    # The branches skip the insight call; the writer is the only LLM call
+    assert len(llm.prompts) == 1 and result["final_output"] == {"report": "Executive summary"}
+
+
+def test_precomputed_branch_results_go_straight_to_the_writer(monkeypatch):
+    graph, calls, llm = _recording_graph(monkeypatch)
+    precomputed = asyncio.run(orchestrator.run_report_branches(_state()))
+    calls.clear()
+    
+    result = asyncio.run(graph.ainvoke(_state(collaboration_results=precomputed)))
+    
+    assert calls == [("writer", ["data_analysis", "data_quality"])]
+    assert result["final_output"] == {"report": "Executive summary"}
+    assert precomputed["data_analysis"]["analysis_report"] in llm.prompts[0]
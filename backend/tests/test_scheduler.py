@@ -0,0 +1,82 @@
+import sqlite3
+import time
+import pytest
+from services.scheduler import SQLiteScheduleStore
+
+
+class _NoWaitScheduleStore(SQLiteScheduleStore):
+    def _connect(self) -> sqlite3.Connection:
+        conn = super()._connect()
+        conn.execute("PRAGMA busy_timeout = 0")
+        return conn
+
+
+def test_claim_due_reports_lock_error_when_begin_fails(tmp_path):
+    store = _NoWaitScheduleStore(str(tmp_path / "schedules.sqlite3"))
+    now = time.time()
+    store.create({
+        "id": "s1", "user_id": "u", "dataset_id": "d", "title": "Daily", "frequency": "daily",
+        "time_of_day": "09:00", "report_type": "summary", "is_active": 1, "next_run_at": now - 10, "created_at": now, "updated_at": now
+    })
+    
+    holder = sqlite3.connect(store.path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            store.claim_due(now, limit=10)
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    
+    assert [schedule["id"] for schedule in store.claim_due(now, limit=10)] == ["s1"]
+
+
+def test_tick_keeps_store_calls_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+    from services.datasets import LocalDatasetStore
+    from services.scheduler import ReportScheduler
+    
+    loop_thread = threading.get_ident()
+    store_threads = []
+    
+    class SlowStore(SQLiteScheduleStore):
+        def claim_due(self, now, limit):
+            store_threads.append(threading.get_ident())
+            # Stands in for BEGIN IMMEDIATE waiting on another worker's lock
+            time.sleep(0.3)
+            return super().claim_due(now, limit)
+        
+        def record_run(self, schedule_id, ran_at, error=None):
+            store_threads.append(threading.get_ident())
+            return super().record_run(schedule_id, ran_at, error)
+    
+    store = SlowStore(str(tmp_path / "schedules.sqlite3"))
+    now = time.time()
+    store.create({
+        "id": "s1", "user_id": "u", "dataset_id": "missing", "title": "Daily", "frequency": "daily",
+        "time_of_day": "09:00", "report_type": "summary", "is_active": 1, "next_run_at": now - 10,
+        "created_at": now, "updated_at": now
+    })
+    scheduler = ReportScheduler(store, LocalDatasetStore(str(tmp_path / "datasets")), workers=1)
+    
+    async def run():
+        beats = 0
+        
+        async def heartbeat():
+            nonlocal beats
+            while True:
+                await asyncio.sleep(0.01)
+                beats += 1
+        
+        ticker = asyncio.create_task(heartbeat())
+        summary = await scheduler.tick(now)
+        ticker.cancel()
+        return summary, beats
+    
+    summary, beats = asyncio.run(run())
+    assert summary["claimed"] == 1 and summary["failed"] == 1
+    assert store.get("s1")["last_error"].startswith("Dataset unavailable")
+    # The loop kept running while claim_due slept
+    assert beats >= 10
+    assert len(store_threads) == 2 and loop_thread not in store_threads
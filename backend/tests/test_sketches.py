@@ -0,0 +1,58 @@
+import numpy as np
+from config.settings import settings
+from tools.sketches import KLLSketch
+
+
+EPSILON = settings.quantile_epsilon
+QS = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def _data():
+    rng = np.random.default_rng(7)
+    # Skewed and with many ties, like real columns
+    return np.concatenate([rng.lognormal(size=150_000), rng.integers(0, 20, 50_000).astype(float)])
+
+
+def _assert_within_rank_error(sketch: KLLSketch, values: np.ndarray) -> None:
+    ordered = np.sort(values)
+    for q, estimate in zip(QS, sketch.quantiles(QS)):
+        # The estimate's true rank range (ties span several ranks) must come within epsilon of q
+        low = np.searchsorted(ordered, estimate, side="left") / len(ordered)
+        high = np.searchsorted(ordered, estimate, side="right") / len(ordered)
+        assert low - EPSILON <= q <= high + EPSILON, (q, estimate, low, high)
+    
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    exact = np.quantile(values, [0.25 - EPSILON, 0.25, 0.25 + EPSILON, 0.5 - EPSILON, 0.5 + EPSILON, 0.75 - EPSILON, 0.75, 0.75 + EPSILON])
+    assert exact[3] <= median <= exact[4]
+    assert exact[0] <= q1 <= exact[2] and exact[5] <= q3 <= exact[7]
+    # IQR is bounded by the widest and narrowest spreads the rank error allows
+    assert exact[5] - exact[2] <= q3 - q1 <= exact[7] - exact[0]
+
+
+def test_sketch_quantiles_stay_within_the_configured_rank_error():
+    values = _data()
+    sketch = KLLSketch.from_epsilon(EPSILON, seed=1)
+    for chunk in np.array_split(values, 40):
+        sketch.update(chunk)
+    assert sketch.n == len(values) and sketch.min == values.min() and sketch.max == values.max()
+    # Bounded memory: far fewer items retained than values seen
+    assert sum(len(level) for level in sketch.levels) < len(values) / 20
+    _assert_within_rank_error(sketch, values)
+
+
+def test_merged_sketches_stay_within_the_configured_rank_error():
+    values = _data()
+    parts = []
+    for i, chunk in enumerate(np.array_split(np.random.default_rng(3).permutation(values), 8)):
+        part = KLLSketch.from_epsilon(EPSILON, seed=i)
+        part.update(chunk)
+        parts.append(part)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.n == len(values)
+    _assert_within_rank_error(merged, values)
+    
+    # A merge round-trips through the stored form used by incremental profiles
+    restored = KLLSketch.from_dict(merged.to_dict())
+    assert restored.quantiles(QS) == merged.quantiles(QS)
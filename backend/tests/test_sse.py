@@ -0,0 +1,132 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+from api.sse import SectionSplitter, sse_event, stream_graph
+
+
+MARKERS = {"**RESEARCH:**": "research", "**AGENDA:**": "agenda"}
+CHUNKS = ["Intro **RES", "EARCH:** trends", " in **AI** **AG", "ENDA", ":** 1. Welcome", " **AG"]
+
+
+class _FakeGraph:
+    """astream() output of a graph whose meeting_agent node streams CHUNKS"""
+    
+    async def astream(self, state, stream_mode):
+        yield "updates", {"router": {"next_agent": "meeting_agent"}}
+        for text in CHUNKS:
+            yield "messages", (AIMessageChunk(content=text), {"langgraph_node": "meeting_agent", "tags": []})
+        yield "messages", (AIMessageChunk(content="ignored"), {"langgraph_node": "router", "tags": []})
+        yield "updates", {"meeting_agent": {"final_output": {"agenda": "1. Welcome", "research": "trends"}}}
+
+
+def _joined(events: list) -> dict:
+    sections: dict = {}
+    for section, delta in events:
+        sections[section] = sections.get(section, "") + delta
+    return sections
+
+
+def test_markers_split_across_chunks_never_leak_into_sections():
+    splitter = SectionSplitter(MARKERS, initial="research")
+    emitted = []
+    for text in CHUNKS:
+        emitted += splitter.feed(text)
+    # "**AG" could still become a marker, so it is held until the stream ends
+    assert _joined(emitted)["agenda"] == " 1. Welcome "
+    emitted += splitter.flush()
+    assert _joined(emitted) == {"research": "Intro  trends in **AI** ", "agenda": " 1. Welcome **AG"}
+    assert all("RESEARCH:" not in delta and "AGENDA:" not in delta for _, delta in emitted)
+
+
+def test_stream_graph_forwards_tokens_of_token_nodes_only():
+    async def collect():
+        return [item async for item in stream_graph(_FakeGraph(), {}, {"meeting_agent"})]
+    
+    items = asyncio.run(collect())
+    assert items[0] == ("node", "router")
+    assert [item[2] for item in items if item[0] == "token"] == CHUNKS
+    assert items[-2:] == [("node", "meeting_agent"), ("final", {"agenda": "1. Welcome", "research": "trends"})]
+
+
+def test_sse_frames_from_the_stream_endpoint(monkeypatch):
+    import api.routes.meetings as meetings
+    from api.main import app
+    
+    assert sse_event("agenda", {"delta": "é"}) == 'event: agenda\ndata: {"delta": "\\u00e9"}\n\n'
+    monkeypatch.setattr(meetings, "get_agent_graph", lambda: _FakeGraph())
+    response = TestClient(app).post("/api/meetings/generate/stream", json={"user_id": "u", "company_name": "Acme", "topic": "Q1"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    assert [data["node"] for event, data in events if event == "node"] == ["router", "meeting_agent"]
+    deltas = [(event, data["delta"]) for event, data in events if event in ("research", "agenda")]
+    assert _joined(deltas) == {"research": "Intro  trends in **AI** ", "agenda": " 1. Welcome **AG"}
+    assert events[-1][0] == "done" and events[-1][1]["agenda"] == "1. Welcome"
+
+
+def test_replayed_sections_fill_in_only_what_was_not_streamed():
+    from api.routes.meetings import _replay_sections
+    
+    async def collect(graph):
+        return [item async for item in stream_graph(graph, {}, {"meeting_agent"}, replay=_replay_sections)]
+    
+    # Combined mode already streamed its tokens: nothing is replayed
+    streamed = asyncio.run(collect(_FakeGraph()))
+    assert [item[2] for item in streamed if item[0] == "token"] == CHUNKS
+    
+    class _ParallelGraph:
+        """Research streamed token by token, agenda served from the cache"""
+        
+        async def astream(self, state, stream_mode):
+            tags = ["meeting_section:research"]
+            yield "messages", (AIMessageChunk(content="trends"), {"langgraph_node": "meeting_agent", "tags": tags})
+            yield "updates", {"meeting_agent": {"final_output": {"mode": "parallel", "research": "trends", "agenda": "1. Welcome"}}}
+    
+    items = asyncio.run(collect(_ParallelGraph()))
+    tokens = [(item[2], item[3]) for item in items if item[0] == "token"]
+    assert tokens == [("trends", ["meeting_section:research"]), ("1. Welcome", ["meeting_section:agenda"])]
+    assert items[-2][0] == "node"
+
+
+class _ReportModel:
+    model = "report"
+    temperature = 0.7
+    
+    def __init__(self, content=None):
+        self.content = content
+    
+    async def ainvoke(self, messages, *args, **kwargs):
+        from langchain_core.messages import AIMessage
+        if self.content is None:
+            raise AssertionError("expected an LLM cache hit")
+        return AIMessage(content=self.content)
+
+
+def test_report_stream_served_from_the_llm_cache_still_sends_deltas(monkeypatch):
+    import agents.orchestrator as orchestrator
+    from api.main import app
+    from services.llm_cache import LLMResponseCache
+    
+    monkeypatch.setattr(orchestrator.llm, "cache", LLMResponseCache(max_entries=16, ttl_seconds=60))
+    monkeypatch.setattr(orchestrator.llm, "_model", _ReportModel("**Executive Summary** Revenue grew."))
+    client = TestClient(app)
+    request = {"user_id": "u", "dataset_id": "d", "data": [{"a": 1, "b": 2}, {"a": 2, "b": 5}], "columns": ["a", "b"]}
+    assert client.post("/api/reports/generate", json=request).json()["report"] == "**Executive Summary** Revenue grew."
+    
+    # Same prompt again: answered by the cache without any model tokens
+    monkeypatch.setattr(orchestrator.llm, "_model", _ReportModel())
+    response = client.post("/api/reports/generate/stream", json=request)
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    
+    names = [event for event, _ in events]
+    assert "".join(data["delta"] for event, data in events if event == "token") == "**Executive Summary** Revenue grew."
+    assert names.index("token") < names.index("done")
+    assert events[-1] == ("done", {"success": True, "report": "**Executive Summary** Revenue grew.", "fallback": False})
+    assert orchestrator.llm.cache.hits == 1
@@ -0,0 +1,24 @@
+import json
+import pandas as pd
+from fastapi.testclient import TestClient
+from tools.streaming_stats import StreamingStatistics
+
+
+def test_single_value_column_has_no_nan_std():
+    stats = StreamingStatistics()
+    stats.consume(pd.DataFrame({"x": [4.0]}))
+    payload = stats.statistics()
+    json.dumps(payload, allow_nan=False)
+    assert payload["x"]["std"] is None and payload["x"]["mean"] == 4.0
+
+
+def test_streaming_upload_of_a_one_row_dataset():
+    from api.main import app
+    
+    response = TestClient(app).post(
+        "/api/analysis/analyze/upload?user_id=u&dataset_id=d&streaming=true&mode=fast",
+        content="a,b\n1.5,2\n",
+        headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["statistics"]["a"]["std"] is None
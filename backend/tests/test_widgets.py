@@ -0,0 +1,100 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+from api.main import app
+from services import dataset_store
+from tools.widgets import evaluate_widgets, widget_spec
+
+
+def _frame():
+    return pd.DataFrame({
+        "region": ["north", "south", "north"],
+        "revenue": [10.0, 5.0, 2.0],
+        "tags": [["a"], ["b"], ["a", "b"]],
+    })
+
+
+def test_gauge_and_numeric_aggregates_reject_text_columns():
+    results = evaluate_widgets(_frame(), {
+        "gauge": widget_spec("gauge", {"column": "region"}),
+        "max": widget_spec("metric", {"aggregate": "max", "column": "region"}),
+        "chart": widget_spec("chart", {"group_by": "region", "aggregate": "mean", "column": "region"}),
+        "distinct": widget_spec("metric", {"aggregate": "nunique", "column": "region"}),
+        "total": widget_spec("metric", {"aggregate": "sum", "column": "revenue"}),
+    })
+    assert "numeric" in results["gauge"]["error"]
+    assert "numeric" in results["max"]["error"]
+    assert "numeric" in results["chart"]["error"]
+    assert results["distinct"] == {"value": 2}
+    assert results["total"] == {"value": 17.0}
+
+
+def test_a_failing_widget_does_not_fail_the_others():
+    # nunique over unhashable list cells raises inside the shared pass
+    results = evaluate_widgets(_frame(), {
+        "broken": widget_spec("metric", {"aggregate": "nunique", "column": "tags"}),
+        "rows": widget_spec("metric", {}),
+        "by_region": widget_spec("chart", {"group_by": "region"}),
+    })
+    assert results["broken"]["error"].startswith("Widget evaluation failed")
+    assert results["rows"] == {"value": 3}
+    assert results["by_region"]["data"] == [{"name": "north", "value": 2}, {"name": "south", "value": 1}]
+
+
+def test_unsupported_widget_type_is_a_per_widget_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "root", tmp_path)
+    _frame().drop(columns="tags").to_csv(tmp_path / "sales.csv", index=False)
+    response = TestClient(app).post("/api/dashboards/d1/evaluate", json={"widgets": [
+        {"id": "w1", "dataset_id": "sales", "widget_type": "heatmap"},
+        {"id": "w2", "dataset_id": "sales", "widget_type": "metric"},
+    ]})
+    assert response.status_code == 200, response.text
+    widgets = response.json()["widgets"]
+    assert widgets["w1"]["error"].startswith("Unsupported widget type 'heatmap'")
+    assert widgets["w2"]["value"] == 3
+
+
+def test_dataset_version_is_read_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+    from services.datasets import LocalDatasetStore
+    from services.dashboards import DashboardEvaluator, WidgetMaterializations
+    
+    version_threads = []
+    
+    class Recording(LocalDatasetStore):
+        def version(self, dataset_id):
+            version_threads.append(threading.get_ident())
+            return super().version(dataset_id)
+    
+    _frame().drop(columns="tags").to_csv(tmp_path / "sales.csv", index=False)
+    evaluator = DashboardEvaluator(Recording(str(tmp_path)), WidgetMaterializations(8))
+    widgets = [{"id": "rows", "dataset_id": "sales", "widget_type": "metric"}]
+    
+    async def run():
+        return threading.get_ident(), await evaluator.evaluate(widgets, refresh_interval=60)
+    
+    loop_thread, result = asyncio.run(run())
+    assert result["widgets"]["rows"]["value"] == 3
+    assert version_threads and loop_thread not in version_threads
+
+
+def test_dataset_locks_are_dropped_once_released(tmp_path):
+    import asyncio
+    from services.datasets import LocalDatasetStore
+    from services.dashboards import DashboardEvaluator, WidgetMaterializations
+    
+    for name in ("a", "b", "c"):
+        _frame().drop(columns="tags").to_csv(tmp_path / f"{name}.csv", index=False)
+    evaluator = DashboardEvaluator(LocalDatasetStore(str(tmp_path)), WidgetMaterializations(8))
+    widgets = [{"id": name, "dataset_id": name, "widget_type": "metric"} for name in ("a", "b", "c")]
+    
+    async def run():
+        # Concurrent force-refreshes of one dataset queue on its lock, then all release it
+        return await asyncio.gather(*(
+            evaluator.evaluate(widgets, refresh_interval=60, force_refresh=True) for _ in range(3)
+        ))
+    
+    results = asyncio.run(run())
+    assert all(result["widgets"]["a"]["value"] == 3 for result in results)
+    assert evaluator.scans == 9
+    assert evaluator._locks == {} and evaluator._lock_users == {}
@@ -0,0 +1,52 @@
+# Tools package - data helpers used by the agents and API routes
+from .correlations import (
+    CORRELATION_METHODS,
+    CORRELATION_MODES,
+    categorical_associations,
+    correlation_matrix,
+    format_correlations,
+    format_rectangular,
+    kendall_matrix,
+    pearson_matrix,
+)
+from .ingest import detect_format, iter_frames, read_frame, spool_upload
+from .insights import deterministic_insights, strongest_correlations
+from .outliers import OUTLIER_METHODS, column_quantiles, detect_outliers
+from .profile import DatasetProfile
+from .query import FILTER_OPS, normalize_query, query_file, query_frame
+from .sketches import KLLSketch
+from .streaming_stats import CoMoments, RunningMoments, StreamingStatistics
+from .widgets import AGGREGATES, WIDGET_TYPES, evaluate_widgets, widget_spec
+
+__all__ = [
+    "CORRELATION_METHODS",
+    "CORRELATION_MODES",
+    "categorical_associations",
+    "correlation_matrix",
+    "format_correlations",
+    "format_rectangular",
+    "kendall_matrix",
+    "pearson_matrix",
+    "detect_format",
+    "iter_frames",
+    "read_frame",
+    "spool_upload",
+    "deterministic_insights",
+    "strongest_correlations",
+    "OUTLIER_METHODS",
+    "column_quantiles",
+    "detect_outliers",
+    "DatasetProfile",
+    "FILTER_OPS",
+    "normalize_query",
+    "query_file",
+    "query_frame",
+    "KLLSketch",
+    "CoMoments",
+    "RunningMoments",
+    "StreamingStatistics",
+    "AGGREGATES",
+    "WIDGET_TYPES",
+    "evaluate_widgets",
+    "widget_spec",
+]
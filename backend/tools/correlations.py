@@ -0,0 +1,262 @@
+"""
+Vectorized correlation analysis
+Pearson matrix computed with BLAS on a float block (pairwise-complete like
+pandas' DataFrame.corr), Spearman/Kendall from ranks computed once per column,
+and Cramér's V / correlation ratio for categorical columns from one-hot
+co-occurrence products. Output is shaped to what the caller asked for:
+full matrix, top-k strongest pairs, pairs above a threshold, or a compact
+upper-triangle array
+"""
+
+import warnings
+import numpy as np
+
+
+CORRELATION_MODES = ["matrix", "top_k", "threshold", "compact"]
+CORRELATION_METHODS = ["pearson", "spearman", "kendall"]
+
+# Upper bound on float cells materialized per block in the chunked passes
+BLOCK_CELLS = 4_000_000
+
+
+def pearson_matrix(X: np.ndarray) -> np.ndarray:
+    """Pearson correlation of the columns of X, using pairwise-complete observations"""
+    valid = ~np.isnan(X)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        # Centering first keeps the sums of squares well conditioned
+        Xc = np.where(valid, X - np.nanmean(X, axis=0), 0.0)
+        
+        if valid.all():
+            cov = Xc.T @ Xc
+            scale = np.sqrt(np.diag(cov))
+            R = cov / np.outer(scale, scale)
+        else:
+            M = valid.astype("float64")
+            n = M.T @ M
+            sx = Xc.T @ M
+            sxx = (Xc * Xc).T @ M
+            sxy = Xc.T @ Xc
+            cov = sxy - sx * sx.T / n
+            var_x = sxx - sx * sx / n
+            R = cov / np.sqrt(var_x * var_x.T)
+            R[n < 2] = np.nan
+    
+    R = np.clip(R, -1.0, 1.0)
+    diag = np.diag(R).copy()
+    np.fill_diagonal(R, np.where(np.isnan(diag), np.nan, 1.0))
+    return R
+
+
+def rank_block(X: np.ndarray) -> np.ndarray:
+    """Average ranks of every column, NaN kept as NaN"""
+    import pandas as pd
+    return pd.DataFrame(X).rank(method="average").to_numpy(dtype="float64")
+
+
+def kendall_matrix(X: np.ndarray, max_rows: int = 2000, seed: int = 0) -> np.ndarray:
+    """
+    Kendall tau-b for all column pairs
+    The sign of every row-pair difference is computed once per column and
+    reused for all pairs (S.T @ S); rows beyond max_rows are sampled to bound
+    the O(n^2) pair count
+    """
+    n, k = X.shape
+    if n > max_rows:
+        X = X[np.sort(np.random.default_rng(seed).choice(n, max_rows, replace=False))]
+        n = max_rows
+    valid = ~np.isnan(X)
+    concordance = np.zeros((k, k))
+    untied = np.zeros((k, k))
+    step = max(1, BLOCK_CELLS // max(1, n * k))
+    
+    with np.errstate(invalid="ignore"):
+        for start in range(0, n - 1, step):
+            anchors = np.arange(start, min(start + step, n - 1))
+            later = np.arange(n)[None, :] > anchors[:, None]
+            S = np.sign(X[anchors][:, None, :] - X[None, :, :])[later]
+            V = (valid[anchors][:, None, :] & valid[None, :, :])[later].astype("float64")
+            S = np.nan_to_num(S, nan=0.0)
+            concordance += S.T @ S
+            untied += (S * S).T @ V
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R = concordance / np.sqrt(untied * untied.T)
+    return np.clip(R, -1.0, 1.0)
+
+
+def correlation_matrix(X: np.ndarray, method: str = "pearson", kendall_max_rows: int = 2000) -> np.ndarray:
+    if method == "spearman":
+        # Ranks over each column's non-null values; exact when there are no missing values
+        return pearson_matrix(rank_block(X))
+    if method == "kendall":
+        R = kendall_matrix(X, kendall_max_rows)
+        diag = np.diag(R).copy()
+        np.fill_diagonal(R, np.where(np.isnan(diag), np.nan, 1.0))
+        return R
+    return pearson_matrix(X)
+
+
+def _category_codes(series, max_levels: int) -> tuple[np.ndarray, int]:
+    """
+    Integer codes per row, -1 for null
+    High-cardinality columns keep their max_levels-1 most frequent values and
+    bucket the rest into one "other" level so contingency tables stay bounded
+    """
+    counts = series.value_counts(dropna=True)
+    keep = counts.index[:max_levels - 1] if len(counts) > max_levels else counts.index
+    codes = np.asarray(keep.get_indexer(series), dtype="int64")
+    levels = len(keep)
+    nulls = series.isna().to_numpy()
+    if len(counts) > len(keep):
+        codes[(codes < 0) & ~nulls] = levels
+        levels += 1
+    codes[nulls] = -1
+    return codes, levels
+
+
+def categorical_associations(df, categorical_cols: list, numeric_cols: list, max_levels: int = 50) -> dict:
+    """
+    Cramér's V between categorical columns and the correlation ratio (eta)
+    of each numeric column given each categorical column
+    One pass: per row block, one-hot categories H and compute H.T @ [H | y | y^2 | valid]
+    """
+    coded = [_category_codes(df[col], max_levels) for col in categorical_cols]
+    offsets = np.cumsum([0] + [levels for _, levels in coded])
+    width = int(offsets[-1])
+    if width == 0:
+        return {"cramers_v": np.full((len(categorical_cols),) * 2, np.nan), "correlation_ratio": np.empty((len(categorical_cols), 0))}
+    
+    Y = df[numeric_cols].to_numpy(dtype="float64", na_value=np.nan) if numeric_cols else np.empty((len(df), 0))
+    y_valid = ~np.isnan(Y)
+    Y = np.where(y_valid, Y - np.nanmean(Y, axis=0) if Y.size else Y, 0.0)
+    k = Y.shape[1]
+    totals = np.zeros((width, width + 3 * k))
+    step = max(1, BLOCK_CELLS // (width + 3 * k))
+    
+    for start in range(0, len(df), step):
+        stop = min(start + step, len(df))
+        H = np.zeros((stop - start, width))
+        for (codes, _), offset in zip(coded, offsets):
+            block = codes[start:stop]
+            present = block >= 0
+            H[np.flatnonzero(present), offset + block[present]] = 1.0
+        y = Y[start:stop]
+        totals += H.T @ np.hstack([H, y, y * y, y_valid[start:stop].astype("float64")])
+    
+    contingency = totals[:, :width]
+    sums = totals[:, width:width + k]
+    sumsq = totals[:, width + k:width + 2 * k]
+    counts = totals[:, width + 2 * k:]
+    
+    m = len(categorical_cols)
+    cramers = np.full((m, m), np.nan)
+    eta = np.full((m, k), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for a in range(m):
+            rows = slice(offsets[a], offsets[a + 1])
+            for b in range(a, m):
+                table = contingency[rows, offsets[b]:offsets[b + 1]]
+                table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+                n = table.sum()
+                dof = min(table.shape) - 1
+                if n == 0 or dof < 1:
+                    continue
+                expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+                chi2 = ((table - expected) ** 2 / expected).sum()
+                cramers[a, b] = cramers[b, a] = np.sqrt(chi2 / n / dof)
+            
+            n_g, s_g, ss_g = counts[rows], sums[rows], sumsq[rows]
+            n = n_g.sum(axis=0)
+            total = s_g.sum(axis=0)
+            between = np.where(n_g > 0, s_g ** 2 / np.where(n_g > 0, n_g, 1), 0).sum(axis=0) - total ** 2 / n
+            ss_total = ss_g.sum(axis=0) - total ** 2 / n
+            eta[a] = np.sqrt(np.clip(between / ss_total, 0.0, 1.0))
+    
+    return {"cramers_v": cramers, "correlation_ratio": eta}
+
+
+def format_rectangular(row_names: list, col_names: list, values: np.ndarray, mode: str = "matrix", top_k: int = 20, threshold: float = 0.5) -> dict:
+    """Shape a non-symmetric association table (e.g. categorical x numeric)"""
+    row_names = [str(name) for name in row_names]
+    col_names = [str(name) for name in col_names]
+    if mode == "matrix":
+        return {
+            row: {col: _value(v) for col, v in zip(col_names, line)}
+            for row, line in zip(row_names, values)
+        }
+    if mode == "compact":
+        return {
+            "mode": "compact",
+            "rows": row_names,
+            "columns": col_names,
+            "values": [None if np.isnan(v) else v for v in np.round(values, 4).ravel().tolist()]
+        }
+    flat = np.nan_to_num(np.abs(values).ravel(), nan=-1.0)
+    if mode == "threshold":
+        selected = np.flatnonzero(flat >= threshold)
+    else:
+        take = min(top_k, len(flat))
+        selected = np.argpartition(-flat, take - 1)[:take] if take > 0 else np.empty(0, dtype=int)
+        selected = selected[flat[selected] >= 0]
+    selected = selected[np.argsort(-flat[selected], kind="stable")]
+    rows, cols = np.unravel_index(selected, values.shape)
+    return {
+        "mode": mode,
+        "pairs": [
+            {"x": row_names[i], "y": col_names[j], "value": _value(values[i, j], 4)}
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
+    }
+
+
+def _value(r: float, digits: int = 2):
+    return None if np.isnan(r) else round(float(r), digits)
+
+
+def _pairs(columns: list, R: np.ndarray, idx: tuple) -> list:
+    rows, cols = idx
+    return [
+        {"x": columns[i], "y": columns[j], "r": _value(R[i, j], 4)}
+        for i, j in zip(rows.tolist(), cols.tolist())
+    ]
+
+
+def format_correlations(
+    columns: list,
+    R: np.ndarray,
+    mode: str = "matrix",
+    top_k: int = 20,
+    threshold: float = 0.5
+) -> dict:
+    """Shape a correlation matrix for the response; non-matrix modes only emit what was asked for"""
+    columns = [str(col) for col in columns]
+    if mode == "matrix":
+        rounded = np.round(R, 2).tolist()
+        return {
+            col: {other: (None if np.isnan(value) else value) for other, value in zip(columns, row)}
+            for col, row in zip(columns, rounded)
+        }
+    
+    iu = np.triu_indices(len(columns), k=1)
+    upper = R[iu]
+    if mode == "compact":
+        return {
+            "mode": "compact",
+            "columns": columns,
+            "upper_triangle": [None if np.isnan(v) else v for v in np.round(upper, 4).tolist()]
+        }
+    
+    strength = np.nan_to_num(np.abs(upper), nan=-1.0)
+    if mode == "threshold":
+        selected = np.flatnonzero(strength >= threshold)
+    else:
+        take = min(top_k, len(upper))
+        selected = np.argpartition(-strength, take - 1)[:take] if take > 0 else np.empty(0, dtype=int)
+        selected = selected[strength[selected] >= 0]
+    selected = selected[np.argsort(-strength[selected], kind="stable")]
+    
+    result = {"mode": mode, "columns": len(columns), "pairs": _pairs(columns, R, (iu[0][selected], iu[1][selected]))}
+    if mode == "threshold":
+        result["threshold"] = threshold
+    return result
@@ -0,0 +1,137 @@
+"""
+Columnar dataset ingestion
+Loads CSV, Arrow IPC and Parquet uploads straight into a DataFrame, skipping
+the JSON list-of-dicts round trip used by /api/analysis/analyze
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+
+
+SUPPORTED_FORMATS = ["csv", "arrow", "parquet"]
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
+
+EXTENSIONS = {
+    ".csv": "csv",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+}
+
+
+def detect_format(explicit: str | None = None, content_type: str | None = None, filename: str | None = None) -> str:
+    """Resolve the upload format from an explicit value, the content type or the file name"""
+    if explicit:
+        fmt = explicit.lower()
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{explicit}', expected one of {SUPPORTED_FORMATS}")
+        return fmt
+    if content_type:
+        fmt = CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        fmt = EXTENSIONS.get(Path(filename).suffix.lower())
+        if fmt:
+            return fmt
+    raise ValueError("Could not determine upload format; pass format=csv|arrow|parquet")
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int) -> tuple[str, str, int]:
+    """
+    Write an upload stream to a temporary file while hashing it
+    Returns (path, sha256 hex digest, size); the caller removes the file
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="insightflow-upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise OverflowError(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), size
+
+
+def read_frame(path: str, fmt: str):
+    """Load a spooled upload into a DataFrame (CPU-bound, run on the analysis pool)"""
+    import pandas as pd
+    
+    if fmt == "csv":
+        try:
+            import pyarrow  # noqa: F401
+            return pd.read_csv(path, engine="pyarrow")
+        except ImportError:
+            return pd.read_csv(path)
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(f"pyarrow is required for {fmt} uploads")
+    
+    # self_destruct releases Arrow buffers as columns are converted
+    if fmt == "parquet":
+        return pq.read_table(path).to_pandas(self_destruct=True, split_blocks=True)
+    
+    with pa.memory_map(path) as source:
+        try:
+            table = ipc.open_stream(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            table = ipc.open_file(source).read_all()
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def iter_frames(path: str, fmt: str, chunk_rows: int):
+    """Yield DataFrame chunks of at most chunk_rows rows without loading the whole file"""
+    import pandas as pd
+    
+    if fmt == "csv":
+        with pd.read_csv(path, chunksize=chunk_rows) as reader:
+            yield from reader
+        return
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(f"pyarrow is required for {fmt} uploads")
+    
+    if fmt == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+    
+    with pa.memory_map(path) as source:
+        try:
+            batches = iter(ipc.open_stream(source))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            reader = ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            # IPC batches follow the writer's sizing; re-slice to the requested chunk size
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows).to_pandas()
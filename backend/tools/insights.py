@@ -0,0 +1,142 @@
+"""
+Deterministic insights derived from computed analysis results
+Rule-based templates used by mode=fast analysis and as the fallback when the
+LLM budget is exhausted, so a response never has to wait on the model
+"""
+
+
+def strongest_correlations(correlations: dict, limit: int = 3) -> list:
+    """Strongest off-diagonal pairs from any correlation output mode, by |r|"""
+    if not correlations:
+        return []
+    if "pairs" in correlations:
+        pairs = correlations["pairs"]
+    elif correlations.get("mode") == "compact":
+        columns = correlations["columns"]
+        values = iter(correlations["upper_triangle"])
+        pairs = [
+            {"x": columns[i], "y": columns[j], "r": next(values)}
+            for i in range(len(columns))
+            for j in range(i + 1, len(columns))
+        ]
+    else:
+        columns = list(correlations)
+        pairs = [
+            {"x": x, "y": y, "r": correlations[x].get(y)}
+            for i, x in enumerate(columns)
+            for y in columns[i + 1:]
+        ]
+    pairs = [pair for pair in pairs if pair["r"] is not None]
+    return sorted(pairs, key=lambda pair: -abs(pair["r"]))[:limit]
+
+
+def skewness(stats: dict) -> float | None:
+    """Pearson's second skewness coefficient 3 * (mean - median) / std from summary statistics"""
+    if not stats.get("std") or stats.get("median") is None:
+        return None
+    return 3 * (stats["mean"] - stats["median"]) / stats["std"]
+
+
+def _quality_insights(analysis: dict) -> list:
+    if "quality_score" not in analysis:
+        return []
+    line = f"• Data quality is {analysis['quality_score']}/100"
+    if analysis.get("total"):
+        line += f" with {round(analysis['missing'] / analysis['total'] * 100, 1)}% of cells missing"
+    if "row_count" in analysis:
+        line += f" across {analysis['row_count']} rows and {analysis['column_count']} columns"
+    return [line + "."]
+
+
+def _correlation_insights(analysis: dict, limit: int) -> list:
+    pairs = strongest_correlations(analysis.get("correlations") or {}, limit=limit)
+    if not pairs:
+        return []
+    strong = [pair for pair in pairs if abs(pair["r"]) >= 0.5]
+    if not strong:
+        return [f"• No strong linear relationships between numeric columns (max |r|={round(abs(pairs[0]['r']), 2)})."]
+    lines = []
+    for pair in strong:
+        r = pair["r"]
+        direction = "positively" if r > 0 else "negatively"
+        strength = "strongly" if abs(r) >= 0.7 else "moderately"
+        lines.append(f"• {pair['x']} and {pair['y']} are {strength} {direction} correlated (r={round(r, 2)}).")
+    return lines
+
+
+def _skew_insights(analysis: dict, limit: int, threshold: float = 0.5) -> list:
+    skews = {
+        col: skew for col, skew in (
+            (col, skewness(stats)) for col, stats in (analysis.get("statistics") or {}).items()
+        )
+        if skew is not None and abs(skew) >= threshold
+    }
+    lines = []
+    for col in sorted(skews, key=lambda col: -abs(skews[col]))[:limit]:
+        stats = analysis["statistics"][col]
+        side = "right" if skews[col] > 0 else "left"
+        lines.append(
+            f"• {col} is {side}-skewed (mean {stats['mean']} vs median {stats['median']}); "
+            f"prefer the median as its typical value."
+        )
+    return lines
+
+
+def _outlier_insights(analysis: dict, limit: int) -> list:
+    outliers = {
+        col: summary for col, summary in (analysis.get("outliers") or {}).items()
+        if summary.get("count", 0) > 0
+    }
+    lines = []
+    for col in sorted(outliers, key=lambda col: -outliers[col].get("percentage", 0))[:limit]:
+        summary = outliers[col]
+        lines.append(
+            f"• {col} has {summary['count']} outlier value(s) ({summary.get('percentage', 0)}%) "
+            f"outside the IQR fences."
+        )
+    return lines
+
+
+def _missing_insights(analysis: dict, limit: int, threshold: float = 0.2) -> list:
+    rows = analysis.get("row_count")
+    if not rows:
+        return []
+    shares = {
+        col: count / rows for col, count in (analysis.get("missing_by_column") or {}).items()
+        if count / rows >= threshold
+    }
+    return [
+        f"• {col} is {round(shares[col] * 100, 1)}% missing; consider imputing or excluding it."
+        for col in sorted(shares, key=lambda col: -shares[col])[:limit]
+    ]
+
+
+def _spread_insights(analysis: dict) -> list:
+    spread = {
+        col: s["std"] / abs(s["mean"])
+        for col, s in (analysis.get("statistics") or {}).items()
+        if s.get("mean") and s.get("std") is not None
+    }
+    if not spread:
+        return []
+    col = max(spread, key=spread.get)
+    return [f"• {col} varies most relative to its mean (coefficient of variation {round(spread[col], 2)})."]
+
+
+def deterministic_insights(analysis: dict, limit: int = 3, per_rule: int = 1) -> str:
+    """
+    Rule-based insight bullets from the computed results, most important first:
+    quality, strongest correlations, high missingness, outlier-heavy and skewed
+    columns, relative spread. per_rule caps how many bullets one rule contributes.
+    """
+    insights = (
+        _quality_insights(analysis)
+        + _correlation_insights(analysis, per_rule)
+        + _missing_insights(analysis, per_rule)
+        + _outlier_insights(analysis, per_rule)
+        + _skew_insights(analysis, per_rule)
+        + _spread_insights(analysis)
+    )
+    if not insights:
+        return "• Not enough computed results to derive insights."
+    return "\n".join(insights[:limit])
@@ -0,0 +1,150 @@
+"""
+Vectorized outlier detection
+One pass over the numeric block computes IQR fences, z-scores and MAD-based
+modified z-scores for every column at once
+"""
+
+import warnings
+import numpy as np
+
+
+OUTLIER_METHODS = ["iqr", "zscore", "mad"]
+
+# Scale factors that make MAD / mean absolute deviation consistent with the
+# std of a normal distribution (Iglewicz & Hoaglin modified z-score)
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.253314
+
+
+def _rounded(value, digits: int = 4):
+    """Rounded float, or None for NaN / inf (not valid JSON)"""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def column_quantiles(X: np.ndarray, qs: list) -> np.ndarray:
+    """
+    Linear-interpolated quantiles of every column, ignoring NaN
+    One sort of the whole block (NaN sorts last) instead of nanquantile's
+    per-column fallback; returns a (len(qs), k) array
+    """
+    S = np.sort(X, axis=0)
+    n = (~np.isnan(X)).sum(axis=0)
+    cols = np.arange(X.shape[1])
+    out = np.full((len(qs), X.shape[1]), np.nan)
+    has = n > 0
+    for i, q in enumerate(qs):
+        pos = q * (n[has] - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.ceil(pos).astype(int)
+        a = S[lo, cols[has]]
+        b = S[hi, cols[has]]
+        out[i, has] = a + (b - a) * (pos - lo)
+    return out
+
+
+def detect_outliers(
+    block,
+    methods: list | None = None,
+    fence: float = 1.5,
+    zscore_threshold: float = 3.0,
+    mad_threshold: float = 3.5,
+    top_n: int = 0,
+    quartiles: np.ndarray | None = None
+) -> dict:
+    """
+    Outlier summary per column of a numeric DataFrame
+    The IQR summary (count, percentage, bounds, quartiles) is always reported;
+    z-score and MAD results are added under "methods" when requested.
+    quartiles: optional precomputed (2, k) array of Q1/Q3 (e.g. from sketches)
+    top_n: also return positional row indices of the most extreme points,
+    ranked by the first requested method
+    """
+    methods = [m for m in (methods or ["iqr"]) if m in OUTLIER_METHODS] or ["iqr"]
+    columns = [str(col) for col in block.columns]
+    X = block.to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(X)
+    n = valid.sum(axis=0)
+    present = n > 0
+    if not present.any():
+        return {}
+    
+    # All-NaN columns and zero spreads are expected here; they simply flag nothing
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        
+        if quartiles is None:
+            quartiles = column_quantiles(X, [0.25, 0.75])
+        q1, q3 = quartiles
+        iqr = q3 - q1
+        lower = q1 - fence * iqr
+        upper = q3 + fence * iqr
+        scores = {"iqr": np.maximum(lower - X, X - upper) / np.where(iqr > 0, iqr, 1.0)}
+        flags = {"iqr": (X < lower) | (X > upper)}
+        extra = {}
+        
+        if "zscore" in methods:
+            mean = np.nanmean(X, axis=0)
+            std = np.nanstd(X, axis=0, ddof=1)
+            # Constant and single-value columns have no spread: no score rather than 0/0
+            z = np.where(std > 0, np.abs(X - mean) / np.where(std > 0, std, 1.0), np.nan)
+            scores["zscore"] = z
+            flags["zscore"] = z > zscore_threshold
+            extra["zscore"] = {"threshold": zscore_threshold, "mean": mean, "std": std}
+        
+        if "mad" in methods:
+            median = column_quantiles(X, [0.5])[0]
+            deviation = np.abs(X - median)
+            mad = column_quantiles(deviation, [0.5])[0]
+            # Fall back to the mean absolute deviation when more than half the values tie
+            spread = np.where(mad > 0, mad / MAD_SCALE, MEAN_AD_SCALE * np.nanmean(deviation, axis=0))
+            mz = np.where(spread > 0, deviation / np.where(spread > 0, spread, 1.0), np.nan)
+            scores["mad"] = mz
+            flags["mad"] = mz > mad_threshold
+            extra["mad"] = {"threshold": mad_threshold, "median": median, "mad": mad}
+    
+    counts = {method: flags[method].sum(axis=0) for method in flags}
+    
+    def percentage(method: str, j: int):
+        count = counts[method][j]
+        return round(float(count / n[j] * 100), 1) if count > 0 else 0
+    
+    extremes = None
+    if top_n > 0:
+        ranked = np.where(valid, np.nan_to_num(scores[methods[0]], nan=-np.inf, posinf=np.inf), -np.inf)
+        take = min(top_n, len(X))
+        idx = np.argpartition(-ranked, take - 1, axis=0)[:take]
+        order = np.argsort(-np.take_along_axis(ranked, idx, axis=0), axis=0, kind="stable")
+        extremes = np.take_along_axis(idx, order, axis=0)
+    
+    summary = {}
+    for j, col in enumerate(columns):
+        if not present[j]:
+            continue
+        entry = {
+            "count": int(counts["iqr"][j]),
+            "percentage": percentage("iqr", j),
+            "bounds": {"lower": round(float(lower[j]), 2), "upper": round(float(upper[j]), 2)},
+            "quartiles": {"Q1": round(float(q1[j]), 2), "Q3": round(float(q3[j]), 2), "IQR": round(float(iqr[j]), 2)}
+        }
+        if extra:
+            entry["methods"] = {}
+            for method, params in extra.items():
+                entry["methods"][method] = {
+                    "count": int(counts[method][j]),
+                    "percentage": percentage(method, j),
+                    **{key: (_rounded(value[j]) if isinstance(value, np.ndarray) else value) for key, value in params.items()}
+                }
+        if extremes is not None:
+            ranking = scores[methods[0]]
+            entry["top_extremes"] = [
+                {
+                    "row": int(row),
+                    "value": round(float(X[row, j]), 4),
+                    "score": round(float(ranking[row, j]), 4)
+                }
+                for row in extremes[:, j]
+                if valid[row, j] and np.isfinite(ranking[row, j])
+            ]
+        summary[col] = entry
+    return summary
@@ -0,0 +1,69 @@
+"""
+Incremental dataset profiles
+Sufficient statistics for one dataset (moments, quantile sketches, missing
+counts and the co-moment matrix) that are updated with appended rows only
+and serialized between refreshes
+"""
+
+import numpy as np
+from .correlations import format_correlations
+from .streaming_stats import CoMoments, StreamingStatistics
+
+
+class DatasetProfile:
+    """Running statistics, correlations, outliers and quality for one dataset"""
+    
+    def __init__(self, epsilon: float = 0.01):
+        self.stats = StreamingStatistics(epsilon)
+        self.comoments = CoMoments()
+    
+    def update(self, frame) -> None:
+        """Fold appended rows into the profile; cost scales with len(frame)"""
+        self.stats.consume(frame)
+        for name in list(self.comoments.columns):
+            if name in self.stats.text_columns:
+                self.comoments.drop(name)
+        
+        present = {str(col): col for col in frame.columns}
+        names = [name for name in self.stats.numeric_columns if name in present]
+        if names and len(frame):
+            X = frame[[present[name] for name in names]].to_numpy(dtype="float64", na_value=np.nan)
+            self.comoments.update(names, X)
+    
+    def snapshot(self, correlation_mode: str = "matrix", top_k: int = 20, threshold: float = 0.5, fence: float = 1.5) -> dict:
+        """Refreshed statistics / correlations / outliers / quality from the sufficient statistics"""
+        numeric_cols = [name for name in self.stats.numeric_columns if name in self.comoments.columns]
+        correlations = {}
+        if numeric_cols:
+            correlations = format_correlations(
+                numeric_cols,
+                self.comoments.correlation(numeric_cols),
+                mode=correlation_mode,
+                top_k=top_k,
+                threshold=threshold
+            )
+        missing = self.stats.total_missing
+        total = self.stats.total_cells
+        return {
+            "row_count": self.stats.rows,
+            "column_count": len(self.stats.columns),
+            "numeric_count": len(self.stats.numeric_columns),
+            "statistics": self.stats.statistics(),
+            "correlations": correlations,
+            "correlation_method": "pearson",
+            "outliers": self.stats.outliers(fence=fence),
+            "missing": missing,
+            "total": total,
+            "missing_by_column": dict(self.stats.missing),
+            "quality_score": round(100 - (missing / total * 100), 1) if total else 0
+        }
+    
+    def to_dict(self) -> dict:
+        return {"stats": self.stats.to_dict(), "comoments": self.comoments.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, payload: dict) -> "DatasetProfile":
+        profile = cls()
+        profile.stats = StreamingStatistics.from_dict(payload["stats"])
+        profile.comoments = CoMoments.from_dict(payload["comoments"])
+        return profile
@@ -0,0 +1,219 @@
+"""
+Declarative queries over a dataset
+A spec of filters, group-by keys, aggregates, sort and limit is evaluated
+vectorized: predicates run first (inside the pyarrow scan for stored files, so
+Parquet row groups can be skipped by their statistics), then only the group-by
+and aggregate columns of matching rows are materialized, and only the
+aggregated result is returned
+"""
+
+from .widgets import AGGREGATES, NUMERIC_AGGREGATES, json_value
+
+
+FILTER_OPS = ["==", "!=", ">", ">=", "<", "<=", "in", "not_in", "is_null", "not_null", "contains"]
+MAX_LIMIT = 10000
+
+
+def normalize_query(spec: dict) -> dict:
+    """
+    Validated copy of a query spec
+    filters: [{"column", "op", "value"}], group_by: [column], aggregates: [{"func", "column", "alias"}],
+    sort: [{"column", "descending"}], limit; without aggregates the query counts rows
+    """
+    filters = []
+    for item in spec.get("filters") or []:
+        op = item.get("op", "==")
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter op '{op}', expected one of {FILTER_OPS}")
+        if op in ("in", "not_in") and not isinstance(item.get("value"), list):
+            raise ValueError(f"Filter op '{op}' needs a list value")
+        filters.append({"column": item["column"], "op": op, "value": item.get("value")})
+    
+    aggregates = []
+    for item in spec.get("aggregates") or [{"func": "count"}]:
+        func, column = item.get("func", "count"), item.get("column")
+        if func not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{func}', expected one of {AGGREGATES}")
+        if column is None and func != "count":
+            raise ValueError(f"Aggregate '{func}' needs a column")
+        aggregates.append({"func": func, "column": column, "alias": item.get("alias") or (f"{func}_{column}" if column else func)})
+    
+    group_by = list(spec.get("group_by") or [])
+    outputs = group_by + [item["alias"] for item in aggregates]
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Output column names must be unique; set an alias on repeated aggregates")
+    sort = [{"column": item["column"], "descending": bool(item.get("descending", False))} for item in spec.get("sort") or []]
+    unknown = [item["column"] for item in sort if item["column"] not in outputs]
+    if unknown:
+        raise ValueError(f"Sort column(s) not in the result: {', '.join(unknown)}")
+    
+    limit = int(spec.get("limit") or 1000)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return {"filters": filters, "group_by": group_by, "aggregates": aggregates, "sort": sort, "limit": limit}
+
+
+def _projection(query: dict) -> list:
+    """Columns materialized after filtering: group-by keys and aggregate inputs"""
+    columns = list(query["group_by"])
+    for item in query["aggregates"]:
+        if item["column"] is not None and item["column"] not in columns:
+            columns.append(item["column"])
+    return columns
+
+
+def _check_columns(query: dict, available) -> None:
+    referenced = [item["column"] for item in query["filters"]] + _projection(query)
+    missing = sorted({str(col) for col in referenced if col not in available})
+    if missing:
+        raise ValueError(f"Unknown column(s): {', '.join(missing)}")
+
+
+def _arrow_filter(filters: list):
+    """pyarrow.compute expression for the filters (None when there are none)"""
+    import pyarrow.compute as pc
+    
+    expression = None
+    for item in filters:
+        field, op, value = pc.field(item["column"]), item["op"], item["value"]
+        if op == "==":
+            term = field == value
+        elif op == "!=":
+            term = field != value
+        elif op == ">":
+            term = field > value
+        elif op == ">=":
+            term = field >= value
+        elif op == "<":
+            term = field < value
+        elif op == "<=":
+            term = field <= value
+        elif op == "in":
+            term = field.isin(value)
+        elif op == "not_in":
+            term = ~field.isin(value) & field.is_valid()
+        elif op == "is_null":
+            term = field.is_null()
+        elif op == "not_null":
+            term = field.is_valid()
+        else:
+            term = pc.match_substring(field.cast("string"), str(value))
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def _mask(frame, filters: list):
+    """
+    Boolean Series for the filters, with the same null handling as the pyarrow
+    scan: a comparison against a missing value never matches
+    """
+    import pandas as pd
+    
+    mask = pd.Series(True, index=frame.index)
+    for item in filters:
+        series, op, value = frame[item["column"]], item["op"], item["value"]
+        if op == "is_null":
+            term = series.isna()
+        elif op == "not_null":
+            term = series.notna()
+        elif op == "contains":
+            term = series.astype("string").str.contains(str(value), regex=False, na=False)
+        elif op in ("in", "not_in"):
+            term = series.isin(value)
+            term = (~term if op == "not_in" else term) & series.notna()
+        else:
+            try:
+                term = {
+                    "==": series.__eq__, "!=": series.__ne__, ">": series.__gt__,
+                    ">=": series.__ge__, "<": series.__lt__, "<=": series.__le__,
+                }[op](value) & series.notna()
+            except TypeError as e:
+                raise ValueError(f"Cannot compare column '{item['column']}' with {value!r}: {e}")
+        mask &= term
+    return mask
+
+
+def _aggregate(frame, query: dict, matched_rows: int) -> dict:
+    """Group, aggregate, sort and limit the filtered, projected rows"""
+    import pandas as pd
+    
+    for item in query["aggregates"]:
+        column = item["column"]
+        if item["func"] in NUMERIC_AGGREGATES and not (
+            pd.api.types.is_numeric_dtype(frame[column]) or pd.api.types.is_bool_dtype(frame[column])
+        ):
+            raise ValueError(f"Aggregate '{item['func']}' needs a numeric column, '{column}' is not")
+    
+    aliases = [item["alias"] for item in query["aggregates"]]
+    if query["group_by"]:
+        groups = frame.groupby(query["group_by"], dropna=False, sort=False)
+        named = {item["alias"]: (item["column"], item["func"]) for item in query["aggregates"] if item["column"] is not None}
+        result = groups.agg(**named) if named else pd.DataFrame(index=groups.size().index)
+        if any(item["column"] is None for item in query["aggregates"]):
+            sizes = groups.size()
+            for item in query["aggregates"]:
+                if item["column"] is None:
+                    result[item["alias"]] = sizes
+        result = result[aliases].reset_index()
+    else:
+        result = pd.DataFrame([{
+            item["alias"]: len(frame) if item["column"] is None else frame[item["column"]].agg(item["func"])
+            for item in query["aggregates"]
+        }])
+    
+    if query["sort"]:
+        result = result.sort_values(
+            [item["column"] for item in query["sort"]],
+            ascending=[not item["descending"] for item in query["sort"]],
+            na_position="last"
+        )
+    columns = query["group_by"] + aliases
+    return {
+        "columns": columns,
+        "rows": [[json_value(value) for value in row] for row in result[columns].head(query["limit"]).itertuples(index=False)],
+        "row_count": min(len(result), query["limit"]),
+        "matched_rows": matched_rows,
+        "truncated": len(result) > query["limit"],
+    }
+
+
+def query_frame(frame, spec: dict) -> dict:
+    """Run a query spec against an in-memory DataFrame"""
+    query = normalize_query(spec)
+    _check_columns(query, frame.columns)
+    filtered = frame.loc[_mask(frame, query["filters"]), _projection(query)]
+    return _aggregate(filtered, query, len(filtered))
+
+
+def query_file(path: str, fmt: str, spec: dict) -> dict:
+    """
+    Run a query spec against a CSV / Parquet / Arrow file (CPU-bound, run it on the analysis pool)
+    The filters and the column projection are pushed into the pyarrow scan
+    """
+    query = normalize_query(spec)
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        from .ingest import read_frame
+        return query_frame(read_frame(path, fmt), spec)
+    
+    if fmt == "csv":
+        import pyarrow.csv as pacsv
+        # Empty fields are missing values, as in read_frame
+        file_format = ds.CsvFileFormat(convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+    else:
+        file_format = "parquet" if fmt == "parquet" else "ipc"
+    try:
+        dataset = ds.dataset(path, format=file_format)
+    except pa.ArrowInvalid:
+        # Arrow IPC stream files are not seekable datasets; filter after loading instead
+        from .ingest import read_frame
+        return query_frame(read_frame(path, fmt), spec)
+    
+    _check_columns(query, dataset.schema.names)
+    try:
+        table = dataset.to_table(columns=_projection(query), filter=_arrow_filter(query["filters"]))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+        raise ValueError(f"Cannot apply filters: {e}")
+    return _aggregate(table.to_pandas(), query, table.num_rows)
@@ -0,0 +1,123 @@
+"""
+Mergeable quantile sketches
+KLL sketch (Karnin, Lang, Liberty 2016): bounded-size summary of a numeric
+stream that answers quantile and rank queries within a normalized rank error,
+and merges with sketches built on other chunks or workers
+"""
+
+import math
+import numpy as np
+
+
+def k_for_epsilon(epsilon: float) -> int:
+    """Compactor size giving roughly `epsilon` normalized rank error (DataSketches fit)"""
+    return max(8, math.ceil((2.296 / epsilon) ** (1 / 0.9723)))
+
+
+class KLLSketch:
+    """KLL quantile sketch over float values; level h items carry weight 2**h"""
+    
+    def __init__(self, k: int = 200, seed: int | None = None):
+        self.k = k
+        self.n = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    @classmethod
+    def from_epsilon(cls, epsilon: float, seed: int | None = None) -> "KLLSketch":
+        return cls(k_for_epsilon(epsilon), seed)
+    
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of non-null values"""
+        values = np.asarray(values, dtype="float64")
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def merge(self, other: "KLLSketch") -> None:
+        """Fold in a sketch built over a disjoint set of values"""
+        if other.n == 0:
+            return
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+    
+    def quantiles(self, qs) -> list[float]:
+        if self.n == 0:
+            return [float("nan") for _ in qs]
+        items, cum = self._sorted_view()
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(self.min)
+            elif q >= 1:
+                result.append(self.max)
+            else:
+                idx = min(int(np.searchsorted(cum, q * self.n)), len(items) - 1)
+                result.append(float(items[idx]))
+        return result
+    
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+    
+    def rank(self, value: float, inclusive: bool = False) -> float:
+        """Approximate number of values below `value` (or at or below when inclusive)"""
+        items, cum = self._sorted_view()
+        idx = np.searchsorted(items, value, side="right" if inclusive else "left")
+        return float(cum[idx - 1]) if idx > 0 else 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [items.tolist() for items in self.levels]
+        }
+    
+    @classmethod
+    def from_dict(cls, payload: dict) -> "KLLSketch":
+        sketch = cls(payload["k"])
+        sketch.n = payload["n"]
+        sketch.min = payload["min"]
+        sketch.max = payload["max"]
+        sketch.levels = [np.asarray(items, dtype="float64") for items in payload["levels"]]
+        return sketch
+    
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - 1 - h
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+    
+    def _compress(self) -> None:
+        while True:
+            over = [h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h)]
+            if not over:
+                return
+            h = over[0]
+            if h == len(self.levels) - 1:
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[h])
+            # Odd item stays behind so total weight is preserved exactly
+            keep = items[:1] if len(items) % 2 else items[:0]
+            items = items[len(keep):]
+            offset = int(self._rng.integers(2))
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset::2]])
+    
+    def _sorted_view(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
@@ -0,0 +1,289 @@
+"""
+Single-pass streaming statistics
+Mergeable per-column accumulators (Welford / Chan et al. moments plus a KLL
+quantile sketch) so datasets can be profiled chunk by chunk in bounded
+memory, and partial results computed on separate chunks or workers can be
+combined
+"""
+
+import numpy as np
+from .sketches import KLLSketch
+
+
+class RunningMoments:
+    """Count, mean, M2 (sum of squared deviations), min, max and a quantile sketch of one column"""
+    
+    def __init__(self, epsilon: float = 0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.sketch = KLLSketch.from_epsilon(epsilon)
+    
+    def update(self, values: np.ndarray) -> None:
+        """Fold in a batch of non-null values"""
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        self._combine(n, batch_mean, batch_m2, float(values.min()), float(values.max()))
+        self.sketch.update(values)
+    
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+    
+    def _combine(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+    
+    @property
+    def std(self) -> float | None:
+        """Sample standard deviation; None (not NaN, which is not valid JSON) below two values"""
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else None
+    
+    @property
+    def median(self) -> float:
+        return self.sketch.quantile(0.5)
+    
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "sketch": self.sketch.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, payload: dict) -> "RunningMoments":
+        moments = cls()
+        moments.count = payload["count"]
+        moments.mean = payload["mean"]
+        moments.m2 = payload["m2"]
+        moments.min = payload["min"]
+        moments.max = payload["max"]
+        moments.sketch = KLLSketch.from_dict(payload["sketch"])
+        return moments
+
+
+class StreamingStatistics:
+    """Per-dataset accumulator fed with DataFrame chunks"""
+    
+    def __init__(self, epsilon: float = 0.01):
+        self.epsilon = epsilon
+        self.rows = 0
+        self.columns: list[str] = []
+        self.missing: dict[str, int] = {}
+        self.numeric: dict[str, RunningMoments] = {}
+        self.text_columns: set[str] = set()
+    
+    def consume(self, chunk) -> None:
+        """Fold one DataFrame chunk into the running statistics"""
+        from pandas.api.types import is_bool_dtype, is_numeric_dtype
+        
+        rows_before = self.rows
+        self.rows += len(chunk)
+        present = set()
+        for col in chunk.columns:
+            name = str(col)
+            present.add(name)
+            if name not in self.missing:
+                # Rows seen before the column first appeared count as missing
+                self.columns.append(name)
+                self.missing[name] = rows_before
+            series = chunk[col]
+            nulls = int(series.isna().sum())
+            self.missing[name] += nulls
+            
+            if name in self.text_columns or nulls == len(series):
+                # An all-null chunk carries no type information (JSON rows give object dtype)
+                continue
+            if not is_numeric_dtype(series) or is_bool_dtype(series):
+                # Same rule as select_dtypes on the full frame: one non-numeric chunk makes it text
+                self.text_columns.add(name)
+                self.numeric.pop(name, None)
+                continue
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            self.numeric.setdefault(name, RunningMoments(self.epsilon)).update(values[~np.isnan(values)])
+        
+        for name in self.columns:
+            if name not in present:
+                self.missing[name] += len(chunk)
+    
+    def merge(self, other: "StreamingStatistics") -> None:
+        """Combine with statistics computed over a disjoint set of rows"""
+        for name in other.columns:
+            if name not in self.missing:
+                self.columns.append(name)
+                self.missing[name] = self.rows
+        for name in self.columns:
+            self.missing[name] += other.missing.get(name, other.rows)
+        self.rows += other.rows
+        
+        self.text_columns |= other.text_columns
+        for name, moments in other.numeric.items():
+            if name not in self.text_columns:
+                self.numeric.setdefault(name, RunningMoments(self.epsilon)).merge(moments)
+        for name in self.text_columns:
+            self.numeric.pop(name, None)
+    
+    @property
+    def numeric_columns(self) -> list[str]:
+        return [name for name in self.columns if name in self.numeric]
+    
+    def statistics(self) -> dict:
+        """Same payload as the in-memory `statistics` section"""
+        stats = {}
+        for name in self.numeric_columns:
+            m = self.numeric[name]
+            if m.count > 0:
+                stats[name] = {
+                    "count": int(m.count),
+                    "mean": round(m.mean, 2),
+                    "median": round(m.median, 2),
+                    "std": round(m.std, 2) if m.std is not None else None,
+                    "min": round(m.min, 2),
+                    "max": round(m.max, 2)
+                }
+        return stats
+    
+    def outliers(self, fence: float = 1.5) -> dict:
+        """IQR outlier summary from the sketches; counts are approximate"""
+        summary = {}
+        for name in self.numeric_columns:
+            m = self.numeric[name]
+            if m.count == 0:
+                continue
+            q1, q3 = m.sketch.quantiles([0.25, 0.75])
+            iqr = q3 - q1
+            lower = q1 - fence * iqr
+            upper = q3 + fence * iqr
+            count = int(round(m.sketch.rank(lower) + m.count - m.sketch.rank(upper, inclusive=True)))
+            summary[name] = {
+                "count": count,
+                "percentage": round(float(count / m.count * 100), 1) if count > 0 else 0,
+                "bounds": {"lower": round(float(lower), 2), "upper": round(float(upper), 2)},
+                "quartiles": {"Q1": round(float(q1), 2), "Q3": round(float(q3), 2), "IQR": round(float(iqr), 2)}
+            }
+        return summary
+    
+    def to_dict(self) -> dict:
+        return {
+            "epsilon": self.epsilon,
+            "rows": self.rows,
+            "columns": self.columns,
+            "missing": self.missing,
+            "text_columns": sorted(self.text_columns),
+            "numeric": {name: moments.to_dict() for name, moments in self.numeric.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, payload: dict) -> "StreamingStatistics":
+        acc = cls(payload["epsilon"])
+        acc.rows = payload["rows"]
+        acc.columns = list(payload["columns"])
+        acc.missing = dict(payload["missing"])
+        acc.text_columns = set(payload["text_columns"])
+        acc.numeric = {name: RunningMoments.from_dict(m) for name, m in payload["numeric"].items()}
+        return acc
+    
+    @property
+    def total_missing(self) -> int:
+        return sum(self.missing.values())
+    
+    @property
+    def total_cells(self) -> int:
+        return self.rows * len(self.columns)
+
+
+class CoMoments:
+    """
+    Pairwise-complete co-moment sums for Pearson correlation
+    Per column pair: n, sum(x), sum(x^2) and sum(x*y) over rows where both are
+    present, accumulated around a fixed per-column shift for numerical stability
+    """
+    
+    def __init__(self):
+        self.columns: list[str] = []
+        self.shift = np.empty(0)
+        self.n = np.zeros((0, 0))
+        self.sx = np.zeros((0, 0))
+        self.sxx = np.zeros((0, 0))
+        self.sxy = np.zeros((0, 0))
+    
+    def update(self, names: list, X: np.ndarray) -> None:
+        """Fold in a block of rows; X columns follow `names`"""
+        new = [j for j, name in enumerate(names) if name not in self.columns]
+        if new:
+            with np.errstate(invalid="ignore"):
+                means = [np.nanmean(X[:, j]) if (~np.isnan(X[:, j])).any() else 0.0 for j in new]
+            self.columns += [names[j] for j in new]
+            self.shift = np.concatenate([self.shift, means])
+            size = len(self.columns)
+            for attr in ["n", "sx", "sxx", "sxy"]:
+                grown = np.zeros((size, size))
+                old = getattr(self, attr)
+                grown[:old.shape[0], :old.shape[1]] = old
+                setattr(self, attr, grown)
+        
+        idx = [self.columns.index(name) for name in names]
+        valid = ~np.isnan(X)
+        M = valid.astype("float64")
+        Xc = np.where(valid, X - self.shift[idx], 0.0)
+        block = np.ix_(idx, idx)
+        self.n[block] += M.T @ M
+        self.sx[block] += Xc.T @ M
+        self.sxx[block] += (Xc * Xc).T @ M
+        self.sxy[block] += Xc.T @ Xc
+    
+    def drop(self, name: str) -> None:
+        if name not in self.columns:
+            return
+        j = self.columns.index(name)
+        self.columns.pop(j)
+        self.shift = np.delete(self.shift, j)
+        for attr in ["n", "sx", "sxx", "sxy"]:
+            setattr(self, attr, np.delete(np.delete(getattr(self, attr), j, axis=0), j, axis=1))
+    
+    def correlation(self, names: list) -> np.ndarray:
+        """Pearson matrix for `names` (same semantics as DataFrame.corr)"""
+        idx = [self.columns.index(name) for name in names]
+        block = np.ix_(idx, idx)
+        n, sx, sxx, sxy = self.n[block], self.sx[block], self.sxx[block], self.sxy[block]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy - sx * sx.T / n
+            var_x = sxx - sx * sx / n
+            R = cov / np.sqrt(var_x * var_x.T)
+            R[n < 2] = np.nan
+        R = np.clip(R, -1.0, 1.0)
+        diag = np.diag(R).copy()
+        np.fill_diagonal(R, np.where(np.isnan(diag), np.nan, 1.0))
+        return R
+    
+    def to_dict(self) -> dict:
+        return {
+            "columns": self.columns,
+            "shift": self.shift.tolist(),
+            **{attr: getattr(self, attr).tolist() for attr in ["n", "sx", "sxx", "sxy"]}
+        }
+    
+    @classmethod
+    def from_dict(cls, payload: dict) -> "CoMoments":
+        co = cls()
+        co.columns = list(payload["columns"])
+        co.shift = np.asarray(payload["shift"], dtype="float64")
+        size = len(co.columns)
+        for attr in ["n", "sx", "sxx", "sxy"]:
+            setattr(co, attr, np.asarray(payload[attr], dtype="float64").reshape(size, size))
+        return co
@@ -0,0 +1,230 @@
+"""
+Dashboard widget evaluation over a DataFrame
+All widgets on one dataset are evaluated together: each (column, aggregate)
+needed by metrics and gauges is computed once, and charts grouped by the same
+column share one groupby, so N widgets do not mean N passes over the data
+"""
+
+import math
+
+
+WIDGET_TYPES = ["metric", "chart", "table", "gauge"]
+AGGREGATES = ["count", "sum", "mean", "min", "max", "median", "nunique"]
+NUMERIC_AGGREGATES = {"sum", "mean", "median"}
+# Aggregates a metric or chart may compute on a non-numeric column
+TEXT_AGGREGATES = {"count", "nunique"}
+
+
+def json_value(value):
+    """numpy / pandas scalar -> JSON-safe Python value (NaN -> None)"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def widget_spec(widget_type: str, config: dict | None) -> dict:
+    """
+    Normalized evaluation spec for a widget; defaults follow the dashboard UI
+    (metric = row count, chart = row count per first text column, table = first rows,
+    gauge = share of non-missing cells)
+    """
+    config = config or {}
+    if widget_type not in WIDGET_TYPES:
+        raise ValueError(f"Unsupported widget type '{widget_type}', expected one of {WIDGET_TYPES}")
+    aggregate = config.get("aggregate", "count" if widget_type in ("metric", "chart") else "mean")
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{aggregate}', expected one of {AGGREGATES}")
+    spec = {"type": widget_type}
+    
+    if widget_type in ("metric", "gauge"):
+        spec.update(aggregate=aggregate, column=config.get("column"))
+        if widget_type == "gauge":
+            spec.update(min=config.get("min"), max=config.get("max"))
+    elif widget_type == "chart":
+        spec.update(
+            group_by=config.get("group_by"),
+            aggregate=aggregate,
+            column=config.get("column"),
+            limit=min(int(config.get("limit", 20)), 500),
+            sort=config.get("sort", "value_desc"),
+        )
+    else:
+        spec.update(
+            columns=config.get("columns"),
+            limit=min(int(config.get("limit", 10)), 1000),
+            sort_by=config.get("sort_by"),
+            descending=bool(config.get("descending", True)),
+        )
+    return spec
+
+
+def _is_numeric(series) -> bool:
+    import pandas as pd
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _validate(spec: dict, frame) -> None:
+    referenced = [spec.get(key) for key in ("column", "group_by", "sort_by") if spec.get(key) is not None]
+    referenced += spec.get("columns") or []
+    missing = [col for col in referenced if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Unknown column(s): {', '.join(map(str, missing))}")
+    aggregate = spec.get("aggregate")
+    if aggregate and aggregate != "count" and spec.get("column") is None and not (spec["type"] == "gauge" and aggregate == "mean"):
+        raise ValueError(f"Aggregate '{aggregate}' needs a column")
+    column = spec.get("column")
+    if column is not None and not _is_numeric(frame[column]):
+        # A gauge places its value between the column's min and max, so it is numeric-only
+        if spec["type"] == "gauge":
+            raise ValueError(f"Gauge needs a numeric column, '{column}' is not")
+        if aggregate not in TEXT_AGGREGATES:
+            raise ValueError(f"Aggregate '{aggregate}' needs a numeric column, '{column}' is not")
+    if spec["type"] == "chart" and spec["group_by"] is None:
+        raise ValueError("Chart needs a group_by column")
+
+
+def evaluate_widgets(frame, widgets: dict) -> dict:
+    """
+    Evaluate widget specs {key: spec} against one DataFrame
+    Returns {key: result}; a widget that cannot be evaluated gets {"error": ...}
+    """
+    results: dict = {}
+    specs: dict = {}
+    for key, spec in widgets.items():
+        if spec["type"] == "chart" and spec["group_by"] is None and len(frame.columns):
+            text = [col for col in frame.columns if not _is_numeric(frame[col])]
+            spec = {**spec, "group_by": (text or list(frame.columns))[0]}
+        try:
+            _validate(spec, frame)
+            specs[key] = spec
+        except ValueError as e:
+            results[key] = {"error": str(e)}
+    
+    try:
+        results.update(_evaluate_together(frame, specs))
+    except Exception:
+        # One widget broke the shared pass: evaluate them one by one so only it fails
+        for key, spec in specs.items():
+            try:
+                results.update(_evaluate_together(frame, {key: spec}))
+            except Exception as e:
+                results[key] = {"error": f"Widget evaluation failed: {e}"}
+    return results
+
+
+def _evaluate_together(frame, specs: dict) -> dict:
+    """Results for validated specs, computing shared aggregates and groupbys once"""
+    results: dict = {}
+    # Shared work: every distinct (column, aggregate) and every distinct group_by key
+    scalars = {
+        (spec.get("column"), spec["aggregate"])
+        for spec in specs.values() if spec["type"] in ("metric", "gauge")
+    }
+    for spec in specs.values():
+        if spec["type"] == "gauge" and spec.get("column") is not None:
+            scalars |= {(spec["column"], "min"), (spec["column"], "max")}
+    scalar_values = _scalar_aggregates(frame, scalars)
+    
+    grouped: dict = {}
+    for spec in specs.values():
+        if spec["type"] == "chart":
+            grouped.setdefault(spec["group_by"], set()).add((spec.get("column"), spec["aggregate"]))
+    group_values = {key: _grouped_aggregates(frame, key, aggregates) for key, aggregates in grouped.items()}
+    
+    for key, spec in specs.items():
+        if spec["type"] == "metric":
+            results[key] = {"value": scalar_values[(spec.get("column"), spec["aggregate"])]}
+        elif spec["type"] == "gauge":
+            results[key] = _gauge(spec, scalar_values)
+        elif spec["type"] == "chart":
+            results[key] = _chart(spec, group_values[spec["group_by"]])
+        else:
+            results[key] = _table(frame, spec)
+    return results
+
+
+def _scalar_aggregates(frame, scalars: set) -> dict:
+    values = {}
+    by_column: dict = {}
+    for column, aggregate in scalars:
+        by_column.setdefault(column, set()).add(aggregate)
+    for column, aggregates in by_column.items():
+        if column is None:
+            # Whole-frame aggregates: row count and (gauge default) share of non-missing cells
+            for aggregate in aggregates:
+                if aggregate == "count":
+                    values[(None, "count")] = len(frame)
+                elif aggregate == "mean":
+                    cells = frame.size
+                    values[(None, "mean")] = round(float(frame.notna().sum().sum()) / cells * 100, 2) if cells else None
+            continue
+        computed = frame[column].agg(sorted(aggregates))
+        for aggregate in aggregates:
+            values[(column, aggregate)] = json_value(computed[aggregate])
+    return values
+
+
+def _grouped_aggregates(frame, group_by: str, aggregates: set) -> dict:
+    """{(column, aggregate): [(group, value), ...]} from one groupby over group_by"""
+    groups = frame.groupby(group_by, dropna=False, sort=False)
+    named = {
+        f"{column}\0{aggregate}": (column, aggregate)
+        for column, aggregate in aggregates if column is not None
+    }
+    table = groups.agg(**named) if named else None
+    sizes = groups.size() if any(column is None for column, _ in aggregates) else None
+    
+    values = {}
+    for column, aggregate in aggregates:
+        series = sizes if column is None else table[f"{column}\0{aggregate}"]
+        values[(column, aggregate)] = [(json_value(group), json_value(value)) for group, value in series.items()]
+    return values
+
+
+def _chart(spec: dict, group_values: dict) -> dict:
+    points = group_values[(spec.get("column"), spec["aggregate"])]
+    if spec["sort"] == "name":
+        points = sorted(points, key=lambda point: (point[0] is None, str(point[0])))
+    else:
+        # Groups whose aggregate is missing go last in either direction
+        present = sorted((p for p in points if p[1] is not None), key=lambda p: p[1], reverse=spec["sort"] != "value_asc")
+        points = present + [p for p in points if p[1] is None]
+    return {
+        "data": [{"name": "(missing)" if name is None else name, "value": value} for name, value in points[:spec["limit"]]],
+        "groups": len(points),
+    }
+
+
+def _gauge(spec: dict, scalar_values: dict) -> dict:
+    column = spec.get("column")
+    value = scalar_values[(column, spec["aggregate"])]
+    if column is None:
+        low, high = 0, 100
+    else:
+        low = spec["min"] if spec["min"] is not None else scalar_values[(column, "min")]
+        high = spec["max"] if spec["max"] is not None else scalar_values[(column, "max")]
+    ratio = None
+    if value is not None and low is not None and high is not None and high != low:
+        ratio = round(min(1.0, max(0.0, (value - low) / (high - low))), 4)
+    return {"value": value, "min": low, "max": high, "ratio": ratio}
+
+
+def _table(frame, spec: dict) -> dict:
+    columns = spec["columns"] or [str(col) for col in frame.columns[:10]]
+    if spec["sort_by"] is not None:
+        method = frame.nlargest if spec["descending"] else frame.nsmallest
+        try:
+            rows = method(spec["limit"], spec["sort_by"])
+        except TypeError:
+            rows = frame.sort_values(spec["sort_by"], ascending=not spec["descending"]).head(spec["limit"])
+    else:
+        rows = frame.head(spec["limit"])
+    return {
+        "columns": columns,
+        "rows": [[json_value(value) for value in row] for row in rows[columns].itertuples(index=False)],
+        "total_rows": len(frame),
+    }
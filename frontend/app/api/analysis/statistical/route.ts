@@ -1,10 +1,12 @@
 import { createClient } from "@/lib/supabase/server"
 import { type NextRequest, NextResponse } from "next/server"
+import { startTrace } from "@/lib/tracing"
 
 const PYTHON_BACKEND_URL = process.env.PYTHON_BACKEND_URL || "http://localhost:8000"
 
 export async function POST(request: NextRequest) {
   try {
+    const trace = startTrace()
     const supabase = await createClient()
     const {
       data: { user },
@@ -16,11 +18,14 @@ export async function POST(request: NextRequest) {
 
     const { datasetId, data, columns } = await request.json()
 
+    trace.mark("auth_and_parse")
+
     // Call Python CrewAI backend for statistical analysis
     const response = await fetch(`${PYTHON_BACKEND_URL}/api/analysis/analyze`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        ...trace.headers(),
       },
       body: JSON.stringify({
         user_id: user.id,
@@ -0,0 +1,82 @@
+import { createServerClient } from "@supabase/ssr"
+import { cookies } from "next/headers"
+import { type NextRequest, NextResponse } from "next/server"
+import { startTrace } from "@/lib/tracing"
+
+const PYTHON_BACKEND_URL = process.env.PYTHON_BACKEND_URL || "http://localhost:8000"
+
+export async function POST(request: NextRequest, { params }: { params: { id: string } }) {
+  try {
+    const trace = startTrace()
+    const { forceRefresh = false } = await request.json().catch(() => ({}))
+
+    const cookieStore = await cookies()
+    const supabase = createServerClient(
+      process.env.NEXT_PUBLIC_SUPABASE_URL!,
+      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+      {
+        cookies: {
+          getAll() {
+            return cookieStore.getAll()
+          },
+        },
+      },
+    )
+
+    const {
+      data: { user },
+    } = await supabase.auth.getUser()
+    if (!user) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+    }
+
+    const { data: dashboard, error: dashboardError } = await supabase
+      .from("dashboards")
+      .select("id, refresh_interval")
+      .eq("id", params.id)
+      .eq("user_id", user.id)
+      .single()
+
+    if (dashboardError || !dashboard) {
+      return NextResponse.json({ error: "Dashboard not found" }, { status: 404 })
+    }
+
+    // Only the widget definitions are fetched; the rows stay on the backend
+    const { data: widgets, error: widgetsError } = await supabase
+      .from("dashboard_widgets")
+      .select("id, dataset_id, widget_type, title, config")
+      .eq("dashboard_id", params.id)
+
+    if (widgetsError) {
+      return NextResponse.json({ error: "Failed to load widgets" }, { status: 500 })
+    }
+
+    trace.mark("supabase_fetch")
+
+    const response = await fetch(`${PYTHON_BACKEND_URL}/api/dashboards/${params.id}/evaluate`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        ...trace.headers(),
+      },
+      body: JSON.stringify({
+        widgets: widgets || [],
+        refresh_interval: dashboard.refresh_interval ?? 300,
+        force_refresh: forceRefresh,
+      }),
+    })
+
+    if (!response.ok) {
+      const error = await response.json()
+      throw new Error(error.detail || "Dashboard evaluation failed")
+    }
+
+    return NextResponse.json(await response.json())
+  } catch (error) {
+    console.error("Dashboard evaluation error:", error)
+    return NextResponse.json(
+      { error: error instanceof Error ? error.message : "Dashboard evaluation failed" },
+      { status: 500 }
+    )
+  }
+}
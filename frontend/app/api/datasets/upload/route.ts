@@ -1,6 +1,34 @@
 import { createClient } from "@/lib/supabase/server"
 import { type NextRequest, NextResponse } from "next/server"
 import Papa from "papaparse"
+import { startTrace } from "@/lib/tracing"
+
+const PYTHON_BACKEND_URL = process.env.PYTHON_BACKEND_URL || "http://localhost:8000"
+
+/**
+ * Store the parsed rows on the backend, where queries, dashboard widgets and
+ * scheduled reports read them; returns false if the backend could not store them
+ */
+async function storeRows(datasetId: string, data: Record<string, unknown>[]): Promise<boolean> {
+  const trace = startTrace()
+  try {
+    const response = await fetch(`${PYTHON_BACKEND_URL}/api/analysis/datasets/${datasetId}`, {
+      method: "PUT",
+      headers: {
+        "Content-Type": "text/csv",
+        ...trace.headers(),
+      },
+      body: Papa.unparse(data),
+    })
+    if (!response.ok) {
+      console.error("[v0] Backend dataset store error:", response.status, await response.text())
+    }
+    return response.ok
+  } catch (error) {
+    console.error("[v0] Backend dataset store error:", error)
+    return false
+  }
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -89,9 +117,12 @@ export async function POST(request: NextRequest) {
 
     console.log("[v0] Dataset uploaded successfully:", dataset.id)
 
+    const stored = await storeRows(dataset.id, data)
+
     return NextResponse.json({
       success: true,
       dataset,
+      stored,
       data: data.slice(0, 100),
       totalRows: data.length,
     })
@@ -0,0 +1,63 @@
+import { createServerClient } from "@supabase/ssr"
+import { cookies } from "next/headers"
+import { type NextRequest, NextResponse } from "next/server"
+import { QueryError, runDatasetQuery } from "@/lib/dataset-query"
+import { startTrace } from "@/lib/tracing"
+
+/**
+ * Aggregate a dataset on the backend (filters, group_by, aggregates, sort, limit)
+ * so the chat assistant and the visualizer receive result rows, not the dataset
+ */
+export async function POST(request: NextRequest) {
+  try {
+    const trace = startTrace()
+    const { datasetId, filters, groupBy, aggregates, sort, limit } = await request.json()
+
+    const cookieStore = await cookies()
+    const supabase = createServerClient(
+      process.env.NEXT_PUBLIC_SUPABASE_URL!,
+      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+      {
+        cookies: {
+          getAll() {
+            return cookieStore.getAll()
+          },
+        },
+      },
+    )
+
+    const {
+      data: { user },
+    } = await supabase.auth.getUser()
+    if (!user) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 })
+    }
+
+    // Ownership check only; the rows are read by the backend
+    const { data: dataset, error: datasetError } = await supabase
+      .from("datasets")
+      .select("id")
+      .eq("id", datasetId)
+      .eq("user_id", user.id)
+      .single()
+
+    if (datasetError || !dataset) {
+      return NextResponse.json({ error: "Dataset not found" }, { status: 404 })
+    }
+
+    trace.mark("supabase_fetch")
+
+    const result = await runDatasetQuery(datasetId, { filters, groupBy, aggregates, sort, limit }, trace)
+
+    return NextResponse.json(result)
+  } catch (error) {
+    if (error instanceof QueryError) {
+      return NextResponse.json({ error: error.message }, { status: error.status })
+    }
+    console.error("Query error:", error)
+    return NextResponse.json(
+      { error: error instanceof Error ? error.message : "Query failed" },
+      { status: 500 }
+    )
+  }
+}
@@ -1,11 +1,13 @@
 import { createServerClient } from "@supabase/ssr"
 import { cookies } from "next/headers"
 import { type NextRequest, NextResponse } from "next/server"
+import { startTrace } from "@/lib/tracing"
 
 const PYTHON_BACKEND_URL = process.env.PYTHON_BACKEND_URL || "http://localhost:8000"
 
 export async function POST(request: NextRequest) {
   try {
+    const trace = startTrace()
     const { datasetId, reportType, title, description } = await request.json()
 
     const cookieStore = await cookies()
@@ -46,11 +48,14 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: "Dataset not found" }, { status: 404 })
     }
 
+    trace.mark("supabase_fetch")
+
     // Call Python CrewAI backend for report generation
     const response = await fetch(`${PYTHON_BACKEND_URL}/api/reports/generate`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        ...trace.headers(),
       },
       body: JSON.stringify({
         user_id: user.id,
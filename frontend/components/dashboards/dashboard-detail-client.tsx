@@ -1,6 +1,6 @@
 "use client"
 
-import { useState } from "react"
+import { useCallback, useEffect, useState } from "react"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
@@ -21,6 +21,19 @@ interface Widget {
   datasets: { name: string }
 }
 
+interface WidgetResult {
+  value?: number | null
+  data?: { name: string; value: number | null }[]
+  columns?: string[]
+  rows?: unknown[][]
+  min?: number | null
+  max?: number | null
+  ratio?: number | null
+  error?: string
+  computed_at?: number
+  cached?: boolean
+}
+
 interface Dataset {
   id: string
   name: string
@@ -41,6 +54,44 @@ export function DashboardDetailClient({
   const [selectedDataset, setSelectedDataset] = useState<string>("")
   const [widgetType, setWidgetType] = useState<string>("chart")
   const [isLoading, setIsLoading] = useState(false)
+  const [results, setResults] = useState<Record<string, WidgetResult>>({})
+  const [evaluateError, setEvaluateError] = useState<string | null>(null)
+  const [isRefreshing, setIsRefreshing] = useState(false)
+
+  // All widgets are evaluated by the backend in one request; results are reused
+  // there until the dashboard's refresh_interval has passed
+  const evaluate = useCallback(
+    async (forceRefresh = false) => {
+      setIsRefreshing(true)
+      try {
+        const response = await fetch(`/api/dashboards/${dashboard.id}/evaluate`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ forceRefresh }),
+        })
+        if (!response.ok) {
+          const body = await response.json().catch(() => null)
+          throw new Error(body?.error || "Failed to evaluate widgets")
+        }
+        const result = await response.json()
+        setResults(result.widgets || {})
+        setEvaluateError(null)
+      } catch (error) {
+        console.error("Error:", error)
+        setEvaluateError(error instanceof Error ? error.message : "Failed to evaluate widgets")
+      } finally {
+        setIsRefreshing(false)
+      }
+    },
+    [dashboard.id],
+  )
+
+  useEffect(() => {
+    evaluate()
+    if (!dashboard.refresh_interval) return
+    const timer = setInterval(() => evaluate(), dashboard.refresh_interval * 1000)
+    return () => clearInterval(timer)
+  }, [evaluate, dashboard.refresh_interval, widgets.length])
 
   const handleAddWidget = async () => {
     if (!selectedDataset) return
@@ -70,13 +121,8 @@ export function DashboardDetailClient({
     }
   }
 
-  const mockData = [
-    { name: "Jan", value: 400 },
-    { name: "Feb", value: 300 },
-    { name: "Mar", value: 200 },
-    { name: "Apr", value: 278 },
-    { name: "May", value: 190 },
-  ]
+  const formatValue = (value: unknown) =>
+    typeof value === "number" ? value.toLocaleString(undefined, { maximumFractionDigits: 2 }) : String(value ?? "—")
 
   return (
     <div className="space-y-6">
@@ -124,8 +170,14 @@ export function DashboardDetailClient({
 
       <div className="flex items-center justify-between">
         <h2 className="text-2xl font-bold text-cyan-400">Dashboard Widgets</h2>
-        <Button variant="outline" size="sm" className="gap-2 bg-transparent">
-          <RefreshCw className="h-4 w-4" />
+        <Button
+          variant="outline"
+          size="sm"
+          className="gap-2 bg-transparent"
+          onClick={() => evaluate(true)}
+          disabled={isRefreshing}
+        >
+          <RefreshCw className={`h-4 w-4 ${isRefreshing ? "animate-spin" : ""}`} />
           Refresh
         </Button>
       </div>
@@ -145,19 +197,73 @@ export function DashboardDetailClient({
                 <CardDescription>{widget.datasets.name}</CardDescription>
               </CardHeader>
               <CardContent>
-                {widget.widget_type === "chart" && (
+                {results[widget.id]?.error && (
+                  <div className="text-sm text-red-400">{results[widget.id].error}</div>
+                )}
+                {!results[widget.id] &&
+                  (evaluateError ? (
+                    <div className="text-sm text-red-400">{evaluateError}</div>
+                  ) : (
+                    <div className="text-sm text-slate-400">Loading...</div>
+                  ))}
+                {widget.widget_type === "chart" && results[widget.id]?.data && (
                   <ResponsiveContainer width="100%" height={200}>
-                    <BarChart data={mockData}>
+                    <BarChart data={results[widget.id].data}>
                       <XAxis dataKey="name" stroke="#64748b" />
                       <YAxis stroke="#64748b" />
                       <Bar dataKey="value" fill="#06b6d4" />
                     </BarChart>
                   </ResponsiveContainer>
                 )}
-                {widget.widget_type === "metric" && (
+                {widget.widget_type === "metric" && results[widget.id] && !results[widget.id].error && (
                   <div className="text-center">
-                    <div className="text-4xl font-bold text-cyan-400">1,234</div>
-                    <div className="text-sm text-slate-400 mt-2">Total Records</div>
+                    <div className="text-4xl font-bold text-cyan-400">{formatValue(results[widget.id].value)}</div>
+                    <div className="text-sm text-slate-400 mt-2">
+                      {widget.config?.column
+                        ? `${widget.config.aggregate || "count"} of ${widget.config.column}`
+                        : "Total Records"}
+                    </div>
+                  </div>
+                )}
+                {widget.widget_type === "gauge" && results[widget.id] && !results[widget.id].error && (
+                  <div className="space-y-2">
+                    <div className="text-3xl font-bold text-purple-400">{formatValue(results[widget.id].value)}</div>
+                    <div className="h-2 w-full rounded bg-slate-700">
+                      <div
+                        className="h-2 rounded bg-gradient-to-r from-cyan-500 to-purple-500"
+                        style={{ width: `${(results[widget.id].ratio ?? 0) * 100}%` }}
+                      />
+                    </div>
+                    <div className="flex justify-between text-xs text-slate-400">
+                      <span>{formatValue(results[widget.id].min)}</span>
+                      <span>{formatValue(results[widget.id].max)}</span>
+                    </div>
+                  </div>
+                )}
+                {widget.widget_type === "table" && results[widget.id]?.rows && (
+                  <div className="max-h-64 overflow-auto">
+                    <table className="w-full text-sm">
+                      <thead>
+                        <tr>
+                          {results[widget.id].columns?.map((column) => (
+                            <th key={column} className="text-left text-slate-400 font-medium pb-2 pr-2">
+                              {column}
+                            </th>
+                          ))}
+                        </tr>
+                      </thead>
+                      <tbody>
+                        {results[widget.id].rows?.map((row, i) => (
+                          <tr key={i} className="border-t border-slate-700">
+                            {row.map((value, j) => (
+                              <td key={j} className="py-1 pr-2">
+                                {formatValue(value)}
+                              </td>
+                            ))}
+                          </tr>
+                        ))}
+                      </tbody>
+                    </table>
                   </div>
                 )}
               </CardContent>
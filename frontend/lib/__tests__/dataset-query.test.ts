@@ -0,0 +1,62 @@
+import { formatQueryAnswer, parseAggregationQuestion } from '../dataset-query';
+
+const columns = ['region', 'revenue', 'unit_price', 'price', 'customer_id'];
+
+describe('parseAggregationQuestion', () => {
+  it('reads the aggregate, measured column and group-by keys', () => {
+    expect(parseAggregationQuestion('What is the average revenue by region?', columns)).toEqual({
+      groupBy: ['region'],
+      aggregates: [{ func: 'mean', column: 'revenue', alias: 'mean_revenue' }],
+      sort: [{ column: 'mean_revenue', descending: true }],
+      limit: 20,
+    });
+  });
+
+  it('prefers the longest column name and accepts spaces for underscores', () => {
+    const spec = parseAggregationQuestion('total unit price per region', columns);
+    expect(spec?.aggregates).toEqual([{ func: 'sum', column: 'unit_price', alias: 'sum_unit_price' }]);
+    expect(spec?.groupBy).toEqual(['region']);
+  });
+
+  it('counts rows per group and distinct values', () => {
+    expect(parseAggregationQuestion('how many orders per region', columns)?.aggregates).toEqual([
+      { func: 'count', alias: 'count' },
+    ]);
+    expect(parseAggregationQuestion('how many unique customer_id values', columns)?.aggregates).toEqual([
+      { func: 'nunique', column: 'customer_id', alias: 'nunique_customer_id' },
+    ]);
+  });
+
+  it('leaves non-aggregation questions to the guided answers', () => {
+    expect(parseAggregationQuestion('What columns do I have?', columns)).toBeNull();
+    expect(parseAggregationQuestion('Show me statistics like the mean', columns)).toBeNull();
+    expect(parseAggregationQuestion('how many countries', columns)).toBeNull();
+  });
+});
+
+describe('formatQueryAnswer', () => {
+  it('renders grouped results as a table', () => {
+    const spec = parseAggregationQuestion('average revenue by region', columns)!;
+    const answer = formatQueryAnswer(spec, {
+      columns: ['region', 'mean_revenue'],
+      rows: [['north', 12.5], ['south', 4]],
+      row_count: 2,
+      matched_rows: 10,
+      truncated: false,
+    });
+    expect(answer).toContain('| region | mean_revenue |');
+    expect(answer).toContain('| north | 12.5 |');
+  });
+
+  it('renders a single value with the rows it covers', () => {
+    const spec = parseAggregationQuestion('max revenue', columns)!;
+    const answer = formatQueryAnswer(spec, {
+      columns: ['max_revenue'],
+      rows: [[1200]],
+      row_count: 1,
+      matched_rows: 3400,
+      truncated: false,
+    });
+    expect(answer).toBe('🧮 **max of revenue**: 1,200\n\n_Computed over 3,400 rows._');
+  });
+});
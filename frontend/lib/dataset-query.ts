@@ -0,0 +1,147 @@
+/**
+ * Aggregation queries over a stored dataset, run by the Python backend
+ * (POST /api/analysis/query) so callers receive result rows, not the dataset.
+ * Used by /api/query (visualizer) and the chat assistant.
+ */
+
+import type { RequestTrace } from "@/lib/tracing"
+
+const PYTHON_BACKEND_URL = process.env.PYTHON_BACKEND_URL || "http://localhost:8000"
+
+export type AggregateFunc = "count" | "sum" | "mean" | "min" | "max" | "median" | "nunique"
+
+export interface QuerySpec {
+  filters?: { column: string; op: string; value?: unknown }[]
+  groupBy?: string[]
+  aggregates?: { func: AggregateFunc; column?: string; alias?: string }[]
+  sort?: { column: string; descending?: boolean }[]
+  limit?: number
+}
+
+export interface QueryResult {
+  columns: string[]
+  rows: unknown[][]
+  row_count: number
+  matched_rows: number
+  truncated: boolean
+  cached?: boolean
+}
+
+export class QueryError extends Error {
+  constructor(message: string, public status: number) {
+    super(message)
+  }
+}
+
+export async function runDatasetQuery(datasetId: string, spec: QuerySpec, trace: RequestTrace): Promise<QueryResult> {
+  const response = await fetch(`${PYTHON_BACKEND_URL}/api/analysis/query`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...trace.headers(),
+    },
+    body: JSON.stringify({
+      dataset_id: datasetId,
+      filters: spec.filters || [],
+      group_by: spec.groupBy || [],
+      aggregates: spec.aggregates || [],
+      sort: spec.sort || [],
+      limit: spec.limit || 1000,
+    }),
+  })
+
+  const result = await response.json()
+  if (!response.ok) {
+    throw new QueryError(result.detail || "Query failed", response.status)
+  }
+  return result
+}
+
+// Checked in order: "how many distinct" must win over "how many"
+const AGGREGATE_WORDS: [RegExp, AggregateFunc][] = [
+  [/\b(distinct|unique)\b/, "nunique"],
+  [/\b(average|avg|mean)\b/, "mean"],
+  [/\bmedian\b/, "median"],
+  [/\b(total|sum)\b/, "sum"],
+  [/\b(max|maximum|highest|largest)\b/, "max"],
+  [/\b(min|minimum|lowest|smallest)\b/, "min"],
+  [/\b(how many|count|number of)\b/, "count"],
+]
+
+function escapeRegExp(text: string): string {
+  return text.replace(/[.*+?^${}()|[\]\\]/g, "\\$&")
+}
+
+/** Position of a column name in the message ("unit_price" also matches "unit price"), -1 if absent */
+function mentionAt(message: string, column: string): number {
+  const spelled = escapeRegExp(column.toLowerCase()).replace(/_/g, "[_ ]")
+  const match = new RegExp(`(^|[^a-z0-9_])${spelled}($|[^a-z0-9_])`).exec(message)
+  return match ? match.index + match[1].length : -1
+}
+
+/**
+ * Turn an aggregation question such as "average revenue by region" or
+ * "how many orders per country" into a query spec; null if the message is not one
+ */
+export function parseAggregationQuestion(message: string, columns: string[]): QuerySpec | null {
+  const text = message.toLowerCase()
+  const func = AGGREGATE_WORDS.find(([pattern]) => pattern.test(text))?.[1]
+  if (!func) {
+    return null
+  }
+
+  // Longer names first, blanking each match, so "unit_price" is not also read as "price"
+  let remaining = text
+  const mentioned: { column: string; at: number }[] = []
+  for (const column of [...columns].sort((a, b) => b.length - a.length)) {
+    const at = mentionAt(remaining, column)
+    if (at >= 0) {
+      mentioned.push({ column, at })
+      remaining = remaining.slice(0, at) + " ".repeat(column.length) + remaining.slice(at + column.length)
+    }
+  }
+  mentioned.sort((a, b) => a.at - b.at)
+
+  const groupBy = mentioned
+    .filter(({ at }) => /\b(by|per|for each|across)\s+$/.test(text.slice(0, at)))
+    .map(({ column }) => column)
+  const measured = mentioned.find(({ column }) => !groupBy.includes(column))?.column
+
+  if (func !== "count" && !measured) {
+    return null
+  }
+  if (func === "count" && groupBy.length === 0 && !/\b(rows|records|entries)\b/.test(text) && !measured) {
+    return null
+  }
+
+  const aggregate = func === "count" ? { func, alias: "count" } : { func, column: measured, alias: `${func}_${measured}` }
+  return {
+    groupBy,
+    aggregates: [aggregate],
+    sort: groupBy.length ? [{ column: aggregate.alias, descending: func !== "min" }] : [],
+    limit: 20,
+  }
+}
+
+function formatValue(value: unknown): string {
+  if (typeof value === "number") {
+    return Number.isInteger(value) ? value.toLocaleString("en-US") : value.toLocaleString("en-US", { maximumFractionDigits: 2 })
+  }
+  return value === null || value === undefined ? "—" : String(value)
+}
+
+/** Markdown answer for the chat assistant */
+export function formatQueryAnswer(spec: QuerySpec, result: QueryResult): string {
+  const aggregate = spec.aggregates?.[0]
+  const label = aggregate?.column ? `${aggregate.func} of ${aggregate.column}` : "row count"
+  const groupBy = spec.groupBy || []
+
+  if (!groupBy.length) {
+    return `🧮 **${label}**: ${formatValue(result.rows[0]?.[result.columns.length - 1])}\n\n_Computed over ${result.matched_rows.toLocaleString("en-US")} rows._`
+  }
+
+  const header = `| ${result.columns.join(" | ")} |\n| ${result.columns.map(() => "---").join(" | ")} |`
+  const lines = result.rows.map((row) => `| ${row.map(formatValue).join(" | ")} |`)
+  const more = result.truncated ? `\n\n_Showing the top ${result.row_count} groups._` : ""
+  return `🧮 **${label} by ${groupBy.join(", ")}**\n\n${header}\n${lines.join("\n")}${more}`
+}
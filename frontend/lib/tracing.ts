@@ -0,0 +1,41 @@
+/**
+ * W3C trace context for calls from the Next.js API routes to the Python backend.
+ * The backend continues the trace from `traceparent` and records the timings
+ * sent in `x-insightflow-timing` (e.g. the Supabase fetch) on its request span.
+ */
+
+function randomHex(bytes: number): string {
+  const values = crypto.getRandomValues(new Uint8Array(bytes))
+  return Array.from(values, (value) => value.toString(16).padStart(2, "0")).join("")
+}
+
+export interface RequestTrace {
+  traceId: string
+  /** Record the time since the previous mark (or the trace start) under `name` */
+  mark(name: string): void
+  /** Headers to send with the backend request */
+  headers(): Record<string, string>
+}
+
+export function startTrace(): RequestTrace {
+  const traceId = randomHex(16)
+  const timings: Record<string, number> = {}
+  let last = performance.now()
+
+  return {
+    traceId,
+    mark(name) {
+      const now = performance.now()
+      timings[name] = Math.round((now - last) * 10) / 10
+      last = now
+    },
+    headers() {
+      return {
+        traceparent: `00-${traceId}-${randomHex(8)}-01`,
+        "x-insightflow-timing": Object.entries(timings)
+          .map(([name, ms]) => `${name}=${ms}`)
+          .join(";"),
+      }
+    },
+  }
+}